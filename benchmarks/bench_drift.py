@@ -0,0 +1,106 @@
+# benchmarks/bench_drift.py
+#
+# Native drift engine (scripts/drift.py) vs Evidently's DataDriftPreset on
+# large monitoring windows. Both windows are bootstrapped from the
+# reference / monitoring datasets so the columns look like production.
+#
+#   python benchmarks/bench_drift.py                       # 1M-row windows
+#   python benchmarks/bench_drift.py --rows 200000 --skip-evidently
+#   python benchmarks/bench_drift.py --html --output bench_drift.json
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from scripts.dataset import read_dataset
+from scripts.drift import compute_drift, drift_summary, dummy_features
+
+REFERENCE_DATA_PATH = os.path.join(BASE_DIR, "data", "reference_data.csv")
+MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
+
+
+def bootstrap(df, rows, seed):
+    idx = np.random.default_rng(seed).integers(0, len(df), rows)
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), float(np.median(times)), result
+
+
+def run_native(reference, current, features):
+    table = compute_drift(reference, current, features)
+    return drift_summary(table, len(reference), len(current))
+
+
+def run_evidently(reference, current, features, html_path=None):
+    from evidently import ColumnMapping
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
+
+    report = Report(metrics=[DataDriftPreset()])
+    report.run(
+        reference_data=reference[features].astype("int8"),
+        current_data=current[features].astype("int8"),
+        column_mapping=ColumnMapping(numerical_features=features, categorical_features=[]),
+    )
+    if html_path:
+        report.save_html(html_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark native drift vs Evidently")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per window (reference and current)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-evidently", action="store_true")
+    parser.add_argument("--html", action="store_true", help="Include Evidently's HTML rendering in its timing")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    reference = bootstrap(read_dataset(REFERENCE_DATA_PATH), args.rows, seed=0)
+    monitoring = read_dataset(MONITORING_DATA_PATH)
+    current = bootstrap(monitoring.drop(columns=["actual", "prediction", "probability"], errors="ignore"),
+                        args.rows, seed=1)
+    features = dummy_features(reference[[c for c in reference.columns if c in set(current.columns)]])
+    print(f"✅ Windows: {args.rows:,} rows x {len(features)} features each")
+
+    results = {"rows": args.rows, "features": len(features)}
+    best, median, summary = timed(lambda: run_native(reference, current, features), args.repeat)
+    results["native"] = {"best_s": best, "median_s": median, "n_drifted": summary["n_drifted"]}
+    print(f"native     best {best:8.3f}s  median {median:8.3f}s  ({args.rows / best:,.0f} rows/s)")
+
+    if not args.skip_evidently:
+        try:
+            import evidently  # noqa: F401
+        except ImportError:
+            print("⚠️ evidently is not installed; skipping")
+        else:
+            html_path = os.path.join(BASE_DIR, "bench_drift_report.html") if args.html else None
+            best, median, _ = timed(lambda: run_evidently(reference, current, features, html_path),
+                                    max(1, min(args.repeat, 2)))
+            results["evidently"] = {"best_s": best, "median_s": median, "html": bool(args.html)}
+            print(f"evidently  best {best:8.3f}s  median {median:8.3f}s  ({args.rows / best:,.0f} rows/s)")
+            print(f"✅ native is {best / results['native']['best_s']:,.0f}x faster")
+            if html_path and os.path.exists(html_path):
+                os.remove(html_path)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_forest.py
+#
+# Scoring latency of the pickled sklearn forest vs the flattened NumPy
+# forest (deployment/forest.py) at API-like and batch-like sizes, the
+# latter both on uint8 rows and on rows packed into 64-bit words
+# (deployment/bitset.py; packing is included in its timing). Rows are
+# bootstrapped from the monitoring data as the uint8 matrices the
+# feature encoder produces. Also prints memory per million claims for
+# each input representation.
+#
+#   python benchmarks/bench_forest.py                        # batches of 1, 32 and 10k
+#   python benchmarks/bench_forest.py --batch-sizes 1 256 --output bench_forest.json
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from deployment.bitset import pack
+from deployment.forest import FlatForest
+from scripts.dataset import read_dataset
+
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
+
+# Plain arrays in the model's column order, as the API passes them
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def latencies(fn, X, budget_s, max_calls):
+    """Per-call seconds for repeated fn(X) until `budget_s` or `max_calls` is reached."""
+    fn(X)  # warm-up
+    times = []
+    deadline = time.perf_counter() + budget_s
+    while len(times) < max_calls and (len(times) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def summarize(times, batch_size):
+    return {
+        "calls": len(times),
+        "p50_ms": float(np.percentile(times, 50) * 1e3),
+        "p99_ms": float(np.percentile(times, 99) * 1e3),
+        "rows_per_s": float(batch_size / np.median(times)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sklearn vs flattened forest scoring")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 10_000])
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds spent per backend and batch size")
+    parser.add_argument("--max-calls", type=int, default=2000)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    start = time.perf_counter()
+    forest = FlatForest.from_sklearn(model)
+    flatten_s = time.perf_counter() - start
+    print(f"✅ Flattened {forest.n_trees} trees ({forest.n_nodes} nodes) in {flatten_s * 1e3:.1f} ms")
+
+    features = list(model.feature_names_in_)
+    pool = read_dataset(MONITORING_DATA_PATH)[features].to_numpy(dtype=np.uint8)
+    rng = np.random.default_rng(0)
+
+    # Bytes per million claims for each representation of the same rows
+    sample = pool[:1000]
+    memory = {
+        "int64": sample.astype(np.int64).nbytes,
+        "bool": sample.astype(bool).nbytes,
+        "bitset": pack(sample).nbytes,
+    }
+    memory = {name: nbytes / len(sample) * 1_000_000 / 2**20 for name, nbytes in memory.items()}
+    print("✅ MiB per million claims: " + ", ".join(f"{name} {mib:,.0f}" for name, mib in memory.items()))
+
+    results = {"model": args.model, "trees": forest.n_trees, "nodes": forest.n_nodes,
+               "flatten_ms": flatten_s * 1e3, "mib_per_million_claims": memory, "batches": {}}
+    for batch_size in args.batch_sizes:
+        X = pool[rng.integers(0, len(pool), batch_size)]
+        assert np.allclose(forest.predict_proba(X), model.predict_proba(X), atol=1e-9)
+        row = {}
+        backends = (
+            ("sklearn", model.predict_proba),
+            ("flat", forest.predict_proba),
+            ("flat_bits", lambda X: forest.predict_proba_bits(pack(X))),
+        )
+        for name, fn in backends:
+            row[name] = summarize(latencies(fn, X, args.budget, args.max_calls), batch_size)
+        results["batches"][str(batch_size)] = row
+        print(f"batch {batch_size:>6}  " + "  ".join(
+            f"{name} p50 {row[name]['p50_ms']:8.3f} ms ({row['sklearn']['p50_ms'] / row[name]['p50_ms']:4.1f}x)"
+            for name, _ in backends))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
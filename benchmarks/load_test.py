@@ -0,0 +1,326 @@
+# benchmarks/load_test.py
+#
+# Load test for the serving API (deployment/server.py). Replays claim
+# payloads against /predict, /explain and the batch endpoints at one or
+# more concurrency levels and reports throughput and p50/p95/p99 latency.
+#
+# Payloads are the dummy-feature rows of the monitoring data, in file
+# order, so repeated claim profiles hit the server's caches as they would
+# in production. A replay file (one JSON object per line) can be used
+# instead: lines shaped {"path": "/predict", "body": {...}} are sent as
+# they are; any other line is a record (a feature dict, or a
+# {"features": ...} / {"claim": ...} body) used to build every
+# endpoint's payloads.
+#
+# Targets:
+#   inprocess   the app driven through httpx's ASGI transport (no sockets;
+#               client and server share one event loop)
+#   uvicorn     a local uvicorn process started for the run
+#   url         an already running server (--url)
+#
+#   python benchmarks/load_test.py                                   # both local targets, concurrency 1/8/32
+#   python benchmarks/load_test.py --target uvicorn --concurrency 64 --duration 30
+#   python benchmarks/load_test.py --replay requests.jsonl --endpoints /predict
+#   python benchmarks/load_test.py --compare benchmarks/results/load_test-abc1234.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from scripts.dataset import read_dataset
+
+MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
+ENCODER_PATH = os.path.join(BASE_DIR, "models", "encoder.json")
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+ENDPOINTS = ("/predict", "/explain", "/predict_batch", "/explain_batch")
+BATCH_ENDPOINTS = ("/predict_batch", "/explain_batch")
+TARGETS = ("inprocess", "uvicorn", "url")
+
+# Server settings worth recording alongside the numbers
+SERVER_ENV = ("MODEL_BACKEND", "MICROBATCH_ENABLED", "MICROBATCH_MAX_WAIT_MS", "MICROBATCH_MAX_BATCH",
+              "EXPLAIN_CACHE_SIZE", "METRICS_ENABLED", "PRELOAD_EXPLAINER")
+
+
+# ——— Payloads ———
+def feature_records(path, limit=None):
+    """Dummy-feature dicts from a dataset, in the model's column order."""
+    from deployment.feature_encoder import FeatureEncoder
+
+    names = FeatureEncoder.load(ENCODER_PATH).feature_names
+    df = read_dataset(path, columns=names)
+    if limit:
+        df = df.head(limit)
+    return df.astype(int).to_dict(orient="records")
+
+
+def read_replay(path):
+    """(records, fixed requests) from a replay file; see the header for its format."""
+    records, fixed = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict) and "path" in item:
+                fixed.append((item["path"], item.get("body")))
+            else:
+                records.append(item)
+    return records, fixed
+
+
+def endpoint_bodies(records, endpoint, batch_size):
+    """Encoded request bodies for one endpoint, cycling through the records."""
+    single = [r if "features" in r or "claim" in r else {"features": r} for r in records]
+    if endpoint not in BATCH_ENDPOINTS:
+        return [json.dumps(body).encode() for body in single]
+    # Batch endpoints take bare feature dicts (raw claims would need ?raw=true)
+    rows = [body["features"] for body in single if "features" in body]
+    if not rows:
+        return []
+    n_batches = max(1, len(rows) // batch_size)
+    return [json.dumps([rows[(i * batch_size + j) % len(rows)] for j in range(batch_size)]).encode()
+            for i in range(n_batches)]
+
+
+def build_workload(records, fixed, endpoints, batch_size):
+    """{endpoint: [encoded bodies]} for every endpoint with payloads."""
+    workload = {}
+    for endpoint in endpoints:
+        bodies = [json.dumps(body).encode() for path, body in fixed if path == endpoint]
+        if not bodies and records:
+            bodies = endpoint_bodies(records, endpoint, batch_size)
+        if bodies:
+            workload[endpoint] = bodies
+        else:
+            print(f"⚠️ No payloads for {endpoint}; skipping it")
+    return workload
+
+
+# ——— Running ———
+async def drive(client, endpoint, bodies, concurrency, duration, max_requests):
+    """Send `bodies` round-robin from `concurrency` workers.
+
+    Returns the latencies of successful requests, the error count and the
+    elapsed time. Failed requests (4xx/5xx or exceptions) are only counted:
+    a server failing fast must not look faster.
+    """
+    latencies, errors = [], [0]
+    next_index = [0]
+    deadline = time.perf_counter() + duration
+    headers = {"Content-Type": "application/json"}
+
+    async def worker():
+        while next_index[0] < max_requests and time.perf_counter() < deadline:
+            body = bodies[next_index[0] % len(bodies)]
+            next_index[0] += 1
+            start = time.perf_counter()
+            try:
+                res = await client.post(endpoint, content=body, headers=headers)
+                ok = res.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return np.array(latencies), errors[0], time.perf_counter() - start
+
+
+def summarize(latencies, errors, elapsed, records_per_request):
+    if len(latencies) == 0:
+        return {"requests": errors, "successes": 0, "errors": errors}
+    ms = latencies * 1e3
+    return {
+        "requests": len(latencies) + errors,
+        "successes": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        # Throughput and latency cover successful requests only
+        "requests_per_s": len(latencies) / elapsed,
+        "records_per_s": len(latencies) * records_per_request / elapsed,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+async def run_target(client, workload, args):
+    results = {}
+    for endpoint, bodies in workload.items():
+        records_per_request = args.batch_size if endpoint in BATCH_ENDPOINTS else 1
+        # Warm-up: first-use costs (explainer build, caches, connections) stay out of the numbers
+        if args.warmup:
+            await drive(client, endpoint, bodies, min(args.warmup, 4), args.duration, args.warmup)
+        results[endpoint] = {}
+        for concurrency in args.concurrency:
+            latencies, errors, elapsed = await drive(client, endpoint, bodies, concurrency, args.duration,
+                                                     args.max_requests)
+            row = summarize(latencies, errors, elapsed, records_per_request)
+            results[endpoint][str(concurrency)] = row
+            if row["successes"]:
+                print(f"  {endpoint:<15} c={concurrency:<4} {row['requests_per_s']:8.1f} req/s  "
+                      f"p50 {row['p50_ms']:7.2f}  p95 {row['p95_ms']:7.2f}  p99 {row['p99_ms']:7.2f} ms"
+                      + (f"  ❌ {errors} errors" if errors else ""))
+            elif errors:
+                print(f"  {endpoint:<15} c={concurrency:<4} ❌ all {errors} requests failed")
+    return results
+
+
+async def run_inprocess(workload, args):
+    import httpx
+    from deployment.server import app, get_bundle
+
+    get_bundle()  # load the model before timing, as the lifespan hook would
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://inprocess") as client:
+        return await run_target(client, workload, args)
+
+
+async def run_url(url, workload, args):
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        return await run_target(client, workload, args)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(port, timeout=120.0):
+    """Start `uvicorn deployment.server:app` and wait until /ready reports the model loaded."""
+    import httpx
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "deployment.server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BASE_DIR,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1.0).json().get("ready"):
+                return process, url
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn was not ready after {timeout:.0f}s")
+
+
+# ——— Results ———
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print p50/p99 and throughput changes against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline_path} (commit {baseline.get('commit')}):")
+    for target, endpoints in results["targets"].items():
+        for endpoint, levels in endpoints.items():
+            for concurrency, row in levels.items():
+                old = baseline.get("targets", {}).get(target, {}).get(endpoint, {}).get(concurrency)
+                if not old or "p50_ms" not in old or "p50_ms" not in row:
+                    continue
+                print(f"  {target:<9} {endpoint:<15} c={concurrency:<4} "
+                      f"req/s {row['requests_per_s'] / old['requests_per_s'] - 1:+7.1%}  "
+                      f"p50 {row['p50_ms'] / old['p50_ms'] - 1:+7.1%}  "
+                      f"p99 {row['p99_ms'] / old['p99_ms'] - 1:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the fraud detection API")
+    parser.add_argument("--target", nargs="+", choices=TARGETS, default=["inprocess", "uvicorn"])
+    parser.add_argument("--url", help="Base URL of a running server (for --target url)")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint and concurrency level")
+    parser.add_argument("--max-requests", type=int, default=20_000, help="Request cap per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint")
+    parser.add_argument("--batch-size", type=int, default=32, help="Records per batch-endpoint request")
+    parser.add_argument("--data", default=MONITORING_DATA_PATH, help="Dataset the payloads are built from")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows of --data to replay")
+    parser.add_argument("--replay", help="JSONL replay file to use instead of --data")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/load_test-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to print changes against")
+    args = parser.parse_args()
+
+    if "url" in args.target and not args.url:
+        parser.error("--target url needs --url")
+
+    if args.replay:
+        records, fixed = read_replay(args.replay)
+    else:
+        records, fixed = feature_records(args.data, args.rows), []
+    workload = build_workload(records, fixed, args.endpoints, args.batch_size)
+    if not workload:
+        print("❌ Nothing to send")
+        sys.exit(1)
+    print(f"✅ {sum(len(b) for b in workload.values())} payloads for {', '.join(workload)}")
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "server_env": {name: os.environ[name] for name in SERVER_ENV if name in os.environ},
+        "source": args.replay or args.data,
+        "settings": {"concurrency": args.concurrency, "duration": args.duration,
+                     "max_requests": args.max_requests, "batch_size": args.batch_size},
+        "targets": {},
+    }
+    for target in args.target:
+        print(f"▶ {target}")
+        if target == "inprocess":
+            results["targets"][target] = asyncio.run(run_inprocess(workload, args))
+        elif target == "url":
+            results["targets"][target] = asyncio.run(run_url(args.url, workload, args))
+        else:
+            process, url = start_uvicorn(free_port())
+            try:
+                results["targets"][target] = asyncio.run(run_url(url, workload, args))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_test-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+from collections import Counter
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-record requests into one scoring call.
+
+    Requests are queued and collected for up to ``max_wait_ms`` or until
+    ``max_batch_size`` records are waiting, then ``score_fn`` is called once
+    in a worker thread with the whole list. ``score_fn`` must return one
+    result per record, in order.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=5.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+        # Metrics
+        self.batches = 0
+        self.records = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()
+
+    async def submit(self, record):
+        """Queue one record and wait for its own result."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((record, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "records": self.records,
+            "mean_batch_size": self.records / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    def _ensure_started(self):
+        # The worker is bound to the loop it was created on; start a new one
+        # if we are now running on a different loop (e.g. a fresh test client).
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already waiting before sleeping on the queue
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        records = [record for record, _ in batch]
+        self.batches += 1
+        self.records += len(records)
+        self.batch_sizes[len(records)] += 1
+
+        try:
+            results = await asyncio.to_thread(self.score_fn, records)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have gone away (client disconnect / cancellation)
+            if not future.done():
+                future.set_result(result)
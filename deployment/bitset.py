@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import numpy as np
+
+WORD_BITS = 64
+BITSET_SUFFIX = ".bits"
+
+
+def n_words(n_features):
+    return (n_features + WORD_BITS - 1) // WORD_BITS
+
+
+def pack(X):
+    """Pack a 0/1 (or bool) matrix into (n_rows, n_words) uint64 words.
+
+    Feature ``f`` is bit ``f % 64`` of word ``f // 64``; unused high bits
+    of the last word are zero. The 64 model features fit in one word, so
+    a claim costs 8 bytes instead of 64 as bools or 512 as int64.
+    """
+    X = np.asarray(X)
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 2-D 0/1 matrix, got shape {X.shape}")
+    n_rows, n_features = X.shape
+    packed = np.packbits(X.astype(bool, copy=False), axis=1, bitorder="little")
+    padded = np.zeros((n_rows, n_words(n_features) * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8")
+
+
+def unpack(bits, n_features, dtype=np.uint8):
+    """Inverse of pack(): the (n_rows, n_features) 0/1 matrix."""
+    bits = np.ascontiguousarray(bits, dtype="<u8")
+    X = np.unpackbits(bits.view(np.uint8), axis=1, count=n_features, bitorder="little")
+    return X if dtype == np.uint8 else X.astype(dtype)
+
+
+def row_keys(bits):
+    """Each packed row as one fixed-size opaque scalar (hashable via .tobytes(), sortable)."""
+    bits = np.ascontiguousarray(bits, dtype="<u8")
+    return bits.view(np.dtype((np.void, bits.shape[1] * 8))).ravel()
+
+
+def column_counts(bits, n_features, chunk_rows=1 << 16):
+    """Number of set bits per feature, unpacking at most `chunk_rows` rows at a time."""
+    counts = np.zeros(n_features, dtype=np.int64)
+    for start in range(0, len(bits), chunk_rows):
+        counts += unpack(bits[start:start + chunk_rows], n_features).sum(axis=0, dtype=np.int64)
+    return counts
+
+
+def binary_columns(df):
+    """Columns of `df` holding only 0/1 values (bool dummies or 0/1 integers)."""
+    from pandas.api import types as ptypes
+
+    columns = []
+    for col, series in df.items():
+        if ptypes.is_bool_dtype(series):
+            columns.append(col)
+        elif ptypes.is_integer_dtype(series) and series.isin((0, 1)).all():
+            columns.append(col)
+    return columns
+
+
+# ——— Storage ———
+# A bitset dataset is a directory (conventionally named *.bits):
+#
+#     bits.npy          (n_rows, n_words) uint64   packed 0/1 columns, memory-mapped on read
+#     <i>.npy           one array per other column (labels, probabilities, ids, ...)
+#     meta.json         packed column names and non-bool dtypes, other column names, row count
+def write_bitset(df, path, columns=None):
+    """Store `df` as a bitset dataset, packing `columns` (default: every 0/1 column)."""
+    packed_columns = list(columns) if columns is not None else binary_columns(df)
+    other_columns = [c for c in df.columns if c not in set(packed_columns)]
+
+    staging = f"{path}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    np.save(os.path.join(staging, "bits.npy"), pack(df[packed_columns].to_numpy()))
+    for i, col in enumerate(other_columns):
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(staging, f"{i}.npy"), values)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({
+            "n_rows": len(df),
+            "feature_names": [str(c) for c in packed_columns],
+            # Integer 0/1 columns (e.g. labels) are restored with their dtype on read
+            "dtypes": {str(c): str(df[c].dtype) for c in packed_columns if df[c].dtype != bool},
+            "columns": [str(c) for c in other_columns],
+            "order": [str(c) for c in df.columns],
+        }, f, indent=2)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(staging, path)
+    return path
+
+
+class BitsetDataset:
+    """A stored bitset dataset: the packed words plus its other columns, memory-mapped."""
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        mmap_mode = "r" if mmap else None
+        self.bits = np.load(os.path.join(path, "bits.npy"), mmap_mode=mmap_mode)
+        self.columns = {
+            col: np.load(os.path.join(path, f"{i}.npy"), mmap_mode=mmap_mode)
+            for i, col in enumerate(self.meta["columns"])
+        }
+
+    def __len__(self):
+        return self.meta["n_rows"]
+
+    @property
+    def feature_names(self):
+        return self.meta["feature_names"]
+
+    def to_frame(self, columns=None, start=0, stop=None):
+        """Rows [start, stop) as a DataFrame with bool dummies, in the original column order."""
+        import pandas as pd
+
+        stop = len(self) if stop is None else min(stop, len(self))
+        wanted = columns if columns is not None else self.meta["order"]
+        index = {name: i for i, name in enumerate(self.feature_names)}
+        dummies = [c for c in wanted if c in index]
+        data = {}
+        if dummies:
+            unpacked = unpack(self.bits[start:stop], len(self.feature_names), dtype=bool)
+            dtypes = self.meta.get("dtypes", {})
+            for c in dummies:
+                data[c] = unpacked[:, index[c]].astype(dtypes[c]) if c in dtypes else unpacked[:, index[c]]
+        for c in wanted:
+            if c not in index:
+                data[c] = np.asarray(self.columns[c][start:stop])
+        return pd.DataFrame(data, columns=list(wanted))
+
+    def iter_frames(self, chunksize):
+        for start in range(0, len(self), chunksize):
+            yield self.to_frame(start=start, stop=start + chunksize)
@@ -0,0 +1,187 @@
+import json
+import numpy as np
+
+# Raw fraud_oracle.csv columns the model is built from
+RAW_FEATURES = [
+    'NumberOfSuppliments', 'AgeOfVehicle', 'AgeOfPolicyHolder', 'Month',
+    'Deductible', 'MonthClaimed', 'Make', 'AddressChange_Claim',
+    'PastNumberOfClaims', 'VehiclePrice', 'VehicleCategory', 'Fault'
+]
+
+TARGET = 'FraudFound_P'
+
+# Manual grouping (feature engineering) applied before dummy encoding
+GROUPINGS = {
+    'NumberOfSuppliments': {
+        'none': 'none or 1 to 2',
+        '1 to 2': 'none or 1 to 2',
+        '3 to 5': 'more than 3',
+        'more than 5': 'more than 3'
+    },
+    'AgeOfVehicle': {
+        '3 years': '3-4 years',
+        '4 years': '3-4 years',
+        '5 years': 'more than 5 years',
+        '6 years': 'more than 5 years',
+        '7 years': 'more than 5 years',
+        'more than 7': 'more than 5 years'
+    },
+    'AgeOfPolicyHolder': {
+        '41 to 50': '41 to 65',
+        '51 to 65': '41 to 65'
+    },
+    'Month': {
+        'Jan': 'Jan-Feb',
+        'Feb': 'Jan-Feb'
+    },
+    'MonthClaimed': {
+        'Jan': 'Jan-Feb',
+        'Feb': 'Jan-Feb'
+    },
+    'Make': {
+        'Lexus': 'Lexus/Ferrari/Porche/Jaguar',
+        'Ferrari': 'Lexus/Ferrari/Porche/Jaguar',
+        'Porche': 'Lexus/Ferrari/Porche/Jaguar',
+        'Jaguar': 'Lexus/Ferrari/Porche/Jaguar'
+    },
+    'VehiclePrice': {
+        '20000 to 29000': '20000 to 39000',
+        '30000 to 39000': '20000 to 39000'
+    },
+}
+
+
+class FeatureEncoder:
+    """Map raw claims to the fixed-width dummy vector the model was trained on.
+
+    Equivalent to the grouping + ``pd.get_dummies(drop_first=True)`` step of
+    the preprocessing script, but fitted once and stored as plain lookup
+    tables: for every raw column, each raw value (before grouping) maps
+    straight to its output column index, or -1 for the dropped baseline
+    category. Encoding a batch is one searchsorted per raw column.
+    """
+
+    def __init__(self, categories, raw_features=None):
+        self.raw_features = list(raw_features or RAW_FEATURES)
+        self.categories = {col: list(categories[col]) for col in self.raw_features}
+
+        # Output columns follow get_dummies: raw column order, then sorted categories,
+        # with the first category of each column dropped.
+        self.feature_names = []
+        tables = {}
+        for col in self.raw_features:
+            table = {self.categories[col][0]: -1}
+            for cat in self.categories[col][1:]:
+                table[cat] = len(self.feature_names)
+                self.feature_names.append(f"{col}_{cat}")
+            # Ungrouped raw values resolve directly to their group's column
+            for raw, grouped in GROUPINGS.get(col, {}).items():
+                if grouped in table:
+                    table[raw] = table[grouped]
+            tables[col] = table
+
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._keys = {}
+        self._codes = {}
+        for col, table in tables.items():
+            keys = sorted(table)
+            self._keys[col] = np.array(keys, dtype=str)
+            self._codes[col] = np.array([table[k] for k in keys], dtype=np.int64)
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    @classmethod
+    def fit(cls, df, raw_features=None):
+        """Learn the category tables from a raw fraud_oracle.csv-style DataFrame."""
+        raw_features = list(raw_features or RAW_FEATURES)
+        categories = {}
+        for col in raw_features:
+            grouped = df[col].dropna().astype(str).replace(GROUPINGS.get(col, {}))
+            categories[col] = sorted(grouped.unique())
+        return cls(categories, raw_features)
+
+    def transform(self, claims, strict=True):
+        """Encode raw claims into an (n, n_features) uint8 matrix.
+
+        ``claims`` can be a DataFrame, a dict of columns, or a list of claim
+        dicts. With ``strict`` an unseen category raises ValueError instead of
+        silently encoding as the baseline.
+        """
+        if isinstance(claims, dict):
+            claims = [claims]
+        if isinstance(claims, list):
+            n_rows = len(claims)
+            values = {col: [claim.get(col) for claim in claims] for col in self.raw_features}
+            # None, or NaN from a DataFrame.to_dict() round trip
+            missing = [col for col, vals in values.items() if any(v is None or v != v for v in vals)]
+            columns = {col: np.array(vals, dtype=str) for col, vals in values.items()}
+        else:
+            import pandas as pd
+
+            n_rows = len(claims)
+            missing = [col for col in self.raw_features
+                       if col not in claims or pd.isna(np.asarray(claims[col], dtype=object)).any()]
+            columns = {col: np.asarray(claims[col]).astype(str) for col in self.raw_features if col in claims}
+
+        # Report absent fields as such, not as the unknown category "None"
+        if strict and missing:
+            raise ValueError(f"Missing value(s) for required field(s): {missing}")
+
+        X = np.zeros((n_rows, self.n_features), dtype=np.uint8)
+        if n_rows == 0:
+            return X
+
+        rows = np.arange(n_rows)
+        for col in self.raw_features:
+            if col not in columns:
+                continue  # absent column (non-strict): baseline category
+            keys, codes = self._keys[col], self._codes[col]
+            values = columns[col]
+            pos = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+            found = keys[pos] == values
+            if strict and not found.all():
+                unknown = sorted(set(values[~found].tolist()))
+                raise ValueError(f"Unknown value(s) for {col}: {unknown}")
+            idx = np.where(found, codes[pos], -1)
+            hit = idx >= 0
+            X[rows[hit], idx[hit]] = 1
+        return X
+
+    def transform_frame(self, df, strict=True):
+        """Same as transform, but returns the boolean dummy DataFrame used for training."""
+        import pandas as pd
+
+        X = self.transform(df, strict=strict)
+        return pd.DataFrame(X.astype(bool), columns=self.feature_names, index=df.index)
+
+    def encode_features(self, records):
+        """Lay out already-dummied feature dicts in the fixed training column order."""
+        X = np.zeros((len(records), self.n_features), dtype=np.uint8)
+        for i, record in enumerate(records):
+            missing = self.feature_index.keys() - record.keys()
+            if missing:
+                raise ValueError(f"Missing feature columns: {sorted(missing)}")
+            X[i] = [record[name] for name in self.feature_names]
+        return X
+
+    def to_dict(self):
+        return {
+            "raw_features": self.raw_features,
+            "categories": self.categories,
+            "feature_names": self.feature_names,
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            spec = json.load(f)
+        encoder = cls(spec["categories"], spec["raw_features"])
+        if encoder.feature_names != spec["feature_names"]:
+            raise ValueError(f"Encoder spec at {path} is inconsistent with its categories")
+        return encoder
@@ -0,0 +1,264 @@
+import json
+import os
+import shutil
+import numpy as np
+
+from deployment.bitset import WORD_BITS
+
+FLAT_FOREST_DIR = "flat_forest"
+BACKENDS = ("sklearn", "flat")
+
+
+class FlatForest:
+    """A fitted tree ensemble flattened into one set of contiguous arrays.
+
+    All trees share the node arrays; ``roots`` holds each tree's first
+    node. Leaves point to themselves, so a batch of rows walks every tree
+    at once: one gather-compare-step per tree level, with no per-call
+    input validation or per-estimator dispatch.
+
+    sklearn compares float32 inputs against float64 thresholds; storing
+    each threshold rounded *down* to float32 keeps every comparison's
+    outcome while halving the bytes gathered per level. Probabilities
+    match ``predict_proba`` up to float rounding in the sum over trees.
+
+    Files (memory-mapped on load)::
+
+        feature.npy     (n_nodes,) int32              split feature, 0 on leaves
+        threshold.npy   (n_nodes,) float32            go left when x <= threshold
+        children.npy    (n_nodes, 2) int32            left, right child; the node itself on leaves
+        value.npy       (n_classes, n_nodes) float64  class probabilities per node
+        roots.npy       (n_trees,) int32
+        meta.json       classes, feature names, depth, model sha256
+    """
+
+    ARRAYS = ("feature", "threshold", "children", "value", "roots")
+    # Rows per traversal block; keeps the (rows, trees) node array cache-resident
+    BLOCK_ROWS = 256
+
+    def __init__(self, feature, threshold, children, value, roots, classes, feature_names, max_depth,
+                 model_sha256=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.max_depth = max_depth
+        self.model_sha256 = model_sha256
+        self._bit_splits = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model, model_sha256=None):
+        """Flatten a fitted RandomForest / ExtraTrees classifier (or a single decision tree)."""
+        estimators = getattr(model, "estimators_", [model])
+        if not all(hasattr(est, "tree_") for est in estimators):
+            raise TypeError(f"{type(model).__name__} is not a tree ensemble that can be flattened")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError("Only single-output classifiers can be flattened")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n, dtype=np.int32)
+
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            children.append(np.column_stack([
+                np.where(leaf, own, tree.children_left + offset),
+                np.where(leaf, own, tree.children_right + offset),
+            ]).astype(np.int32))
+            # Per-node class fractions, as DecisionTreeClassifier.predict_proba normalizes them
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=round_down_float32(np.concatenate(thresholds)),
+            children=np.concatenate(children),
+            value=np.ascontiguousarray(np.concatenate(values).T),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=model.classes_,
+            feature_names=[str(f) for f in getattr(model, "feature_names_in_", range(model.n_features_in_))],
+            max_depth=int(max_depth),
+            model_sha256=model_sha256,
+        )
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            # DataFrames are reordered to the training layout, like sklearn's name check
+            X = X[list(self.feature_names_in_)]
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}; expected (n_rows, {self.n_features_in_})")
+        return X
+
+    def leaves(self, X):
+        """(n_rows, n_trees) leaf node reached by each row in each tree."""
+        return self._in_blocks(self._walk, self._as_matrix(X))
+
+    def _in_blocks(self, walk, X):
+        if len(X) <= self.BLOCK_ROWS:
+            return walk(X)
+        return np.concatenate([walk(X[i:i + self.BLOCK_ROWS]) for i in range(0, len(X), self.BLOCK_ROWS)])
+
+    def _walk(self, X):
+        # Row-major offsets into the flattened block; children are interleaved (left, right)
+        offsets = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        flat_x = X.ravel()
+        children = self.children.reshape(-1)
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            go_right = flat_x[offsets + self.feature[node]] > self.threshold[node]
+            node = children[2 * node + go_right]
+        return node
+
+    def _average(self, leaves):
+        # One contiguous gather per class is far cheaper than gathering (rows, trees, classes)
+        return np.column_stack([value[leaves].sum(axis=1) for value in self.value]) / self.n_trees
+
+    def predict_proba(self, X):
+        return self._average(self.leaves(X))
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    # ——— Packed 0/1 inputs (deployment/bitset.py) ———
+    @property
+    def binary_splits(self):
+        """True when every split is a 0/1 test (0 <= threshold < 1), so packed bits can be scored."""
+        return self._splits_on_bits() is not None
+
+    def _splits_on_bits(self):
+        # Per node: the word holding its feature's bit and the bit's position in it
+        if self._bit_splits is None:
+            internal = self.children[:, 0] != np.arange(self.n_nodes)
+            thresholds = self.threshold[internal]
+            if not ((thresholds >= 0.0) & (thresholds < 1.0)).all():
+                self._bit_splits = False
+            else:
+                feature = np.asarray(self.feature, dtype=np.int64)
+                self._bit_splits = (feature // WORD_BITS, feature % WORD_BITS)
+        return self._bit_splits or None
+
+    def leaves_bits(self, bits):
+        """leaves() for rows packed by bitset.pack(): a split is a shift and mask, no float compare."""
+        if self._splits_on_bits() is None:
+            raise ValueError("Forest splits on non-binary thresholds; score unpacked rows instead")
+        # Signed view keeps index arithmetic in int64; the shifted-out sign never reaches bit 0
+        return self._in_blocks(self._walk_bits, np.ascontiguousarray(bits, dtype="<u8").view(np.int64))
+
+    def _walk_bits(self, bits):
+        word, shift = self._splits_on_bits()
+        children = self.children.reshape(-1)
+        node = np.broadcast_to(self.roots, (len(bits), self.n_trees))
+        if bits.shape[1] == 1:
+            # Up to 64 features: every row is one word, no per-node word lookup
+            for _ in range(self.max_depth):
+                node = children[2 * node + ((bits >> shift[node]) & 1)]
+            return node
+        offsets = (np.arange(len(bits), dtype=np.int64) * bits.shape[1])[:, None]
+        flat_bits = bits.ravel()
+        for _ in range(self.max_depth):
+            node = children[2 * node + ((flat_bits[offsets + word[node]] >> shift[node]) & 1)]
+        return node
+
+    def predict_proba_bits(self, bits):
+        return self._average(self.leaves_bits(bits))
+
+    # ——— Storage ———
+    def save(self, directory):
+        """Write the arrays as .npy files; written to a temporary directory and renamed into place."""
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = f"{directory}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name in self.ARRAYS:
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({
+                "model_sha256": self.model_sha256,
+                "classes": self.classes_.tolist(),
+                "feature_names": self.feature_names_in_.tolist(),
+                "max_depth": self.max_depth,
+                "n_trees": self.n_trees,
+                "n_nodes": self.n_nodes,
+            }, f, indent=2)
+        if os.path.isdir(directory):
+            old = f"{directory}.old"
+            os.replace(directory, old)
+            os.replace(staging, directory)
+            # Servers that mapped the old files keep reading them until they reload
+            shutil.rmtree(old)
+        else:
+            os.replace(staging, directory)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS}
+        return cls(classes=meta["classes"], feature_names=meta["feature_names"], max_depth=meta["max_depth"],
+                   model_sha256=meta.get("model_sha256"), **arrays)
+
+    def stats(self):
+        return {"trees": self.n_trees, "nodes": self.n_nodes, "max_depth": self.max_depth,
+                "bytes": sum(getattr(self, name).nbytes for name in self.ARRAYS)}
+
+
+def round_down_float32(values):
+    """Largest float32 <= each value: for float32 x, x <= t exactly when x <= round_down_float32(t)."""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def load_scorer(model, backend="sklearn", model_path=None, model_sha256=None):
+    """The object that scores for `model`: the model itself, or its FlatForest.
+
+    For the flat backend a forest exported next to `model_path` (see
+    scripts/export_flat_forest.py) is memory-mapped when its sha256 matches;
+    otherwise the model is flattened in memory. Models that can't be
+    flattened keep the sklearn backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MODEL_BACKEND {backend!r}; expected one of {BACKENDS}")
+    if backend == "sklearn":
+        return model
+
+    if model_path is not None:
+        forest_dir = os.path.join(os.path.dirname(model_path), FLAT_FOREST_DIR)
+        if os.path.isdir(forest_dir):
+            forest = FlatForest.load(forest_dir)
+            if model_sha256 is not None and forest.model_sha256 == model_sha256:
+                return forest
+            print(f"⚠️ Ignoring stale flat forest at {forest_dir}")
+    try:
+        return FlatForest.from_sklearn(model, model_sha256=model_sha256)
+    except TypeError as e:
+        print(f"⚠️ {e}; scoring with sklearn")
+        return model
@@ -0,0 +1,177 @@
+import time
+
+try:
+    import prometheus_client
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+STAGES = ("decode", "encode", "inference", "explain", "serialize")
+
+# Seconds; single-record stages run in tens of microseconds, SHAP in up to seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class ServingMetrics:
+    """Prometheus metrics for the serving API.
+
+    The per-request cost is a handful of perf_counter() calls and
+    histogram observations on label children resolved up front. Cache
+    hit counts, the serving model version and the micro-batch queue are
+    read from their owners only when /metrics is scraped, and process
+    RSS / CPU come from prometheus_client's process collector.
+    """
+
+    def __init__(self, bundle_fn, batcher=None, registry=None):
+        self.registry = registry if registry is not None else prometheus_client.CollectorRegistry()
+        self.bundle_fn = bundle_fn
+        self.batcher = batcher
+
+        self.requests = prometheus_client.Counter(
+            "fraud_api_requests", "HTTP requests by route and status",
+            ["endpoint", "method", "status"], registry=self.registry)
+        self.request_seconds = prometheus_client.Histogram(
+            "fraud_api_request_duration_seconds", "End-to-end request latency by route",
+            ["endpoint"], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.stage_seconds = prometheus_client.Histogram(
+            "fraud_api_stage_duration_seconds", "Latency of each request-handling stage",
+            ["endpoint", "stage"], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.batch_size = prometheus_client.Histogram(
+            "fraud_api_batch_size", "Records per batch request or micro-batch",
+            ["endpoint"], buckets=BATCH_SIZE_BUCKETS, registry=self.registry)
+        self.predictions = prometheus_client.Counter(
+            "fraud_api_predictions", "Scored records by model version and predicted label",
+            ["model_version", "prediction"], registry=self.registry)
+
+        prometheus_client.ProcessCollector(registry=self.registry)
+        self.registry.register(_ScrapeTimeCollector(self))
+
+        self._stages = {}
+        self._prediction_children = {}
+
+    def timer(self, endpoint):
+        """A StageTimer for one request to `endpoint`, starting now."""
+        stages = self._stages.get(endpoint)
+        if stages is None:
+            stages = {stage: self.stage_seconds.labels(endpoint, stage) for stage in STAGES}
+            self._stages[endpoint] = stages
+        return StageTimer(stages)
+
+    def observe_batch(self, endpoint, size):
+        self.batch_size.labels(endpoint).observe(size)
+
+    def count_predictions(self, version, labels):
+        children = self._prediction_children.get(version)
+        if children is None:
+            children = (self.predictions.labels(version, "0"), self.predictions.labels(version, "1"))
+            self._prediction_children[version] = children
+        fraud = int((labels == 1).sum())
+        if fraud:
+            children[1].inc(fraud)
+        if len(labels) > fraud:
+            children[0].inc(len(labels) - fraud)
+
+    def render(self):
+        """The exposition payload and its content type."""
+        return prometheus_client.generate_latest(self.registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+class StageTimer:
+    """Times consecutive stages: each lap() records the time since the previous one."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage].observe(now - self.last)
+        self.last = now
+
+
+class NullMetrics:
+    """Stand-in used when metrics are disabled or prometheus_client isn't installed."""
+
+    def timer(self, endpoint):
+        return _NULL_TIMER
+
+    def observe_batch(self, endpoint, size):
+        pass
+
+    def count_predictions(self, version, labels):
+        pass
+
+
+class _NullTimer:
+    def lap(self, stage):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _ScrapeTimeCollector:
+    """Model version, cache and micro-batch queue metrics, read when /metrics is scraped."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def collect(self):
+        bundle = self.metrics.bundle_fn()
+        info = GaugeMetricFamily("fraud_api_model_info", "Model version currently serving",
+                                 labels=["model_version", "backend"])
+        hits = CounterMetricFamily("fraud_api_cache_hits", "Lookups answered from a cache",
+                                   labels=["cache", "model_version"])
+        misses = CounterMetricFamily("fraud_api_cache_misses", "Lookups that missed a cache",
+                                     labels=["cache", "model_version"])
+        size = GaugeMetricFamily("fraud_api_cache_entries", "Entries held by a cache",
+                                 labels=["cache", "model_version"])
+        if bundle is not None:
+            version = str(bundle.version)
+            info.add_metric([version, bundle.backend], 1)
+            caches = {"explain": bundle.explain_cache.stats()}
+            if bundle.profile_table is not None:
+                caches["profile_table"] = dict(bundle.profile_table.stats(), size=len(bundle.profile_table))
+            for name, stats in caches.items():
+                hits.add_metric([name, version], stats["hits"])
+                misses.add_metric([name, version], stats["misses"])
+                size.add_metric([name, version], stats["size"])
+        yield from (info, hits, misses, size)
+
+        batcher = self.metrics.batcher
+        if batcher is not None:
+            stats = batcher.stats()
+            yield GaugeMetricFamily("fraud_api_microbatch_queue_depth", "Records waiting for a micro-batch",
+                                    value=stats["queue_depth"])
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them end to end, labelled by route template."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            self.metrics.requests.labels(endpoint, scope["method"], status[0]).inc()
+            self.metrics.request_seconds.labels(endpoint).observe(time.perf_counter() - start)
@@ -0,0 +1,228 @@
+import hashlib
+import os
+import threading
+import time
+import warnings
+import joblib
+import numpy as np
+
+from deployment.bitset import pack
+from deployment.explain_cache import LRUCache
+from deployment.feature_encoder import FeatureEncoder
+from deployment.forest import FlatForest, load_scorer
+from deployment.profile_table import PROFILE_TABLE_DIR, ProfileTable, profile_keys
+from deployment.schema import FeatureSchema
+
+TOP_K = 10
+
+# Inputs are laid out in the model's column order by the encoder, so the
+# per-call "no feature names" warning for plain arrays carries no signal.
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def class_shap_values(shap_vals_all, class_index):
+    """(n_rows, n_features) SHAP values for one class, for both shap output layouts."""
+    if isinstance(shap_vals_all, list):
+        return shap_vals_all[class_index]
+    return shap_vals_all[..., class_index]
+
+
+def top_k_abs(values, k):
+    """Column indices of the k largest |values| per row, largest first."""
+    k = min(k, values.shape[1])
+    magnitude = np.abs(values)
+    idx = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(magnitude, idx, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1)
+
+
+class ModelBundle:
+    """A loaded model with its feature encoder and a lazily built SHAP explainer.
+
+    ``shap`` is only imported when the explainer is first needed, so
+    processes that never serve /explain never pay for it. Probabilities
+    come from ``scorer``: the sklearn model itself, or its FlatForest when
+    the flat backend is selected (SHAP always uses the sklearn model).
+    """
+
+    def __init__(self, model, encoder, version=None, metadata=None, load_seconds=None,
+                 explain_cache_size=0, profile_table=None, scorer=None):
+        if list(model.feature_names_in_) != encoder.feature_names:
+            raise RuntimeError("Feature encoder does not match the model's training columns")
+        self.model = model
+        self.scorer = scorer if scorer is not None else model
+        self.encoder = encoder
+        self.schema = FeatureSchema(encoder.feature_names)
+        self.version = version
+        self.metadata = metadata or {}
+        self.fraud_index = list(model.classes_).index(1)
+        self.load_seconds = load_seconds
+
+        self._explainer = None
+        self._explainer_lock = threading.Lock()
+        self._explainer_loading = False
+        self.explainer_load_seconds = None
+        # Explanations keyed on the one-hot row; many claims share a profile
+        self.explain_cache = LRUCache(explain_cache_size)
+        # Optional offline-precomputed answers for known profiles
+        self.profile_table = profile_table
+
+    @classmethod
+    def load(cls, model_path, encoder_path, version=None, metadata=None, use_profile_table=True,
+             backend="sklearn", **kwargs):
+        start = time.perf_counter()
+        model = joblib.load(model_path)
+        encoder = FeatureEncoder.load(encoder_path)
+        model_sha256 = file_sha256(model_path)
+        scorer = load_scorer(model, backend, model_path=model_path, model_sha256=model_sha256)
+
+        profile_table = None
+        table_dir = os.path.join(os.path.dirname(model_path), PROFILE_TABLE_DIR)
+        if use_profile_table and os.path.isdir(table_dir):
+            profile_table = ProfileTable(table_dir)
+            if (profile_table.model_sha256 != model_sha256
+                    or profile_table.meta["feature_names"] != encoder.feature_names):
+                print(f"⚠️ Ignoring stale profile table at {table_dir}")
+                profile_table = None
+
+        return cls(model, encoder, version=version, metadata=metadata,
+                   load_seconds=time.perf_counter() - start, profile_table=profile_table, scorer=scorer, **kwargs)
+
+    @property
+    def backend(self):
+        return "flat" if isinstance(self.scorer, FlatForest) else "sklearn"
+
+    @property
+    def explainer_loaded(self):
+        return self._explainer is not None
+
+    def get_explainer(self):
+        """Return the SHAP explainer, building it on first use (thread-safe)."""
+        if self._explainer is None:
+            with self._explainer_lock:
+                if self._explainer is None:
+                    self._explainer_loading = True
+                    try:
+                        start = time.perf_counter()
+                        import shap
+                        self._explainer = shap.TreeExplainer(self.model)
+                        self.explainer_load_seconds = time.perf_counter() - start
+                    finally:
+                        self._explainer_loading = False
+        return self._explainer
+
+    def warm_explainer(self):
+        """Build the explainer on a background thread."""
+        thread = threading.Thread(target=self.get_explainer, name="shap-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def score(self, X):
+        """Predicted labels and fraud probabilities, from the profile table where possible."""
+        labels = np.empty(len(X), dtype=self.model.classes_.dtype)
+        fraud_proba = np.empty(len(X), dtype=np.float64)
+
+        # Pack the 0/1 rows once: the profile key and the flat forest's fast path both use the bits
+        score_bits = isinstance(self.scorer, FlatForest) and self.scorer.binary_splits
+        bits = pack(X) if score_bits or self.profile_table is not None else None
+
+        live = np.arange(len(X))
+        if self.profile_table is not None:
+            rows = self.profile_table.lookup_bits(bits)
+            hit = rows >= 0
+            labels[hit] = self.model.classes_.take(self.profile_table.pred[rows[hit]])
+            fraud_proba[hit] = self.profile_table.proba[rows[hit]]
+            live = live[~hit]
+
+        if len(live):
+            proba = self.scorer.predict_proba_bits(bits[live]) if score_bits else self.scorer.predict_proba(X[live])
+            labels[live] = self.model.classes_.take(proba.argmax(axis=1))
+            fraud_proba[live] = proba[:, self.fraud_index]
+        return labels, fraud_proba
+
+    def explain_arrays(self, X, k=TOP_K):
+        """Vectorized explanation of every row of X.
+
+        Returns (predicted class index, fraud probability, top-k feature
+        indices, their SHAP values for the predicted class).
+        """
+        proba = self.scorer.predict_proba(X)
+        pred_idx = proba.argmax(axis=1)
+
+        shap_vals_all = self.get_explainer().shap_values(X)
+        # SHAP values of each row's predicted class
+        shap_vals = np.stack([
+            class_shap_values(shap_vals_all, c)[j] for j, c in enumerate(pred_idx)
+        ])
+        top_idx = top_k_abs(shap_vals, k)
+        top_vals = np.take_along_axis(shap_vals, top_idx, axis=1)
+        return pred_idx, proba[:, self.fraud_index], top_idx, top_vals
+
+    def explain(self, X, k=TOP_K):
+        """Prediction, fraud probability and top-k SHAP attributions for every row of X.
+
+        Rows are answered from the profile table, then the LRU cache; the
+        rest are deduplicated and explained with one explain_arrays call.
+        """
+        keys = profile_keys(X)
+        results = [None] * len(X)
+        if self.profile_table is not None and self.profile_table.k >= k:
+            for i, row in enumerate(self.profile_table.lookup_keys(keys)):
+                if row >= 0:
+                    result = self.profile_table.explanation(row, self.encoder.feature_names, self.model.classes_)
+                    result["top_shap_values"] = result["top_shap_values"][:k]
+                    results[i] = result
+
+        pending = {}
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                results[i] = self.explain_cache.get((key, k))
+                if results[i] is None:
+                    pending.setdefault(key, []).append(i)
+
+        if pending:
+            rows = np.array([positions[0] for positions in pending.values()])
+            pred_idx, fraud_proba, top_idx, top_vals = self.explain_arrays(X[rows], k)
+
+            names = self.encoder.feature_names
+            for j, (key, positions) in enumerate(pending.items()):
+                result = {
+                    "prediction": int(self.model.classes_[pred_idx[j]]),
+                    "probability": float(fraud_proba[j]),
+                    "top_shap_values": [
+                        {"feature": names[f], "shap_value": float(v)}
+                        for f, v in zip(top_idx[j], top_vals[j])
+                    ],
+                }
+                self.explain_cache.put((key, k), result)
+                for i in positions:
+                    results[i] = result
+        return results
+
+    def warm_up(self, explainer=False):
+        """Exercise the scoring path (and optionally build the explainer) before serving."""
+        self.scorer.predict_proba(np.zeros((1, self.encoder.n_features), dtype=np.uint8))
+        if explainer:
+            self.get_explainer()
+
+    def status(self):
+        return {
+            "version": self.version,
+            "model": {"loaded": True, "load_seconds": self.load_seconds, "backend": self.backend},
+            "encoder": {"loaded": True, "n_features": self.encoder.n_features},
+            "explainer": {
+                "loaded": self.explainer_loaded,
+                "loading": self._explainer_loading,
+                "load_seconds": self.explainer_load_seconds,
+            },
+            "explain_cache": self.explain_cache.stats(),
+            "profile_table": self.profile_table.stats() if self.profile_table is not None else None,
+        }
@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+
+from deployment.model_bundle import ModelBundle, file_sha256
+
+MODEL_FILE = "model.pkl"
+ENCODER_FILE = "encoder.json"
+METADATA_FILE = "metadata.json"
+PIN_FILE = "pinned.json"
+
+
+class ModelRegistry:
+    """Versioned local model store.
+
+    Layout::
+
+        <root>/<version>/model.pkl
+        <root>/<version>/encoder.json
+        <root>/<version>/metadata.json   # feature list, metrics, sha256, ...
+        <root>/pinned.json               # optional, overrides "latest"
+
+    Versions sort chronologically by name. A version directory is written
+    under a temporary name and renamed into place, so readers never see a
+    half-written artifact.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".")
+            and os.path.isfile(os.path.join(self.root, name, METADATA_FILE))
+        )
+
+    def latest(self):
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def metadata(self, version):
+        with open(os.path.join(self.root, version, METADATA_FILE)) as f:
+            return json.load(f)
+
+    def paths(self, version):
+        version_dir = os.path.join(self.root, version)
+        return os.path.join(version_dir, MODEL_FILE), os.path.join(version_dir, ENCODER_FILE)
+
+    # ——— Pinning ———
+    def pinned(self):
+        try:
+            with open(os.path.join(self.root, PIN_FILE)) as f:
+                return json.load(f).get("version")
+        except FileNotFoundError:
+            return None
+
+    def pin(self, version):
+        if version not in self.versions():
+            raise KeyError(f"Unknown model version: {version}")
+        self._write_json_atomic(os.path.join(self.root, PIN_FILE), {"version": version})
+
+    def unpin(self):
+        try:
+            os.remove(os.path.join(self.root, PIN_FILE))
+        except FileNotFoundError:
+            pass
+
+    def active_version(self):
+        """The pinned version if there is one, otherwise the newest."""
+        pinned = self.pinned()
+        if pinned is not None and pinned in self.versions():
+            return pinned
+        return self.latest()
+
+    def previous_version(self, version):
+        versions = self.versions()
+        if version not in versions or versions.index(version) == 0:
+            return None
+        return versions[versions.index(version) - 1]
+
+    # ——— Publishing / loading ———
+    def publish(self, model, encoder_path, metrics=None, params=None):
+        """Store a fitted model with its encoder and return the new version name."""
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            model_path = os.path.join(staging, MODEL_FILE)
+            joblib.dump(model, model_path)
+            shutil.copyfile(encoder_path, os.path.join(staging, ENCODER_FILE))
+
+            sha256 = file_sha256(model_path)
+            created_at = datetime.now(timezone.utc)
+            version = f"{created_at:%Y%m%d-%H%M%S%f}-{sha256[:8]}"
+            metadata = {
+                "version": version,
+                "created_at": created_at.isoformat(),
+                "sha256": sha256,
+                "model_class": type(model).__name__,
+                "feature_names": [str(f) for f in getattr(model, "feature_names_in_", [])],
+                "metrics": metrics or {},
+                "params": params or {},
+            }
+            self._write_json_atomic(os.path.join(staging, METADATA_FILE), metadata)
+            os.rename(staging, os.path.join(self.root, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def load_bundle(self, version, **kwargs):
+        model_path, encoder_path = self.paths(version)
+        metadata = self.metadata(version)
+        if metadata.get("sha256") and file_sha256(model_path) != metadata["sha256"]:
+            raise ValueError(f"Model artifact for {version} does not match its recorded sha256")
+        return ModelBundle.load(model_path, encoder_path, version=version, metadata=metadata, **kwargs)
+
+    @staticmethod
+    def _write_json_atomic(path, payload):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=2, default=str)
+        os.replace(tmp_path, path)
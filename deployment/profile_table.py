@@ -0,0 +1,145 @@
+import json
+import os
+import numpy as np
+
+from deployment.bitset import pack, row_keys
+
+PROFILE_TABLE_DIR = "profile_table"
+KEY_FORMAT = "bitset64"
+
+
+def profile_keys(X):
+    """One hashable key per row of a 0/1 feature matrix (the row's packed bitset words)."""
+    return [row.tobytes() for row in pack(X)]
+
+
+class ProfileTable:
+    """Precomputed predictions and top-k SHAP attributions per claim profile.
+
+    Every model input is a one-hot vector over a dozen grouped categoricals,
+    so the profiles seen in practice are few and heavily repeated. The
+    arrays live in ``.npy`` files next to the model and are memory-mapped;
+    keys are kept sorted in memory, so a whole batch is looked up with one
+    vectorized binary search.
+
+    Files::
+
+        keys.npy       (n, n_words) uint64  feature bitsets (deployment/bitset.py)
+        pred.npy       (n,) int8            predicted class index
+        proba.npy      (n,) float64         fraud probability, exactly as live scoring returns it
+        top_idx.npy    (n, k) int16         feature index, largest |SHAP| first
+        top_vals.npy   (n, k) float32       SHAP value of the predicted class
+        meta.json      model sha256, feature names, k
+    """
+
+    def __init__(self, directory, mmap=True):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        mmap_mode = "r" if mmap else None
+        load = lambda name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+        self.keys = load("keys")
+        self.pred = load("pred")
+        self.proba = load("proba")
+        self.top_idx = load("top_idx")
+        self.top_vals = load("top_vals")
+        keys = np.asarray(self.keys)
+        if self.meta.get("key_format") != KEY_FORMAT:
+            # Tables built before bitset keys stored np.packbits rows
+            n_features = len(self.meta["feature_names"])
+            keys = pack(np.unpackbits(keys, axis=1, count=n_features))
+        keys = row_keys(keys)
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sorted_keys)
+
+    @property
+    def model_sha256(self):
+        return self.meta.get("model_sha256")
+
+    @property
+    def k(self):
+        return self.meta["k"]
+
+    def lookup(self, X):
+        """Table row for each row of X, or -1 where the profile is unseen."""
+        return self.lookup_bits(pack(X))
+
+    def lookup_bits(self, bits):
+        """lookup() for rows already packed with bitset.pack()."""
+        return self._search(row_keys(bits))
+
+    def lookup_keys(self, keys):
+        """lookup() for profile_keys() output."""
+        if not keys:
+            return self._search(np.empty(0, dtype=self._sorted_keys.dtype))
+        return self._search(np.frombuffer(b"".join(keys), dtype=self._sorted_keys.dtype))
+
+    def _search(self, queries):
+        rows = np.full(len(queries), -1, dtype=np.int64)
+        if len(self._sorted_keys):
+            pos = np.minimum(np.searchsorted(self._sorted_keys, queries), len(self._sorted_keys) - 1)
+            found = self._sorted_keys[pos] == queries
+            rows[found] = self._order[pos[found]]
+        found = int((rows >= 0).sum())
+        self.hits += found
+        self.misses += len(rows) - found
+        return rows
+
+    def explanation(self, row, feature_names, classes):
+        return {
+            "prediction": int(classes[self.pred[row]]),
+            "probability": float(self.proba[row]),
+            "top_shap_values": [
+                {"feature": feature_names[f], "shap_value": float(v)}
+                for f, v in zip(self.top_idx[row], self.top_vals[row])
+            ],
+        }
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "profiles": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    @classmethod
+    def build(cls, bundle, X, directory, model_sha256=None, k=None, chunk_size=2048):
+        """Precompute the table for the distinct profiles in X and write it to ``directory``."""
+        from deployment.model_bundle import TOP_K
+
+        k = k or TOP_K
+        profiles = np.unique(np.asarray(X, dtype=np.uint8), axis=0)
+        n = len(profiles)
+
+        pred = np.empty(n, dtype=np.int8)
+        proba = np.empty(n, dtype=np.float64)
+        top_idx = np.empty((n, k), dtype=np.int16)
+        top_vals = np.empty((n, k), dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            chunk = bundle.explain_arrays(profiles[start:stop], k)
+            pred[start:stop], proba[start:stop], top_idx[start:stop], top_vals[start:stop] = chunk
+
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "keys.npy"), pack(profiles))
+        np.save(os.path.join(directory, "pred.npy"), pred)
+        np.save(os.path.join(directory, "proba.npy"), proba)
+        np.save(os.path.join(directory, "top_idx.npy"), top_idx)
+        np.save(os.path.join(directory, "top_vals.npy"), top_vals)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({
+                "model_sha256": model_sha256,
+                "feature_names": bundle.encoder.feature_names,
+                "key_format": KEY_FORMAT,
+                "k": k,
+                "n_profiles": n,
+            }, f, indent=2)
+        return cls(directory)
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class SchemaError(ValueError):
+    """A feature record that doesn't match the model's input schema."""
+
+
+class FeatureSchema:
+    """Strict decoder for already-dummied feature records.
+
+    Generated from the model's training columns: a record must carry
+    exactly those keys, each with the value 0 or 1 (ints or bools; no
+    floats or strings). Records are decoded straight into one
+    preallocated uint8 buffer in the training column order, so no
+    intermediate DataFrame or per-row list is built, and a malformed
+    record is rejected at its first bad key or value.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+        self.n_features = len(self.feature_names)
+
+    def decode(self, records):
+        """(len(records), n_features) uint8 matrix for a list of feature dicts."""
+        n = self.n_features
+        buffer = bytearray(len(records) * n)
+        for i, record in enumerate(records):
+            self._fill(record, buffer, i * n, i)
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(len(records), n)
+
+    def decode_one(self, record):
+        return self.decode([record])
+
+    def _fill(self, record, buffer, offset, position):
+        if not isinstance(record, dict):
+            raise SchemaError(f"Record {position} must be an object of feature values")
+        if len(record) != self.n_features:
+            self._raise_key_error(record, position)
+        index = self.index
+        for name, value in record.items():
+            i = index.get(name)
+            if i is None:
+                self._raise_key_error(record, position)
+            # bool is an int subclass; 1.0, "1" and 2 are all rejected
+            if value.__class__ not in (int, bool) or (value != 0 and value != 1):
+                raise SchemaError(f"Record {position}: feature {name!r} must be 0 or 1, got {value!r}")
+            buffer[offset + i] = value
+
+    def _raise_key_error(self, record, position):
+        missing = [name for name in self.feature_names if name not in record]
+        unknown = sorted(str(name) for name in record if name not in self.index)
+        problems = []
+        if missing:
+            problems.append(f"missing feature columns: {missing}")
+        if unknown:
+            problems.append(f"unknown feature columns: {unknown}")
+        raise SchemaError(f"Record {position}: " + "; ".join(problems))
+
+    def json_schema(self):
+        """JSON Schema of one feature record, for the OpenAPI docs."""
+        return {
+            "title": "Features",
+            "type": "object",
+            "properties": {name: {"type": "integer", "enum": [0, 1]} for name in self.feature_names},
+            "required": list(self.feature_names),
+            "additionalProperties": False,
+        }
@@ -1,50 +1,436 @@
 import os
-from fastapi import FastAPI
+import hmac
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-import joblib
-import pandas as pd
-import shap
+import numpy as np
+
+# orjson parses request bodies and renders responses several times faster
+# than the stdlib codec; the stdlib is the fallback when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    class FastJSONResponse(JSONResponse):
+        def render(self, content):
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    json_loads = json.loads
+    FastJSONResponse = JSONResponse
+
+from deployment.batching import MicroBatcher
+from deployment.metrics import MetricsMiddleware, NullMetrics, ServingMetrics, prometheus_client
+from deployment.model_bundle import ModelBundle, TOP_K
+from deployment.model_registry import ModelRegistry, file_sha256
+
+PROCESS_START = time.perf_counter()
 
 # ——— Resolve the absolute path to your trained model ———
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+ENCODER_PATH = os.path.join(BASE_DIR, "models", "encoder.json")
+
+# Versioned models published by scripts/train_model.py. When the registry is
+# empty the server falls back to MODEL_PATH / ENCODER_PATH.
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(BASE_DIR, "models", "registry"))
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10"))
+# Required by the /admin/model write endpoints; they refuse every call when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Build the SHAP explainer in the background right after startup instead of
+# on the first /explain call
+PRELOAD_EXPLAINER = os.getenv("PRELOAD_EXPLAINER", "0").lower() in ("1", "true", "yes")
+
+# Number of explained claim profiles kept per model version (0 disables)
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "10000"))
+
+# "sklearn" scores with the pickled model; "flat" with its flattened NumPy
+# forest (see deployment/forest.py), memory-mapped when exported by
+# scripts/export_flat_forest.py
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "sklearn").lower()
+
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+
+# The model is loaded by the lifespan hook (or on first use when the app runs
+# without one, e.g. a bare TestClient); nothing heavy happens at import time.
+# Requests grab the current bundle once and use it throughout, so swapping
+# in a new version never affects a request that is already in flight.
+_bundle = None
+_bundle_lock = threading.Lock()
+_ready_seconds = None
+_stop_watcher = threading.Event()
+
+def _load_bundle(version):
+    if version is None:
+        return ModelBundle.load(MODEL_PATH, ENCODER_PATH, version=f"local-{file_sha256(MODEL_PATH)[:12]}",
+                                explain_cache_size=EXPLAIN_CACHE_SIZE, backend=MODEL_BACKEND)
+    return registry.load_bundle(version, explain_cache_size=EXPLAIN_CACHE_SIZE, backend=MODEL_BACKEND)
+
+def refresh_model():
+    """Load, warm up and swap in the registry's active version if it changed."""
+    global _bundle, _ready_seconds
+    with _bundle_lock:
+        target = registry.active_version()
+        current = _bundle
+        if current is not None and (target is None or target == current.version):
+            return current
 
-# Load the model
-model = joblib.load(MODEL_PATH)
+        bundle = _load_bundle(target)
+        # Keep /explain latency flat across the swap if it was already in use
+        bundle.warm_up(explainer=current is not None and current.explainer_loaded)
+        _bundle = bundle
+        if _ready_seconds is None:
+            _ready_seconds = time.perf_counter() - PROCESS_START
+        if current is not None:
+            print(f"✅ Swapped model {current.version} -> {bundle.version}")
+        return bundle
 
-# Initialize SHAP explainer for a tree-based model
-explainer = shap.TreeExplainer(model)
+def get_bundle():
+    bundle = _bundle
+    if bundle is None:
+        bundle = refresh_model()
+    return bundle
+
+def _watch_registry():
+    while not _stop_watcher.wait(MODEL_REGISTRY_POLL_SECONDS):
+        try:
+            refresh_model()
+        except Exception as e:
+            # Keep serving the current model; the next poll retries
+            print(f"⚠️ Model reload failed: {e}")
+
+def rss_bytes():
+    """Current resident set size of this worker process."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+# ——— Optional micro-batching for /predict ———
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+MICROBATCH_MAX_BATCH = int(os.getenv("MICROBATCH_MAX_BATCH", "64"))
+
+# Prometheus metrics at /metrics (needs prometheus_client)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
 
 # ——— FastAPI app and schemas ———
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    bundle = await run_in_threadpool(get_bundle)
+    if PRELOAD_EXPLAINER:
+        bundle.warm_explainer()
+
+    _stop_watcher.clear()
+    if MODEL_REGISTRY_POLL_SECONDS > 0:
+        threading.Thread(target=_watch_registry, name="model-registry-watcher", daemon=True).start()
+    yield
+    _stop_watcher.set()
+    if batcher is not None:
+        await batcher.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# /predict and /explain take either the already-dummied model features or a
+# raw fraud_oracle.csv-style claim. The body is decoded by hand rather than
+# through a pydantic model: the features go straight from the parsed JSON
+# into the model's input row (see deployment/schema.py).
+PREDICTION_REQUEST_KEYS = {"features", "claim"}
+PREDICTION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/PredictionRequest"}}},
+    }
+}
+
+class PinRequest(BaseModel):
+    version: str
+
+def parse_batch_body(body, content_type):
+    """Decode a /predict_batch body (JSON array or NDJSON) into a list of records."""
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            records = [json_loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = json_loads(body) if body.strip() else []
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+
+    # Also accept {"records": [...]} for clients that can't send a bare array
+    if isinstance(records, dict) and "records" in records:
+        records = records["records"]
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise HTTPException(status_code=422, detail="Batch body must be a list of records")
+    return records
+
+def encode_records(bundle, records, raw=False):
+    """Encode raw claims or dummy-feature dicts into the model's fixed column layout."""
+    try:
+        return bundle.encoder.transform(records) if raw else bundle.schema.decode(records)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-class PredictionRequest(BaseModel):
-    features: dict
+def parse_prediction_body(body):
+    """Decode a /predict or /explain body into its {"features": ...} / {"claim": ...} object."""
+    try:
+        payload = json_loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="Body must be an object with 'features' or 'claim'")
+    unknown = payload.keys() - PREDICTION_REQUEST_KEYS
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown request fields: {sorted(unknown)}")
+    return payload
+
+def request_matrix(bundle, payload):
+    if payload.get("claim") is not None:
+        if not isinstance(payload["claim"], dict):
+            raise HTTPException(status_code=422, detail="'claim' must be an object")
+        return encode_records(bundle, [payload["claim"]], raw=True)
+    if payload.get("features") is not None:
+        return encode_records(bundle, [payload["features"]])
+    raise HTTPException(status_code=422, detail="Provide either 'features' or 'claim'")
+
+def score_matrix(bundle, X):
+    """Score all rows with at most one predict_proba call, preserving input order."""
+    if len(X) == 0:
+        return []
+    preds, fraud_proba = bundle.score(X)
+    metrics.count_predictions(bundle.version, preds)
+    return [
+        {"prediction": int(p), "probability": float(q)}
+        for p, q in zip(preds, fraud_proba)
+    ]
+
+def score_queued(items):
+    """Micro-batch scoring: items are (bundle, row) pairs, grouped per model version."""
+    metrics.observe_batch("microbatch", len(items))
+    results = [None] * len(items)
+    groups = {}
+    for i, (bundle, _) in enumerate(items):
+        groups.setdefault(id(bundle), (bundle, []))[1].append(i)
+    for bundle, positions in groups.values():
+        scored = score_matrix(bundle, np.vstack([items[i][1] for i in positions]))
+        for i, result in zip(positions, scored):
+            results[i] = dict(result, model_version=bundle.version)
+    return results
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model admin is disabled; set ADMIN_TOKEN to enable it")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def model_info():
+    bundle = get_bundle()
+    return {
+        "active": bundle.version,
+        "pinned": registry.pinned(),
+        "versions": registry.versions(),
+        "metadata": bundle.metadata,
+    }
+
+batcher = (
+    MicroBatcher(score_queued, max_batch_size=MICROBATCH_MAX_BATCH, max_wait_ms=MICROBATCH_MAX_WAIT_MS)
+    if MICROBATCH_ENABLED else None
+)
+
+# Stage latencies are recorded per route: decode (JSON body -> records),
+# encode (records -> model matrix), inference, explain and serialize. With
+# micro-batching, /predict's inference stage includes the wait for its batch.
+if METRICS_ENABLED and prometheus_client is not None:
+    metrics = ServingMetrics(lambda: _bundle, batcher=batcher)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+else:
+    if METRICS_ENABLED:
+        print("⚠️ prometheus_client is not installed; /metrics is disabled")
+    metrics = NullMetrics()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Insurance Fraud Detection API"}
 
-@app.post("/predict")
-def predict(request: PredictionRequest):
-    input_df = pd.DataFrame([request.features])
-    pred = int(model.predict(input_df)[0])
-    return {"prediction": pred}
+@app.get("/ready")
+def ready():
+    bundle = _bundle
+    components = (
+        bundle.status() if bundle is not None
+        else {"model": {"loaded": False}, "encoder": {"loaded": False}, "explainer": {"loaded": False}}
+    )
+    body = {
+        "ready": bundle is not None,
+        "startup_seconds": _ready_seconds,
+        "rss_bytes": rss_bytes(),
+        "components": components,
+    }
+    # Probes go by status code: 503 keeps traffic away until the model is loaded
+    return body if bundle is not None else FastJSONResponse(body, status_code=503)
 
-@app.post("/explain")
-def explain(request: PredictionRequest):
-    input_df = pd.DataFrame([request.features])
-    pred = int(model.predict(input_df)[0])
+@app.post("/predict", openapi_extra=PREDICTION_REQUEST_BODY)
+async def predict(request: Request):
+    bundle = get_bundle()
+    body = await request.body()
+    timer = metrics.timer("/predict")
+    payload = parse_prediction_body(body)
+    timer.lap("decode")
+    # Encoding validates the record, so bad input never reaches a shared batch
+    X = request_matrix(bundle, payload)
+    timer.lap("encode")
+    if batcher is None:
+        result = (await run_in_threadpool(score_matrix, bundle, X))[0]
+        result["model_version"] = bundle.version
+    else:
+        result = await batcher.submit((bundle, X[0]))
+    timer.lap("inference")
+    # Returning the response directly skips FastAPI's generic jsonable_encoder pass
+    response = FastJSONResponse(result)
+    timer.lap("serialize")
+    return response
 
-    # Compute SHAP values
-    shap_vals_all = explainer.shap_values(input_df)
-    shap_vals = shap_vals_all[pred][0]
+@app.post("/predict_batch")
+async def predict_batch(request: Request, raw: bool = False):
+    bundle = get_bundle()
+    body = await request.body()
+    timer = metrics.timer("/predict_batch")
+    records = parse_batch_body(body, request.headers.get("content-type", ""))
+    timer.lap("decode")
+    metrics.observe_batch("/predict_batch", len(records))
+    X = encode_records(bundle, records, raw=raw)
+    timer.lap("encode")
+    # Keep the event loop free while the forest runs
+    predictions = await run_in_threadpool(score_matrix, bundle, X)
+    timer.lap("inference")
+    response = FastJSONResponse({"model_version": bundle.version, "count": len(predictions),
+                                 "predictions": predictions})
+    timer.lap("serialize")
+    return response
 
-    contribs = dict(zip(input_df.columns, shap_vals))
-    top10 = sorted(contribs.items(), key=lambda x: abs(x[1]), reverse=True)[:10]
-    top10_formatted = [{"feature": f, "shap_value": float(v)} for f, v in top10]
+@app.get("/batching/stats")
+def batching_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
 
-    return {
-        "prediction": pred,
-        "top_shap_values": top10_formatted
-    }
+@app.post("/explain", openapi_extra=PREDICTION_REQUEST_BODY)
+async def explain(request: Request):
+    bundle = get_bundle()
+    body = await request.body()
+    timer = metrics.timer("/explain")
+    payload = parse_prediction_body(body)
+    timer.lap("decode")
+    X = request_matrix(bundle, payload)
+    timer.lap("encode")
+
+    # SHAP values (the explainer is built on the first call; repeats hit the cache)
+    result = (await run_in_threadpool(bundle.explain, X, TOP_K))[0]
+    timer.lap("explain")
+    response = FastJSONResponse(dict(result, model_version=bundle.version))
+    timer.lap("serialize")
+    return response
+
+@app.post("/explain_batch")
+async def explain_batch(request: Request, raw: bool = False):
+    bundle = get_bundle()
+    body = await request.body()
+    timer = metrics.timer("/explain_batch")
+    records = parse_batch_body(body, request.headers.get("content-type", ""))
+    timer.lap("decode")
+    metrics.observe_batch("/explain_batch", len(records))
+    X = encode_records(bundle, records, raw=raw)
+    timer.lap("encode")
+    explanations = await run_in_threadpool(bundle.explain, X, TOP_K) if len(X) else []
+    timer.lap("explain")
+    response = FastJSONResponse({"model_version": bundle.version, "count": len(explanations),
+                                 "explanations": explanations})
+    timer.lap("serialize")
+    return response
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if isinstance(metrics, NullMetrics):
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    content, content_type = metrics.render()
+    return Response(content, media_type=content_type)
+
+@app.get("/explain/cache/stats")
+def explain_cache_stats():
+    bundle = get_bundle()
+    return {"model_version": bundle.version, **bundle.explain_cache.stats()}
+
+# ——— Model admin ———
+@app.get("/admin/model")
+def get_model_info():
+    return model_info()
+
+@app.post("/admin/model/pin")
+def pin_model(request: PinRequest, x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    try:
+        registry.pin(request.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    refresh_model()
+    return model_info()
+
+@app.post("/admin/model/rollback")
+def rollback_model(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    previous = registry.previous_version(get_bundle().version)
+    if previous is None:
+        raise HTTPException(status_code=409, detail="No earlier registry version to roll back to")
+    registry.pin(previous)
+    refresh_model()
+    return model_info()
+
+@app.delete("/admin/model/pin")
+def unpin_model(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    registry.unpin()
+    refresh_model()
+    return model_info()
+
+# ——— OpenAPI ———
+_openapi_version = None
+
+def openapi():
+    """OpenAPI spec with the request schema generated from the serving model's feature columns.
+
+    Rebuilt whenever the serving model version changes, so /docs follows
+    registry hot swaps. Asking for the docs never loads the model: until it
+    is loaded, "features" is described as a plain object and nothing is cached.
+    """
+    global _openapi_version
+    bundle = _bundle
+    version = bundle.version if bundle is not None else None
+    if app.openapi_schema is None or _openapi_version != version:
+        spec = get_openapi(title=app.title, version=app.version, routes=app.routes)
+        features = (bundle.schema.json_schema() if bundle is not None
+                    else {"type": "object", "description": "Model feature columns (0/1)"})
+        spec.setdefault("components", {}).setdefault("schemas", {})["PredictionRequest"] = {
+            "type": "object",
+            "properties": {
+                "features": features,
+                "claim": {"type": "object", "description": "Raw fraud_oracle.csv-style claim"},
+            },
+            "additionalProperties": False,
+        }
+        if bundle is None:
+            return spec
+        app.openapi_schema, _openapi_version = spec, version
+    return app.openapi_schema
+
+app.openapi = openapi
@@ -1,8 +1,14 @@
+import hashlib
 import os
-from prefect import flow, task
-import subprocess
+import sys
+from datetime import timedelta
 import boto3
+import joblib
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
+from prefect import flow, task
+from prefect.task_runners import ConcurrentTaskRunner
 
 # Load .env
 load_dotenv()
@@ -11,56 +17,147 @@ load_dotenv()
 PROJECT_ROOT = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..")
 )
+sys.path.insert(0, PROJECT_ROOT)
+from deployment.model_bundle import file_sha256
+from scripts import generate_monitoring_data as gmd
+from scripts import make_monitoring_ui_artifacts as artifacts
+from scripts.dataset import read_dataset, write_dataset
+from scripts.drift import compute_drift
+from scripts.monitoring_store import STORE_DIR, MonitoringStore, frame_batch_id, today_bucket, update_store
+from scripts.s3_sync import Uploader, summarize
 
 # S3 Config
 AWS_REGION = "us-east-1"
 S3_BUCKET = "insurance-fraud-detection-data"  # your bucket
 ARTIFACTS_DIR = os.path.join(PROJECT_ROOT, "monitoring_artifacts")
 
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "model.pkl")
+CACHE_EXPIRATION = timedelta(days=30)
+
+
+# ─── Task caching ─────────────────────────────────────────────────────────────
+# Tasks are keyed on a content hash of their inputs: DataFrames and arrays
+# by their values, the model by the sha256 of its artifact (passed in as
+# `model_sha256`; the model object itself is skipped). Unchanged data and
+# model -> the cached result is reused and the work is skipped.
+#
+# Only tasks whose whole output is their return value are cached. A cache
+# hit never runs the task body, so a task that writes files would leave a
+# clean (or different) artifacts directory empty or stale; those always
+# run. The expensive part of the SHAP task is cached on disk by
+# scripts/shap_summary.py instead.
+def fingerprint(value):
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.sha256(",".join(map(str, value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+    if isinstance(value, (pd.Series, np.ndarray)):
+        return hashlib.sha256(np.ascontiguousarray(np.asarray(value)).tobytes()).hexdigest()
+    if value is None or isinstance(value, (str, int, float, bool, list, tuple, dict)):
+        return repr(value)
+    return None
+
+
+def input_hash(context, parameters):
+    digest = hashlib.sha256(context.task.name.encode())
+    for name in sorted(parameters):
+        value = fingerprint(parameters[name])
+        if value is not None:
+            digest.update(f"{name}={value};".encode())
+    return digest.hexdigest()
+
+
+cached_task = task(cache_key_fn=input_hash, cache_expiration=CACHE_EXPIRATION, persist_result=True)
+
+
+# ─── Tasks ────────────────────────────────────────────────────────────────────
 @task
-def generate_monitoring_data():
-    script = os.path.join(PROJECT_ROOT, "scripts", "generate_monitoring_data.py")
-    print(f"✅ Generating monitoring data via {script}...")
-    # ensure the script runs from the project root
-    subprocess.run(["python", script], cwd=PROJECT_ROOT, check=True)
+def load_model():
+    print(f"✅ Loading model from {MODEL_PATH}...")
+    return joblib.load(MODEL_PATH), file_sha256(MODEL_PATH)
 
 @task
-def make_monitoring_artifacts():
-    script = os.path.join(PROJECT_ROOT, "scripts", "make_monitoring_ui_artifacts.py")
-    print(f"✅ Generating monitoring artifacts via {script}...")
-    subprocess.run(["python", script], cwd=PROJECT_ROOT, check=True)
-
-def guess_content_type(filename):
-    if filename.endswith(".html"):
-        return "text/html"
-    elif filename.endswith(".png"):
-        return "image/png"
-    else:
-        return "binary/octet-stream"
+def load_preprocessed_data():
+    print(f"✅ Loading preprocessed data from {gmd.DATA_PATH}...")
+    return read_dataset(gmd.DATA_PATH)
+
+@cached_task
+def build_monitoring_data(model, model_sha256, data):
+    return gmd.build_monitoring_data(model, data)
+
+@task
+def write_monitoring_data(monitoring_df, reference_df):
+    # Keep the on-disk copies for the API docs, ad-hoc analysis and the CLI scripts
+    write_dataset(monitoring_df, gmd.MONITORING_DATA_PATH)
+    write_dataset(reference_df, gmd.REFERENCE_DATA_PATH)
+
+@task
+def drift_summary(model_sha256, monitoring_df, reference_df, window):
+    # The daily drift artifact comes from the merged store sketches (the last
+    # `window` buckets, or all of them), not from a pass over the full frames.
+    # A batch already merged into any bucket is skipped, so re-scoring the same
+    # claims every day doesn't double count them; the reference sketch is
+    # rebuilt whenever the model or its training split changes.
+    reference_id = f"model:{model_sha256[:16]}/{frame_batch_id(reference_df)}"
+    return update_store(MonitoringStore(STORE_DIR), monitoring_df, today_bucket(),
+                        reference=reference_df, reference_id=reference_id, window=window,
+                        summary_path=artifacts.DRIFT_SUMMARY_PATH)
+
+@task
+def evidently_drift_report(reference_df, X_monitor):
+    # Evidently compares the frames themselves, so its columns are picked from a frame-level table
+    table = compute_drift(reference_df, X_monitor)
+    return artifacts.make_evidently_drift_report(reference_df, X_monitor, {"features": table})
+
+@task
+def evidently_performance_report(y_true, y_pred):
+    return artifacts.make_evidently_performance_report(y_true, y_pred)
+
+@task
+def roc_pr_curves(y_true, y_score):
+    return artifacts.make_curves(y_true, y_score)
+
+@task
+def shap_plots(model, model_sha256, monitoring_df, shap_sample, shap_workers):
+    _, _, _, X_monitor = artifacts.split_monitoring_data(monitoring_df)
+    # Spawned SHAP workers: forking from a multi-threaded task runner isn't safe
+    return artifacts.make_shap_plots(model, monitoring_df, X_monitor, model_path=MODEL_PATH,
+                                     sample_size=shap_sample, workers=shap_workers, start_method="spawn")
 
 @task
 def upload_artifacts_to_s3():
     print(f"✅ Uploading artifacts from {ARTIFACTS_DIR} to s3://{S3_BUCKET}/monitoring/...")
-    s3 = boto3.client("s3", region_name=AWS_REGION)
-
-    for root, _, files in os.walk(ARTIFACTS_DIR):
-        for fn in files:
-            local_path = os.path.join(root, fn)
-            rel_path = os.path.relpath(local_path, ARTIFACTS_DIR).replace("\\", "/")
-            s3_key = f"monitoring/{rel_path}"
-            s3.upload_file(
-                Filename=local_path,
-                Bucket=S3_BUCKET,
-                Key=s3_key,
-                ExtraArgs={"ContentType": guess_content_type(fn)}
-            )
-            print(f"✅ Uploaded {fn} -> s3://{S3_BUCKET}/{s3_key}")
-
-@flow(name="monitoring_pipeline")
-def monitoring_pipeline():
-    generate_monitoring_data()
-    make_monitoring_artifacts()
-    upload_artifacts_to_s3()
+    uploader = Uploader(boto3.client("s3", region_name=AWS_REGION), S3_BUCKET)
+    # Only artifacts whose content changed since the last upload are sent
+    results = uploader.upload_directory(ARTIFACTS_DIR, "monitoring", exclude_dirs=("shap_cache",))
+    print(f"✅ {summarize(results)}")
+    return results
+
+@flow(name="monitoring_pipeline", task_runner=ConcurrentTaskRunner())
+def monitoring_pipeline(evidently: bool = False, shap_sample: int = artifacts.DEFAULT_SAMPLE_SIZE,
+                        shap_workers: int = 0, drift_window: int = 0, upload: bool = True):
+    model, model_sha256 = load_model()
+    data = load_preprocessed_data()
+    monitoring_df, reference_df = build_monitoring_data(model, model_sha256, data)
+    y_true, y_pred, y_score, X_monitor = artifacts.split_monitoring_data(monitoring_df)
+
+    # Independent artifact steps run concurrently on the task runner
+    futures = [
+        write_monitoring_data.submit(monitoring_df, reference_df),
+        roc_pr_curves.submit(y_true, y_score),
+        shap_plots.submit(model, model_sha256, monitoring_df, shap_sample, shap_workers),
+        # drift_window=0 compares every bucket in the store against the reference
+        drift_summary.submit(model_sha256, monitoring_df, reference_df, drift_window),
+    ]
+    if evidently:
+        futures.append(evidently_drift_report.submit(reference_df, X_monitor))
+        futures.append(evidently_performance_report.submit(y_true, y_pred))
+
+    if upload:
+        upload_artifacts_to_s3.submit(wait_for=futures).result()
+    else:
+        for future in futures:
+            future.result()
 
 if __name__ == "__main__":
     monitoring_pipeline()
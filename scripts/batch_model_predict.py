@@ -1,35 +1,225 @@
+import argparse
+import multiprocessing
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import sys
 import pandas as pd
 import joblib
 
+# Project root on sys.path for the shared modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from deployment.forest import BACKENDS, FLAT_FOREST_DIR, FlatForest, load_scorer
+from deployment.model_bundle import file_sha256
+from deployment.bitset import BitsetDataset
+from scripts.dataset import is_bitset, is_parquet, resolve_dataset_path
+
 # Paths
 preprocessed_data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'preprocessed_data.csv'))
 model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models', 'model.pkl'))
 batch_predictions_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'batch_predictions.csv'))
 
-# Load the model
-model = joblib.load(model_path)
-print(f"✅ Model loaded successfully from {model_path}")
+TARGET = 'FraudFound_P'
+DEFAULT_CHUNKSIZE = 50_000
+PREDICTION_COLUMNS = {'Fraud_Predicted': 'int64', 'Fraud_Probability': 'float64'}
+
+
+def iter_chunks(path, chunksize):
+    """Yield the input file as DataFrames of at most `chunksize` rows (CSV, Parquet or bitset)."""
+    if is_bitset(path):
+        yield from BitsetDataset(path).iter_frames(chunksize)
+    elif is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class PredictionWriter:
+    """Append scored chunks to a CSV or Parquet file.
+
+    Writes go to a temporary file that replaces `path` on close, so a
+    failed run never leaves a truncated predictions file behind. Closing
+    without any rows (an empty input) still writes an empty output.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.rows = 0
+        self._parquet_writer = None
+        self._header = True
+
+    def write(self, chunk):
+        if is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, preserve_index=False, schema=self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.tmp_path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._parquet_writer is None and self._header:
+            # Nothing written: replace any previous output with zero predictions
+            self.write(pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in PREDICTION_COLUMNS.items()}))
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if os.path.exists(self.tmp_path):
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def load_model(model_file, backend='sklearn'):
+    """The scorer for `model_file`: the sklearn model, or its flattened forest for backend='flat'."""
+    if backend == 'flat':
+        # An exported forest is memory-mapped without unpickling the model at all
+        forest_dir = os.path.join(os.path.dirname(model_file), FLAT_FOREST_DIR)
+        if os.path.isdir(forest_dir):
+            forest = FlatForest.load(forest_dir)
+            if forest.model_sha256 == file_sha256(model_file):
+                return forest
+    model = joblib.load(model_file)
+    if backend == 'sklearn':
+        return model
+    return load_scorer(model, backend, model_path=model_file, model_sha256=file_sha256(model_file))
+
+
+def score_chunk(model, chunk):
+    """Add Fraud_Predicted / Fraud_Probability to one chunk with a single predict_proba pass."""
+    # Features (drop the target column if exists; in place, no copy of the chunk)
+    X = chunk
+    if TARGET in X.columns:
+        del X[TARGET]
+
+    proba = model.predict_proba(X)
+    # RandomForest.predict is argmax of predict_proba, so derive the label from the same pass
+    X['Fraud_Predicted'] = model.classes_.take(proba.argmax(axis=1))
+    X['Fraud_Probability'] = proba[:, list(model.classes_).index(1)]  # probability of class 1 (fraud)
+    return X
+
+
+def score_file(model, input_path, output_path, chunksize=DEFAULT_CHUNKSIZE):
+    writer = PredictionWriter(output_path)
+    try:
+        for chunk in iter_chunks(input_path, chunksize):
+            if len(chunk) == 0:
+                continue  # e.g. a header-only CSV; the model can't score zero rows
+            writer.write(score_chunk(model, chunk))
+            print(f"… scored {writer.rows} rows")
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.rows
+
+
+# ——— Parallel mode ———
+# The forest is loaded once in the parent. Forked workers inherit it
+# copy-on-write, so the tree arrays are shared rather than unpickled per
+# process. Where fork isn't available, each worker loads the model itself:
+# a private copy of every tree for the sklearn backend (unpickling a tree
+# copies its node arrays, so joblib's mmap_mode can't share them), while
+# the flat backend memory-maps an exported forest's .npy arrays (see
+# scripts/export_flat_forest.py), which all workers share through the
+# page cache.
+_worker_model = None
+
+
+def _init_worker(model_file, backend):
+    global _worker_model
+    if _worker_model is None:
+        _worker_model = load_model(model_file, backend)
+
+
+def _score_shard(chunk):
+    return score_chunk(_worker_model, chunk)
+
+
+def score_file_parallel(model, model_file, input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=None,
+                        backend='sklearn'):
+    """Score shards across a process pool and write them back in input order."""
+    global _worker_model
+    workers = workers or os.cpu_count()
+    _worker_model = model
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    writer = PredictionWriter(output_path)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(model_file, backend),
+        ) as pool:
+            # Bounded window of in-flight shards keeps memory flat and output ordered
+            pending = deque()
+            for chunk in iter_chunks(input_path, chunksize):
+                if len(chunk) == 0:
+                    continue
+                pending.append(pool.submit(_score_shard, chunk))
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().result())
+                    print(f"… scored {writer.rows} rows")
+            while pending:
+                writer.write(pending.popleft().result())
+                print(f"… scored {writer.rows} rows")
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        _worker_model = None
+    writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a preprocessed claims file in bounded-memory chunks")
+    parser.add_argument('--input', default=preprocessed_data_path, help="CSV, Parquet or bitset (*.bits) input")
+    parser.add_argument('--output', default=batch_predictions_path, help="CSV or Parquet output")
+    parser.add_argument('--model', default=model_path)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Scoring processes; 1 scores in-process, 0 uses every core")
+    parser.add_argument('--backend', choices=BACKENDS, default=os.getenv('MODEL_BACKEND', 'sklearn').lower(),
+                        help="Score with the sklearn model or its flattened NumPy forest")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be 0 (every core) or a positive number of processes")
+
+    # Load the model
+    model = load_model(args.model, args.backend)
+    print(f"✅ Model loaded successfully from {args.model} ({args.backend} backend)")
 
-# Load preprocessed data
-df = pd.read_csv(preprocessed_data_path)
-print(f"✅ Preprocessed data loaded: {df.shape[0]} rows, {df.shape[1]} columns.")
+    input_path = resolve_dataset_path(args.input)
+    print(f"✅ Reading input from {input_path}")
 
-# Features (drop the target column if exists)
-if 'FraudFound_P' in df.columns:
-    X = df.drop('FraudFound_P', axis=1)
-else:
-    X = df
+    start = time.perf_counter()
+    if args.workers == 1:
+        rows = score_file(model, input_path, args.output, args.chunksize)
+    else:
+        workers = args.workers or os.cpu_count()
+        print(f"✅ Scoring with {workers} worker processes")
+        rows = score_file_parallel(model, args.model, input_path, args.output, args.chunksize, workers,
+                                   backend=args.backend)
+    elapsed = time.perf_counter() - start
 
-# Make predictions
-y_pred = model.predict(X)
-y_pred_proba = model.predict_proba(X)[:, 1]  # probability of class 1 (fraud)
+    print(f"✅ Batch predictions for {rows} rows saved to {args.output} "
+          f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
 
-# Prepare output DataFrame
-predictions_df = X.copy()
-predictions_df['Fraud_Predicted'] = y_pred
-predictions_df['Fraud_Probability'] = y_pred_proba
 
-# Save predictions
-predictions_df.to_csv(batch_predictions_path, index=False)
-print(f"✅ Batch predictions saved to {batch_predictions_path}")
+if __name__ == "__main__":
+    main()
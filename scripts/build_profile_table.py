@@ -0,0 +1,90 @@
+# scripts/build_profile_table.py
+#
+# Offline stage: precompute prediction, fraud probability and top-10 SHAP
+# attributions for every claim profile and store them as a memory-mapped
+# table next to the model artifact. The API answers known profiles from
+# this table and only falls back to the live model for unseen ones.
+
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Project root on sys.path for the shared deployment modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from deployment.model_bundle import ModelBundle, TOP_K, file_sha256
+from deployment.model_registry import ModelRegistry
+from deployment.profile_table import PROFILE_TABLE_DIR, ProfileTable
+from scripts.dataset import read_dataset
+
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+ENCODER_PATH = os.path.join(BASE_DIR, "models", "encoder.json")
+REGISTRY_DIR = os.path.join(BASE_DIR, "models", "registry")
+DATA_PATH = os.path.join(BASE_DIR, "data", "preprocessed_data.csv")
+
+
+def observed_profiles(paths, feature_names):
+    frames = [read_dataset(path, columns=feature_names) for path in paths]
+    return pd.concat(frames)[feature_names].to_numpy(dtype=np.uint8)
+
+
+def reachable_profiles(encoder, max_profiles):
+    """Every combination of one category per raw column (the full profile space)."""
+    codes = []
+    for col in encoder.raw_features:
+        # Baseline category -> no column set; others -> their dummy column
+        cats = encoder.categories[col]
+        codes.append(np.array([-1] + [encoder.feature_index[f"{col}_{c}"] for c in cats[1:]]))
+
+    n_profiles = int(np.prod([len(c) for c in codes], dtype=np.float64))
+    if n_profiles > max_profiles:
+        raise ValueError(
+            f"{n_profiles:,} reachable profiles exceeds --max-profiles={max_profiles:,}; "
+            "build from observed data instead"
+        )
+
+    grid = np.stack(np.meshgrid(*codes, indexing="ij"), axis=-1).reshape(-1, len(codes))
+    X = np.zeros((len(grid), encoder.n_features), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(grid)), len(codes))
+    cols = grid.ravel()
+    X[rows[cols >= 0], cols[cols >= 0]] = 1
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the claim profile lookup table")
+    parser.add_argument("--version", help="Registry version to build for (default: active version, "
+                                          "or models/model.pkl when the registry is empty)")
+    parser.add_argument("--data", action="append",
+                        help=f"Preprocessed data file(s) to take observed profiles from (default: {DATA_PATH})")
+    parser.add_argument("--all-reachable", action="store_true",
+                        help="Enumerate every reachable profile instead of the observed ones")
+    parser.add_argument("--max-profiles", type=int, default=2_000_000)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(REGISTRY_DIR)
+    version = args.version or registry.active_version()
+    if version is not None:
+        model_path, encoder_path = registry.paths(version)
+    else:
+        model_path, encoder_path = MODEL_PATH, ENCODER_PATH
+
+    print(f"✅ Loading model from {model_path}...")
+    bundle = ModelBundle.load(model_path, encoder_path, version=version, use_profile_table=False)
+
+    if args.all_reachable:
+        X = reachable_profiles(bundle.encoder, args.max_profiles)
+    else:
+        X = observed_profiles(args.data or [DATA_PATH], bundle.encoder.feature_names)
+    print(f"✅ {len(X)} input rows")
+
+    table_dir = os.path.join(os.path.dirname(model_path), PROFILE_TABLE_DIR)
+    table = ProfileTable.build(bundle, X, table_dir, model_sha256=file_sha256(model_path), k=args.top_k)
+    print(f"✅ Profile table with {len(table)} profiles saved to {table_dir}")
+
+
+if __name__ == "__main__":
+    main()
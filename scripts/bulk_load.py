@@ -0,0 +1,130 @@
+# scripts/bulk_load.py
+#
+# Bulk loader for PostgreSQL: streams DataFrame chunks through
+# COPY ... FROM STDIN into a staging table, then swaps (replace) or merges
+# (append / upsert) it into the target inside one transaction.
+#
+# Works on any DB-API connection exposing psycopg2's cursor.copy_expert,
+# e.g. engine.raw_connection() or psycopg2.connect(...).
+
+import io
+import pandas as pd
+from pandas.api import types as ptypes
+
+MODES = ("replace", "append", "upsert")
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def pg_type(series):
+    if ptypes.is_bool_dtype(series):
+        return "boolean"
+    if ptypes.is_integer_dtype(series):
+        return "bigint"
+    if ptypes.is_float_dtype(series):
+        return "double precision"
+    if ptypes.is_datetime64_any_dtype(series):
+        return "timestamp"
+    return "text"
+
+
+def iter_frames(data, chunksize):
+    """Accept one DataFrame or an iterable of DataFrames; yield chunks of at most `chunksize` rows."""
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+
+
+def table_exists(cur, table):
+    cur.execute("SELECT to_regclass(%s)", (quote_ident(table),))
+    row = cur.fetchone()
+    return row is not None and row[0] is not None
+
+
+def copy_chunk(cur, table, chunk):
+    """COPY one DataFrame chunk into `table` as CSV."""
+    buf = io.StringIO()
+    chunk.to_csv(buf, header=False, index=False)
+    buf.seek(0)
+    columns = ", ".join(quote_ident(c) for c in chunk.columns)
+    cur.copy_expert(f"COPY {quote_ident(table)} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def copy_dataframe(conn, data, table, mode="replace", key=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Bulk-load `data` (a DataFrame or an iterable of DataFrames) into `table`.
+
+    mode="replace"  build a fresh staging table and rename it over `table`
+    mode="append"   insert every staged row into `table`
+    mode="upsert"   replace rows of `table` whose `key` appears in the new data
+
+    Returns the number of rows loaded. Everything happens in one
+    transaction, so readers see either the old or the new table contents.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    if mode == "upsert" and key is None:
+        raise ValueError("upsert needs a key column")
+
+    staging = f"{table}__staging"
+    rows = 0
+    cur = conn.cursor()
+    try:
+        target_exists = table_exists(cur, table)
+        cur.execute(f"DROP TABLE IF EXISTS {quote_ident(staging)}")
+
+        columns = None
+        for chunk in iter_frames(data, chunksize):
+            if columns is None:
+                columns = list(chunk.columns)
+                if mode == "replace" or not target_exists:
+                    ddl = ", ".join(f"{quote_ident(c)} {pg_type(chunk[c])}" for c in columns)
+                    cur.execute(f"CREATE TABLE {quote_ident(staging)} ({ddl})")
+                else:
+                    cur.execute(
+                        f"CREATE TEMP TABLE {quote_ident(staging)} "
+                        f"(LIKE {quote_ident(table)} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+            copy_chunk(cur, staging, chunk)
+            rows += len(chunk)
+
+        if columns is None:
+            # Nothing to load; leave the target untouched
+            conn.rollback()
+            return 0
+
+        if mode == "replace" or not target_exists:
+            old = f"{table}__old"
+            cur.execute(f"DROP TABLE IF EXISTS {quote_ident(old)}")
+            if target_exists:
+                cur.execute(f"ALTER TABLE {quote_ident(table)} RENAME TO {quote_ident(old)}")
+            cur.execute(f"ALTER TABLE {quote_ident(staging)} RENAME TO {quote_ident(table)}")
+            if target_exists:
+                cur.execute(f"DROP TABLE {quote_ident(old)}")
+        else:
+            if mode == "upsert":
+                cur.execute(
+                    f"DELETE FROM {quote_ident(table)} t USING {quote_ident(staging)} s "
+                    f"WHERE t.{quote_ident(key)} = s.{quote_ident(key)}"
+                )
+            column_list = ", ".join(quote_ident(c) for c in columns)
+            cur.execute(
+                f"INSERT INTO {quote_ident(table)} ({column_list}) "
+                f"SELECT {column_list} FROM {quote_ident(staging)}"
+            )
+
+        if key is not None and (mode == "replace" or not target_exists):
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS {quote_ident(f'{table}_{key}_idx')} "
+                f"ON {quote_ident(table)} ({quote_ident(key)})"
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return rows
@@ -0,0 +1,117 @@
+# scripts/dataset.py
+#
+# Typed columnar storage for the pipeline's tabular artifacts
+# (preprocessed_data, reference_data, monitoring_data, ...).
+#
+# Datasets are written as Parquet with dummies kept as booleans, small
+# integer columns downcast and string columns dictionary-encoded, so
+# readers skip text parsing and dtype inference. Callers keep passing the
+# familiar ``*.csv`` paths: a newer ``*.parquet`` sibling is preferred when
+# present, and the CSV is still read when it is the only (or newest) copy.
+#
+# Datasets that are all dummies can instead be written as a ``*.bits``
+# bitset directory (deployment/bitset.py): every 0/1 column packed into
+# 64-bit words, memory-mapped on read. A ``*.bits`` sibling is picked up
+# the same way as a Parquet one.
+
+import os
+import sys
+import pandas as pd
+from pandas.api import types as ptypes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from deployment.bitset import BITSET_SUFFIX, BitsetDataset, write_bitset
+
+try:
+    import pyarrow  # noqa: F401
+    import pyarrow.parquet as pq
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+def is_parquet(path):
+    return path.endswith(PARQUET_SUFFIXES)
+
+
+def is_bitset(path):
+    return path.rstrip('/').endswith(BITSET_SUFFIX)
+
+
+def parquet_path(path):
+    return path if is_parquet(path) else os.path.splitext(path.rstrip('/'))[0] + '.parquet'
+
+
+def bitset_path(path):
+    return path if is_bitset(path) else os.path.splitext(path)[0] + BITSET_SUFFIX
+
+
+def csv_path(path):
+    return os.path.splitext(path.rstrip('/'))[0] + '.csv' if is_parquet(path) or is_bitset(path) else path
+
+
+def resolve_dataset_path(path):
+    """Pick the copy to read for a dataset: the newest of its bitset, Parquet and CSV copies.
+
+    On equal timestamps the bitset wins over Parquet, and Parquet over CSV.
+    """
+    candidates = [(bitset_path(path), os.path.isdir), (parquet_path(path), os.path.exists),
+                  (csv_path(path), os.path.exists)]
+    if not HAVE_PARQUET:
+        candidates.pop(1)
+    existing = [candidate for candidate, exists in candidates if exists(candidate)]
+    if not existing:
+        raise FileNotFoundError(f"No dataset found at {' or '.join(c for c, _ in candidates)}")
+    # max() keeps the first of equally new copies
+    return max(existing, key=os.path.getmtime)
+
+
+def to_storage_dtypes(df):
+    """Compact dtypes: bool dummies stay bool, 0/1 and small ints are downcast, strings become categorical."""
+    conversions = {}
+    for col, series in df.items():
+        if ptypes.is_bool_dtype(series):
+            continue
+        if ptypes.is_integer_dtype(series):
+            if len(series) and series.min() >= 0 and series.max() <= 1:
+                conversions[col] = 'uint8'
+            else:
+                conversions[col] = pd.to_numeric(series, downcast='integer').dtype
+        elif ptypes.is_object_dtype(series) or ptypes.is_string_dtype(series):
+            conversions[col] = 'category'
+    return df.astype(conversions) if conversions else df
+
+
+def write_dataset(df, path, format=None):
+    """Write `df` as typed Parquet (or CSV when pyarrow isn't installed). Returns the path written.
+
+    ``format="bits"`` (or a ``*.bits`` path) writes a bitset dataset instead.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if format == 'bits' or is_bitset(path):
+        return write_bitset(df, bitset_path(path))
+    if HAVE_PARQUET:
+        out_path = parquet_path(path)
+        to_storage_dtypes(df).to_parquet(out_path, index=False)
+    else:
+        out_path = csv_path(path)
+        df.to_csv(out_path, index=False)
+    return out_path
+
+
+def read_dataset(path, columns=None, memory_map=True):
+    """Read a dataset, optionally projecting to `columns`.
+
+    Parquet files are memory-mapped and only the requested columns are
+    decoded; the CSV fallback uses ``usecols`` for the same effect.
+    """
+    resolved = resolve_dataset_path(path)
+    if is_bitset(resolved):
+        return BitsetDataset(resolved, mmap=memory_map).to_frame(columns)
+    if is_parquet(resolved):
+        table = pq.read_table(resolved, columns=columns, memory_map=memory_map)
+        return table.to_pandas()
+    df = pd.read_csv(resolved, usecols=columns)
+    return df[columns] if columns is not None else df
@@ -0,0 +1,124 @@
+# scripts/db.py
+#
+# Shared database access for scripts, loaders and health checks.
+#
+# Reads the .env settings once and hands out connections from a single
+# pooled SQLAlchemy engine, so one process pays the connection / TLS
+# handshake once instead of per query. Large result sets are streamed
+# through server-side (named) cursors into chunked DataFrames.
+
+import itertools
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from scripts.bulk_load import quote_ident
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(dotenv_path=os.path.join(BASE_DIR, '.env'))
+
+DEFAULT_FETCH_SIZE = 50_000
+
+_engine = None
+_cursor_ids = itertools.count()
+
+
+def db_config():
+    return {
+        'host': os.getenv('db_host'),
+        'port': os.getenv('db_port'),
+        'database': os.getenv('db_name'),
+        'user': os.getenv('db_username'),
+        'password': os.getenv('db_password'),
+    }
+
+
+def db_url():
+    cfg = db_config()
+    return f"postgresql+psycopg2://{cfg['user']}:{cfg['password']}@{cfg['host']}:{cfg['port']}/{cfg['database']}"
+
+
+def get_engine():
+    """Process-wide pooled engine (created on first use)."""
+    global _engine
+    if _engine is None:
+        connect_args = {}
+        if os.getenv('db_sslmode'):
+            connect_args['sslmode'] = os.getenv('db_sslmode')
+        _engine = create_engine(
+            db_url(),
+            pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '5')),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            pool_pre_ping=True,
+            connect_args=connect_args,
+        )
+    return _engine
+
+
+@contextmanager
+def connection():
+    """Borrow a raw psycopg2 connection from the pool; it is returned on exit."""
+    conn = get_engine().raw_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def stream_query(conn, sql, params=None, chunksize=DEFAULT_FETCH_SIZE):
+    """Yield the result of `sql` as DataFrames of at most `chunksize` rows.
+
+    Uses a named (server-side) cursor, so only one chunk is held in memory
+    at a time. The cursor lives inside the connection's current
+    transaction; the caller commits or rolls back as usual.
+    """
+    cur = conn.cursor(name=f"stream_{os.getpid()}_{next(_cursor_ids)}")
+    cur.itersize = chunksize
+    try:
+        cur.execute(sql, params)
+        columns = None
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if columns is None and cur.description is not None:
+                columns = [d[0] for d in cur.description]
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cur.close()
+
+
+def fetch_all(conn, sql, params=None):
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params)
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+# ——— Checks used by the health-check scripts ———
+def list_tables(conn, schema='public'):
+    rows = fetch_all(conn, """
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = %s
+        ORDER BY table_name;
+    """, (schema,))
+    return [r[0] for r in rows]
+
+
+def table_schema(conn, table):
+    return fetch_all(conn, """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = %s
+        ORDER BY ordinal_position;
+    """, (table,))
+
+
+def row_count(conn, table):
+    return fetch_all(conn, f"SELECT COUNT(*) FROM {quote_ident(table)};")[0][0]
@@ -0,0 +1,62 @@
+# scripts/db_check.py
+#
+# One CLI for the database health checks: connectivity, table listing,
+# schema and row counts, all over a single pooled session.
+#
+#   python scripts/db_check.py                      # every check on model_data_w_dummy
+#   python scripts/db_check.py tables
+#   python scripts/db_check.py schema count --table predictions
+
+import argparse
+import os
+import sys
+import time
+
+# Project root on sys.path for the shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.db import connection, db_config, list_tables, row_count, table_schema
+
+CHECKS = ("connection", "tables", "schema", "count")
+
+
+def run_checks(conn, checks, table):
+    if "connection" in checks:
+        start = time.perf_counter()
+        cur = conn.cursor()
+        cur.execute("SELECT 1;")
+        cur.close()
+        print(f"✅ Connection to {db_config()['host']} successful! ({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    if "tables" in checks:
+        print("Tables in the database:")
+        for name in list_tables(conn):
+            print(f"- {name}")
+
+    if "schema" in checks:
+        print(f"✅ Table Schema ({table}):")
+        for column, data_type in table_schema(conn, table):
+            print(f"- {column} ({data_type})")
+
+    if "count" in checks:
+        print(f"✅ Table `{table}` has {row_count(conn, table)} rows.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database health checks over one pooled session")
+    parser.add_argument("checks", nargs="*", choices=CHECKS, help="Checks to run (default: all)")
+    parser.add_argument("--table", default="model_data_w_dummy")
+    args = parser.parse_args(argv)
+
+    try:
+        with connection() as conn:
+            run_checks(conn, args.checks or CHECKS, args.table)
+            conn.rollback()
+    except Exception as e:
+        print("❌ Database check failed.")
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
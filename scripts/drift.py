@@ -0,0 +1,161 @@
+# scripts/drift.py
+#
+# Drift statistics computed from category counts rather than raw rows.
+#
+# Every statistic takes a reference and a current count array of shape
+# (n_features, n_bins) -- for the dummy columns n_bins is 2 (False, True)
+# -- and returns one value per feature, so merged monitoring sketches and
+# full datasets go through the same code. compute_drift() is the native
+# engine for two DataFrames: one counting pass per dataset over all dummy
+# columns, then every statistic vectorized across features.
+
+import json
+import os
+from datetime import datetime, timezone
+import numpy as np
+from pandas.api import types as ptypes
+from scipy import stats
+
+PSI_EPS = 1e-4
+PSI_THRESHOLD = 0.2
+
+
+def dummy_counts(X):
+    """(n_features, 2) array of False/True counts for a 0/1 matrix."""
+    X = np.asarray(X)
+    ones = np.count_nonzero(X, axis=0).astype(np.int64)
+    return np.stack([len(X) - ones, ones], axis=1)
+
+
+def _proportions(counts, eps=0.0):
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    if eps:
+        p = np.clip(p, eps, None)
+        p /= p.sum(axis=-1, keepdims=True)
+    return p
+
+
+def psi(ref_counts, cur_counts, eps=PSI_EPS):
+    """Population stability index per feature (empty bins floored at `eps`)."""
+    p = _proportions(ref_counts, eps)
+    q = _proportions(cur_counts, eps)
+    return ((q - p) * np.log(q / p)).sum(axis=-1)
+
+
+def chi_square(ref_counts, cur_counts):
+    """Two-sample chi-square homogeneity test per feature: (statistic, p_value).
+
+    Bins that are empty in both samples carry no information and are left
+    out of the degrees of freedom; a feature that is constant in both
+    samples gets statistic 0 and p-value 1.
+    """
+    ref = np.asarray(ref_counts, dtype=np.float64)
+    cur = np.asarray(cur_counts, dtype=np.float64)
+    table = np.stack([ref, cur], axis=-2)                 # (..., 2, bins)
+    row_totals = table.sum(axis=-1, keepdims=True)
+    col_totals = table.sum(axis=-2, keepdims=True)
+    total = table.sum(axis=(-2, -1), keepdims=True)
+    expected = np.divide(row_totals * col_totals, total, out=np.zeros_like(table), where=total > 0)
+    contrib = np.divide((table - expected) ** 2, expected, out=np.zeros_like(table), where=expected > 0)
+    statistic = contrib.sum(axis=(-2, -1))
+
+    dof = np.count_nonzero(col_totals[..., 0, :], axis=-1) - 1
+    p_value = np.ones_like(statistic)
+    testable = dof > 0
+    p_value[testable] = stats.chi2.sf(statistic[testable], dof[testable])
+    statistic[~testable] = 0.0
+    return statistic, p_value
+
+
+def js_distance(ref_counts, cur_counts):
+    """Jensen-Shannon distance (base 2, in [0, 1]) per feature."""
+    p = _proportions(ref_counts)
+    q = _proportions(cur_counts)
+    m = (p + q) / 2
+
+    def kl(a, b):
+        terms = np.where(a > 0, a * np.log2(np.where(a > 0, a, 1) / np.where(b > 0, b, 1)), 0.0)
+        return terms.sum(axis=-1)
+
+    divergence = np.clip((kl(p, m) + kl(q, m)) / 2, 0.0, 1.0)
+    return np.sqrt(divergence)
+
+
+def drift_table(ref_counts, cur_counts, feature_names, psi_threshold=PSI_THRESHOLD):
+    """Per-feature drift statistics as a list of dicts (drifted = PSI over the threshold)."""
+    psi_values = psi(ref_counts, cur_counts)
+    chi2_values, p_values = chi_square(ref_counts, cur_counts)
+    js_values = js_distance(ref_counts, cur_counts)
+    ref_share = _proportions(ref_counts)[:, -1]
+    cur_share = _proportions(cur_counts)[:, -1]
+    return [
+        {
+            "feature": name,
+            "reference_share": float(ref_share[i]),
+            "current_share": float(cur_share[i]),
+            "psi": float(psi_values[i]),
+            "chi2": float(chi2_values[i]),
+            "chi2_p_value": float(p_values[i]),
+            "js_distance": float(js_values[i]),
+            "drifted": bool(psi_values[i] >= psi_threshold),
+        }
+        for i, name in enumerate(feature_names)
+    ]
+
+
+def dummy_features(df, exclude=()):
+    """Columns of `df` holding only 0/1 (or boolean) values."""
+    features = []
+    for col, series in df.items():
+        if col in exclude:
+            continue
+        if ptypes.is_bool_dtype(series):
+            features.append(col)
+        elif ptypes.is_numeric_dtype(series) and series.isin((0, 1)).all():
+            features.append(col)
+    return features
+
+
+def compute_drift(reference, current, features=None, psi_threshold=PSI_THRESHOLD):
+    """Per-feature drift table between two DataFrames over their shared dummy columns.
+
+    Constant features (in either or both datasets) are handled like any
+    other column: a feature constant in both has zero drift, a feature that
+    became constant shows up through its share and PSI.
+    """
+    if features is None:
+        shared = [c for c in reference.columns if c in set(current.columns)]
+        features = dummy_features(reference[shared])
+    ref_counts = dummy_counts(reference[features].to_numpy())
+    cur_counts = dummy_counts(current[features].to_numpy())
+    return drift_table(ref_counts, cur_counts, features, psi_threshold=psi_threshold)
+
+
+def drift_summary(table, reference_rows, current_rows, psi_threshold=PSI_THRESHOLD):
+    drifted = [row["feature"] for row in table if row["drifted"]]
+    constant = [row["feature"] for row in table
+                if row["reference_share"] in (0.0, 1.0) and row["current_share"] in (0.0, 1.0)]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "reference_rows": int(reference_rows),
+        "current_rows": int(current_rows),
+        "psi_threshold": psi_threshold,
+        "n_features": len(table),
+        "n_drifted": len(drifted),
+        "share_drifted": len(drifted) / len(table) if table else 0.0,
+        "dataset_drift": bool(table) and len(drifted) / len(table) >= 0.5,
+        "drifted_features": drifted,
+        "constant_features": constant,
+        "features": table,
+    }
+
+
+def write_summary(summary, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,58 @@
+# scripts/export_flat_forest.py
+#
+# Offline stage: flatten the trained forest into contiguous NumPy arrays
+# (deployment/forest.py) and store them next to the model artifact. With
+# MODEL_BACKEND=flat the API and the batch scorer memory-map these files
+# instead of flattening the pickled model at load time.
+
+import argparse
+import os
+import sys
+import joblib
+import numpy as np
+
+# Project root on sys.path for the shared deployment modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from deployment.forest import FLAT_FOREST_DIR, FlatForest
+from deployment.model_bundle import file_sha256
+from deployment.model_registry import ModelRegistry
+
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+REGISTRY_DIR = os.path.join(BASE_DIR, "models", "registry")
+
+
+def export(model_path, check_rows=1000, seed=0):
+    """Flatten the model at `model_path`, verify it against sklearn and save it beside the model."""
+    model = joblib.load(model_path)
+    forest = FlatForest.from_sklearn(model, model_sha256=file_sha256(model_path))
+
+    # Random 0/1 rows exercise both branches of every dummy split
+    X = np.random.default_rng(seed).integers(0, 2, size=(check_rows, forest.n_features_in_)).astype(np.float32)
+    max_diff = float(np.abs(forest.predict_proba(X) - model.predict_proba(X)).max())
+    if max_diff > 1e-9:
+        raise RuntimeError(f"Flattened forest disagrees with the model (max |Δp| = {max_diff:.3g})")
+
+    directory = forest.save(os.path.join(os.path.dirname(model_path), FLAT_FOREST_DIR))
+    return forest, directory, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the model as a memory-mappable flat forest")
+    parser.add_argument("--version", help="Registry version to export (default: active version, "
+                                          "or models/model.pkl when the registry is empty)")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(REGISTRY_DIR)
+    version = args.version or registry.active_version()
+    model_path = registry.paths(version)[0] if version is not None else MODEL_PATH
+
+    print(f"✅ Flattening model from {model_path}...")
+    forest, directory, max_diff = export(model_path)
+    stats = forest.stats()
+    print(f"✅ {stats['trees']} trees, {stats['nodes']} nodes, {stats['bytes'] / 1024:.0f} KiB "
+          f"(max |Δp| vs sklearn {max_diff:.1e}) saved to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -52,11 +52,16 @@
 
 # Update to scripts/generate_monitoring_data.py
 
+import argparse
 import os
-import pandas as pd
+import sys
 import joblib
 from sklearn.model_selection import train_test_split
 
+# Project root on sys.path for the shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.dataset import read_dataset, write_dataset
+
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
@@ -64,15 +69,10 @@ DATA_PATH = os.path.join(BASE_DIR, "data", "preprocessed_data.csv")
 MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
 REFERENCE_DATA_PATH = os.path.join(BASE_DIR, "data", "reference_data.csv")
 
-def main():
-    print("✅ Loading model...")
-    model = joblib.load(MODEL_PATH)
+TARGET = "FraudFound_P"
 
-    print("✅ Loading preprocessed data...")
-    df = pd.read_csv(DATA_PATH)
-
-    # Target column
-    target_col = "FraudFound_P"
+def build_monitoring_data(model, df, target_col=TARGET):
+    """(monitoring_df, reference_df): the scored 30% test split and the 70% training split."""
     X = df.drop(columns=[target_col])
     y = df[target_col]
 
@@ -81,20 +81,39 @@ def main():
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
 
     print("✅ Making predictions...")
-    y_pred = model.predict(X_test)
+    # One predict_proba pass gives both the label and the fraud probability
+    proba = model.predict_proba(X_test)
+    y_pred = model.classes_.take(proba.argmax(axis=1))
+    y_proba = proba[:, list(model.classes_).index(1)]
 
     print("✅ Preparing monitoring data...")
     monitoring_df = X_test.copy()
     monitoring_df["actual"] = y_test.values
     monitoring_df["prediction"] = y_pred
-    monitoring_df.to_csv(MONITORING_DATA_PATH, index=False)
+    monitoring_df["probability"] = y_proba
 
     print("✅ Preparing reference data...")
     reference_df = X_train.copy()
-    reference_df.to_csv(REFERENCE_DATA_PATH, index=False)
+    return monitoring_df, reference_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the monitoring and reference datasets")
+    parser.add_argument("--format", choices=["parquet", "bits"], default="parquet",
+                        help="bits packs the dummy columns into 64-bit words (see deployment/bitset.py)")
+    args = parser.parse_args()
+
+    print("✅ Loading model...")
+    model = joblib.load(MODEL_PATH)
+
+    print("✅ Loading preprocessed data...")
+    df = read_dataset(DATA_PATH)
+
+    monitoring_df, reference_df = build_monitoring_data(model, df)
+    monitoring_path = write_dataset(monitoring_df, MONITORING_DATA_PATH, format=args.format)
+    reference_path = write_dataset(reference_df, REFERENCE_DATA_PATH, format=args.format)
 
-    print(f"✅ Monitoring data generated: {monitoring_df.shape[0]} rows.")
-    print(f"✅ Reference data generated: {reference_df.shape[0]} rows.")
+    print(f"✅ Monitoring data generated: {monitoring_df.shape[0]} rows -> {monitoring_path}")
+    print(f"✅ Reference data generated: {reference_df.shape[0]} rows -> {reference_path}")
 
 if __name__ == "__main__":
     main()
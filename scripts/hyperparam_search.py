@@ -0,0 +1,355 @@
+# scripts/hyperparam_search.py
+#
+# Resumable hyperparameter search over the tree models.
+#
+# A trial is one (model, params, training rows) candidate scored by
+# stratified k-fold cross-validation. Trials fan out over a process pool
+# (fork-based workers inherit the training data copy-on-write, like the
+# batch scorer's shards) and every finished trial is appended to a JSONL
+# checkpoint together with its wall time. A rerun reads the checkpoint
+# and only evaluates trials it doesn't hold yet, so an interrupted search
+# resumes where it stopped.
+#
+# Strategies:
+#   grid     every combination of the model's parameter grid
+#   random   `n_iter` samples per model from the same space
+#   halving  successive halving: all grid candidates on a small stratified
+#            subset of rows, the best 1/factor go on to `factor` times as
+#            many rows, until one round runs on the full training set
+#
+# sklearn's *SearchCV classes are not used because they can neither
+# checkpoint nor resume a partially finished search.
+
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import average_precision_score, roc_auc_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+STRATEGIES = ("grid", "random", "halving")
+SCORERS = {"roc_auc": roc_auc_score, "average_precision": average_precision_score}
+DEFAULT_FOLDS = 3
+DEFAULT_FACTOR = 3
+DEFAULT_N_ITER = 10
+
+# Estimators and their search spaces. Every space is a plain grid, so it
+# serves grid search, random sampling and halving alike.
+SEARCH_SPACES = {
+    "random_forest": (
+        RandomForestClassifier(random_state=42, class_weight="balanced"),
+        {
+            "n_estimators": [100, 200, 400],
+            "max_depth": [6, 10, 16, None],
+            "min_samples_leaf": [1, 5, 20],
+            "max_features": ["sqrt", 0.3],
+        },
+    ),
+    "extra_trees": (
+        ExtraTreesClassifier(random_state=42, class_weight="balanced"),
+        {
+            "n_estimators": [200, 400],
+            "max_depth": [10, 16, None],
+            "min_samples_leaf": [1, 5, 20],
+            "max_features": ["sqrt", 0.3],
+        },
+    ),
+    "hist_gradient_boosting": (
+        HistGradientBoostingClassifier(random_state=42, class_weight="balanced"),
+        {
+            "learning_rate": [0.03, 0.1, 0.3],
+            "max_leaf_nodes": [15, 31, 63],
+            "min_samples_leaf": [20, 50],
+            "l2_regularization": [0.0, 1.0],
+        },
+    ),
+    "decision_tree": (
+        DecisionTreeClassifier(random_state=42, class_weight="balanced"),
+        {
+            "max_depth": [4, 6, 10, None],
+            "min_samples_leaf": [1, 10, 50],
+            "criterion": ["gini", "entropy"],
+        },
+    ),
+}
+
+
+def data_fingerprint(X, y):
+    """Content hash of the training rows, so a checkpoint never outlives the data it scored."""
+    digest = hashlib.sha1(json.dumps([str(c) for c in X.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def trial_key(model_name, params, data_hash, folds, scoring, seed):
+    """Stable id of a trial; the checkpoint is keyed on it."""
+    payload = json.dumps([model_name, params, data_hash, folds, scoring, seed], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def candidates(strategy, models, n_iter=DEFAULT_N_ITER, seed=42, spaces=SEARCH_SPACES):
+    """(model_name, params) pairs to evaluate for `strategy`."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {STRATEGIES}")
+    pairs = []
+    for name in models:
+        _, space = spaces[name]
+        if strategy == "random":
+            n = min(n_iter, len(ParameterGrid(space)))
+            params_list = ParameterSampler(space, n, random_state=seed)
+        else:
+            params_list = ParameterGrid(space)
+        pairs.extend((name, dict(params)) for params in params_list)
+    return pairs
+
+
+def build_estimator(model_name, params, n_jobs=None, spaces=SEARCH_SPACES):
+    estimator = clone(spaces[model_name][0]).set_params(**params)
+    if n_jobs is not None and "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=n_jobs)
+    return estimator
+
+
+def stratified_order(y, seed=42):
+    """Row positions shuffled so that every prefix keeps the class balance of y.
+
+    Halving rounds train on prefixes of this order, so a larger round
+    always contains the rows of the smaller ones.
+    """
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    keyed = []
+    for label in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == label))
+        # Spread each class evenly over [0, 1) so prefixes are stratified
+        keyed.append(np.column_stack([(np.arange(len(rows)) + rng.random()) / len(rows), rows]))
+    keyed = np.vstack(keyed)
+    return keyed[np.argsort(keyed[:, 0], kind="mergesort"), 1].astype(np.int64)
+
+
+# ——— Checkpoint ———
+def load_checkpoint(path):
+    """{trial key: record} of the trials finished so far (a torn last line is ignored)."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["key"]] = record
+    return done
+
+
+def append_checkpoint(path, record):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a+b") as f:
+        # A run killed mid-write leaves a torn line; start after it
+        torn = False
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+        f.write((("\n" if torn else "") + json.dumps(record, default=str) + "\n").encode())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ——— Trial evaluation ———
+# Set in the parent before the pool starts; forked workers inherit it.
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    if data is not None:
+        _worker_data = data
+    # n_jobs=1 doesn't reach native thread pools: HistGradientBoosting's OpenMP
+    # loops (and BLAS) would otherwise use every core in every worker
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def evaluate(X, y, model_name, params, folds=DEFAULT_FOLDS, scoring="roc_auc", n_jobs=None, seed=42):
+    """Cross-validated score of one candidate; returns (mean, std, fold scores, fit seconds)."""
+    scorer = SCORERS[scoring]
+    scores, fit_seconds = [], 0.0
+    for train_idx, valid_idx in StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y):
+        estimator = build_estimator(model_name, params, n_jobs=n_jobs)
+        start = time.perf_counter()
+        estimator.fit(X.iloc[train_idx], y.iloc[train_idx])
+        fit_seconds += time.perf_counter() - start
+        proba = estimator.predict_proba(X.iloc[valid_idx])[:, list(estimator.classes_).index(1)]
+        scores.append(float(scorer(y.iloc[valid_idx], proba)))
+    return float(np.mean(scores)), float(np.std(scores)), scores, fit_seconds
+
+
+def _run_trial(task):
+    key, model_name, params, rows, round_index, folds, scoring, n_jobs, seed, data_hash = task
+    X, y = _worker_data
+    if rows is not None:
+        X, y = X.iloc[rows], y.iloc[rows]
+    start = time.perf_counter()
+    mean, std, scores, fit_seconds = evaluate(X, y, model_name, params, folds, scoring, n_jobs, seed)
+    return {
+        "key": key,
+        "model": model_name,
+        "params": params,
+        "round": round_index,
+        "n_rows": len(X),
+        "data_sha1": data_hash,
+        "seed": seed,
+        "scoring": scoring,
+        "score": mean,
+        "score_std": std,
+        "fold_scores": scores,
+        "fit_seconds": fit_seconds,
+        "wall_seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _report(record, resumed=False):
+    params = ", ".join(f"{k}={v}" for k, v in sorted(record["params"].items()))
+    note = " (from checkpoint)" if resumed else ""
+    print(f"… {record['model']}({params}) on {record['n_rows']} rows: "
+          f"{record['scoring']} {record['score']:.4f} ± {record['score_std']:.4f} "
+          f"in {record['wall_seconds']:.1f}s{note}")
+
+
+class HyperparameterSearch:
+    """Run (or resume) a search over `models` and keep every trial record.
+
+    `workers` trial processes run at once (0 = every core); with a single
+    worker, trials run in-process and each estimator uses every core via
+    its own n_jobs instead.
+    """
+
+    def __init__(self, strategy="random", models=("random_forest",), scoring="roc_auc", folds=DEFAULT_FOLDS,
+                 n_iter=DEFAULT_N_ITER, factor=DEFAULT_FACTOR, min_rows=None, workers=0, checkpoint_path=None,
+                 seed=42):
+        if scoring not in SCORERS:
+            raise ValueError(f"Unknown scoring {scoring!r}; expected one of {sorted(SCORERS)}")
+        unknown = set(models) - set(SEARCH_SPACES)
+        if unknown:
+            raise ValueError(f"Unknown models {sorted(unknown)}; expected some of {sorted(SEARCH_SPACES)}")
+        self.strategy = strategy
+        self.models = list(models)
+        self.scoring = scoring
+        self.folds = folds
+        self.n_iter = n_iter
+        self.factor = factor
+        self.min_rows = min_rows
+        self.workers = workers or os.cpu_count()
+        self.checkpoint_path = checkpoint_path
+        self.seed = seed
+        self.records = []
+
+    def _run_round(self, X, y, pairs, rows=None, round_index=0):
+        """Evaluate (model, params) pairs on `rows` of X; returns their records in `pairs` order."""
+        global _worker_data
+        n_rows = len(X) if rows is None else len(rows)
+        # Trials are keyed on the rows' content and the seed, not just their count: a
+        # retrain on new data of the same size must not reuse the old scores
+        data_hash = data_fingerprint(X, y) if rows is None else data_fingerprint(X.iloc[rows], y.iloc[rows])
+        keys = [trial_key(name, params, data_hash, self.folds, self.scoring, self.seed) for name, params in pairs]
+        done = load_checkpoint(self.checkpoint_path)
+        tasks, results = [], {}
+        for key, (name, params) in zip(keys, pairs):
+            if key in done:
+                results[key] = done[key]
+                _report(done[key], resumed=True)
+            else:
+                tasks.append((key, name, params, rows, round_index, self.folds, self.scoring,
+                              -1 if self.workers == 1 else 1, self.seed, data_hash))
+        if tasks:
+            print(f"✅ Round {round_index}: {len(tasks)} trials on {n_rows} rows "
+                  f"({len(results)} already in the checkpoint), {min(self.workers, len(tasks))} workers")
+
+        _worker_data = (X, y)
+        pool = None
+        try:
+            if self.workers == 1 or len(tasks) <= 1:
+                finished = map(_run_trial, tasks)
+            else:
+                start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+                pool = ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(tasks)),
+                    mp_context=multiprocessing.get_context(start_method),
+                    initializer=_init_worker,
+                    initargs=(None if start_method == "fork" else (X, y),),
+                )
+                finished = (future.result() for future in as_completed([pool.submit(_run_trial, t) for t in tasks]))
+            try:
+                # Checkpoint each trial as it finishes, not when the round ends
+                for record in finished:
+                    append_checkpoint(self.checkpoint_path, record)
+                    results[record["key"]] = record
+                    _report(record)
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+        finally:
+            _worker_data = None
+
+        records = [results[key] for key in keys]
+        self.records.extend(records)
+        return records
+
+    def run(self, X, y):
+        """Search over X, y and return the best trial record."""
+        pairs = candidates(self.strategy, self.models, self.n_iter, self.seed)
+        print(f"✅ {self.strategy} search: {len(pairs)} candidates over {', '.join(self.models)} "
+              f"({self.folds}-fold CV, {self.scoring})")
+        start = time.perf_counter()
+        if self.strategy == "halving":
+            best = self._run_halving(X, y, pairs)
+        else:
+            best = max(self._run_round(X, y, pairs), key=lambda r: r["score"])
+        self.wall_seconds = time.perf_counter() - start
+        print(f"✅ Search finished in {self.wall_seconds:.1f}s; best {best['model']} "
+              f"{best['scoring']} {best['score']:.4f} with {best['params']}")
+        return best
+
+    def _run_halving(self, X, y, pairs):
+        n_rounds = max(1, math.ceil(math.log(len(pairs), self.factor))) if len(pairs) > 1 else 1
+        min_rows = self.min_rows or max(len(X) // self.factor ** (n_rounds - 1), 20 * self.folds)
+        order = stratified_order(y, self.seed)
+        for round_index in range(n_rounds):
+            last = round_index == n_rounds - 1
+            n_rows = len(X) if last else min(len(X), min_rows * self.factor ** round_index)
+            last = last or n_rows == len(X)
+            rows = None if n_rows == len(X) else np.sort(order[:n_rows])
+            records = self._run_round(X, y, pairs, rows, round_index)
+            ranked = sorted(zip(records, pairs), key=lambda item: -item[0]["score"])
+            if last or len(pairs) == 1:
+                return ranked[0][0]
+            pairs = [pair for _, pair in ranked[:max(1, math.ceil(len(pairs) / self.factor))]]
+        return ranked[0][0]
+
+    def summary(self, best):
+        return {
+            "strategy": self.strategy,
+            "scoring": self.scoring,
+            "folds": self.folds,
+            "trials": len(self.records),
+            "wall_seconds": getattr(self, "wall_seconds", None),
+            "trial_seconds": sum(r["wall_seconds"] for r in self.records),
+            "best_model": best["model"],
+            "best_params": best["params"],
+            "best_score": best["score"],
+        }
@@ -1,109 +1,97 @@
+import argparse
 import os
+import sys
 import pandas as pd
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
-
-# Load environment variables from .env
-env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
-load_dotenv(dotenv_path=env_path)
-
-# DB Config
-db_host = os.getenv('db_host')
-db_port = os.getenv('db_port')
-db_name = os.getenv('db_name')
-db_username = os.getenv('db_username')
-db_password = os.getenv('db_password')
-
-# Database URL
-db_url = f'postgresql+psycopg2://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}'
-
-# Create engine
-engine = create_engine(db_url)
-
-# Path to CSV
-csv_file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'fraud_oracle.csv'))
-
-# Load the raw CSV
-df = pd.read_csv(csv_file_path)
-print(f"✅ Loaded raw CSV: {df.shape[0]} rows, {df.shape[1]} columns.")
-
-# --------------------------------
-# Feature Engineering
-# --------------------------------
-
-# Select meaningful features
-meaningful_features = [
-    'NumberOfSuppliments', 'AgeOfVehicle', 'AgeOfPolicyHolder', 'Month',
-    'Deductible', 'MonthClaimed', 'Make', 'AddressChange_Claim',
-    'PastNumberOfClaims', 'VehiclePrice', 'VehicleCategory', 'Fault'
-]
-
-df_meaningful = df[meaningful_features].copy()
-
-# Manual Grouping (feature engineering)
-df_meaningful['NumberOfSuppliments'] = df_meaningful['NumberOfSuppliments'].replace({
-    'none': 'none or 1 to 2',
-    '1 to 2': 'none or 1 to 2',
-    '3 to 5': 'more than 3',
-    'more than 5': 'more than 3'
-})
-df_meaningful['AgeOfVehicle'] = df_meaningful['AgeOfVehicle'].replace({
-    '3 years': '3-4 years',
-    '4 years': '3-4 years',
-    '5 years': 'more than 5 years',
-    '6 years': 'more than 5 years',
-    '7 years': 'more than 5 years',
-    'more than 7': 'more than 5 years'
-})
-df_meaningful['AgeOfPolicyHolder'] = df_meaningful['AgeOfPolicyHolder'].replace({
-    '41 to 50': '41 to 65',
-    '51 to 65': '41 to 65'
-})
-df_meaningful['Month'] = df_meaningful['Month'].replace({
-    'Jan': 'Jan-Feb',
-    'Feb': 'Jan-Feb'
-})
-df_meaningful['Deductible'] = df_meaningful['Deductible'].astype(str)
-df_meaningful['MonthClaimed'] = df_meaningful['MonthClaimed'].replace({
-    'Jan': 'Jan-Feb',
-    'Feb': 'Jan-Feb'
-})
-df_meaningful['Make'] = df_meaningful['Make'].replace({
-    'Lexus': 'Lexus/Ferrari/Porche/Jaguar',
-    'Ferrari': 'Lexus/Ferrari/Porche/Jaguar',
-    'Porche': 'Lexus/Ferrari/Porche/Jaguar',
-    'Jaguar': 'Lexus/Ferrari/Porche/Jaguar'
-})
-df_meaningful['VehiclePrice'] = df_meaningful['VehiclePrice'].replace({
-    '20000 to 29000': '20000 to 39000',
-    '30000 to 39000': '20000 to 39000'
-})
-
-# Add Target Variable
-df_meaningful['FraudFound_P'] = df['FraudFound_P']
-
-# --------------------------------
-# Dummy Encoding
-# --------------------------------
-df_X = df_meaningful.drop('FraudFound_P', axis=1)
-model_data_w_dummy = pd.get_dummies(df_X, drop_first=True)
-model_data_w_dummy['FraudFound_P'] = df_meaningful['FraudFound_P']
-
-print(f"Preprocessed DataFrame shape: {model_data_w_dummy.shape}")
-
-# --------------------------------
-# Save Locally as CSV
-# --------------------------------
-preprocessed_csv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'preprocessed_data.csv'))
-model_data_w_dummy.to_csv(preprocessed_csv_path, index=False)
-print(f"Preprocessed CSV saved at: {preprocessed_csv_path}")
-
-# --------------------------------
-# Insert into RDS
-# --------------------------------
-try:
-    model_data_w_dummy.to_sql('model_data_w_dummy', con=engine, if_exists='replace', index=False)
-    print(f"Data inserted into `model_data_w_dummy` table successfully.")
-except Exception as e:
-    print("Failed to insert data into DB.")
-    print(e)
+
+# Project root on sys.path for the shared deployment modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from deployment.feature_encoder import FeatureEncoder, TARGET
+from scripts.bulk_load import DEFAULT_CHUNKSIZE, MODES, copy_dataframe
+from scripts.dataset import write_dataset
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+csv_file_path = os.path.join(BASE_DIR, 'data', 'fraud_oracle.csv')
+encoder_path = os.path.join(BASE_DIR, 'models', 'encoder.json')
+preprocessed_csv_path = os.path.join(BASE_DIR, 'data', 'preprocessed_data.csv')
+TABLE = 'model_data_w_dummy'
+
+
+def get_encoder(df, mode, encoder_path=encoder_path):
+    """Fit a fresh encoder for a replace; reuse the saved one for append/upsert."""
+    if mode == 'replace':
+        return FeatureEncoder.fit(df)
+    # Incremental loads must keep the table's (and the trained model's) column
+    # layout: reuse the saved encoder rather than refitting on a partial CSV
+    if not os.path.exists(encoder_path):
+        sys.exit(f"❌ No feature encoder at {encoder_path}; run with --mode replace first.")
+    return FeatureEncoder.load(encoder_path)
+
+
+def preprocess(df, encoder):
+    """Dummy-encoded features plus the target, as stored locally and used for training."""
+    # The grouping and dummy layout live in FeatureEncoder so the API encodes
+    # raw claims exactly the way the training data was built.
+    model_data_w_dummy = encoder.transform_frame(df)
+    model_data_w_dummy[TARGET] = df[TARGET]
+    return model_data_w_dummy
+
+
+def db_frame(df, model_data_w_dummy):
+    # PolicyNumber identifies a claim in the table (it is not a model feature)
+    return pd.concat([df[['PolicyNumber']], model_data_w_dummy], axis=1)
+
+
+def main(argv=None):
+    # Load options: a full replace by default, or an incremental append/upsert keyed on PolicyNumber
+    parser = argparse.ArgumentParser(description="Preprocess fraud_oracle.csv and bulk-load model_data_w_dummy")
+    parser.add_argument('--input', default=csv_file_path, help="Raw claims CSV (a full extract or one batch)")
+    parser.add_argument('--mode', choices=MODES, default='replace')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    # Load the raw CSV
+    df = pd.read_csv(args.input)
+    print(f"✅ Loaded raw CSV: {df.shape[0]} rows, {df.shape[1]} columns.")
+
+    # --------------------------------
+    # Feature Engineering + Dummy Encoding
+    # --------------------------------
+    encoder = get_encoder(df, args.mode)
+    model_data_w_dummy = preprocess(df, encoder)
+    print(f"Preprocessed DataFrame shape: {model_data_w_dummy.shape}")
+
+    if args.mode == 'replace':
+        # Save the fitted encoder next to the model
+        os.makedirs(os.path.dirname(encoder_path), exist_ok=True)
+        encoder.save(encoder_path)
+        print(f"Feature encoder saved at: {encoder_path}")
+
+        # --------------------------------
+        # Save Locally (typed Parquet; CSV when pyarrow is unavailable)
+        # --------------------------------
+        saved_path = write_dataset(model_data_w_dummy, preprocessed_csv_path)
+        print(f"Preprocessed data saved at: {saved_path}")
+    else:
+        # The local copy is the full training set; one incremental batch must not overwrite it
+        print(f"⚠️ mode={args.mode}: leaving {preprocessed_csv_path} unchanged.")
+
+    # --------------------------------
+    # Insert into RDS
+    # --------------------------------
+    # Shared pooled engine (DB config comes from .env via scripts/db.py)
+    from scripts.db import get_engine
+
+    conn = get_engine().raw_connection()
+    try:
+        rows = copy_dataframe(conn, db_frame(df, model_data_w_dummy), TABLE, mode=args.mode,
+                              key='PolicyNumber', chunksize=args.chunksize)
+        print(f"Data loaded into `{TABLE}` table successfully ({rows} rows, mode={args.mode}).")
+    except Exception as e:
+        print("Failed to insert data into DB.")
+        print(e)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
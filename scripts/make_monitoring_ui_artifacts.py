@@ -1,14 +1,26 @@
 # scripts/make_monitoring_ui_artifacts.py
+#
+# Each dashboard artifact is built by its own function taking in-memory
+# data, so the Prefect monitoring flow can import them and run the
+# independent ones concurrently; main() runs them one after another.
 
+import argparse
 import os
+import sys
 import pandas as pd
 import joblib
-import shap
-import matplotlib.pyplot as plt
-from evidently import ColumnMapping
-from evidently.report import Report
-from evidently.metric_preset import DataDriftPreset, ClassificationPreset
-from sklearn.metrics import roc_curve, auc, precision_recall_curve
+
+# Project root on sys.path for the shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.dataset import read_dataset
+from scripts.drift import compute_drift, drift_summary, dummy_features, write_summary
+from scripts.plotting import plt, pyplot_lock
+from scripts.shap_summary import (
+    DEFAULT_SAMPLE_SIZE, load_or_compute_shap, plot_beeswarm, plot_importance, stratified_sample,
+)
+from scripts.monitoring_metrics import (
+    DEFAULT_ALERT_THRESHOLDS, compute_metrics, pr_curve_points, roc_curve_points, score_points,
+)
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -19,66 +31,85 @@ MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
 ARTIFACTS_DIR = os.path.join(BASE_DIR, "monitoring_artifacts")
 os.makedirs(ARTIFACTS_DIR, exist_ok=True)
 
+DRIFT_SUMMARY_PATH = os.path.join(ARTIFACTS_DIR, "drift_summary.json")
+METRICS_SUMMARY_PATH = os.path.join(ARTIFACTS_DIR, "metrics_summary.json")
 DASHBOARD_DRIFT_PATH = os.path.join(ARTIFACTS_DIR, "drift_report.html")
 DASHBOARD_PERFORMANCE_PATH = os.path.join(ARTIFACTS_DIR, "performance_report.html")
 ROC_CURVE_PATH = os.path.join(ARTIFACTS_DIR, "roc_curve.png")
 PR_CURVE_PATH = os.path.join(ARTIFACTS_DIR, "pr_curve.png")
+SHAP_CACHE_DIR = os.path.join(ARTIFACTS_DIR, "shap_cache")
 SHAP_BEESWARM_PATH = os.path.join(ARTIFACTS_DIR, "beeswarm.png")
 SHAP_FEATURE_IMPORTANCE_PATH = os.path.join(ARTIFACTS_DIR, "feature_importance.png")
 
-def main():
-    # ─── Load model & data ────────────────────────────────────────────────────────
-    print(f"✅ Loading model from {MODEL_PATH}...")
-    model = joblib.load(MODEL_PATH)
+LABEL_COLUMNS = ["actual", "prediction", "probability"]
 
-    print(f"✅ Loading monitoring data from {MONITORING_DATA_PATH}...")
-    df = pd.read_csv(MONITORING_DATA_PATH)
-    print(f"Monitoring Data Columns: {df.columns.tolist()}")
 
-    # split out truth & preds
+def split_monitoring_data(df):
+    """(y_true, y_pred, y_score, X_monitor) from a monitoring frame."""
     y_true = df["actual"].values
     y_pred = df["prediction"].values
-    feature_cols = [c for c in df.columns if c not in ["actual", "prediction"]]
-    X_monitor = df[feature_cols]
-
-    print(f"✅ Loading reference data from {REFERENCE_DATA_PATH}...")
-    reference_data = pd.read_csv(REFERENCE_DATA_PATH)
-    print(f"Reference Data Columns: {reference_data.columns.tolist()}")
-
-    # ─── Common features + filter out constants ─────────────────────────────────
-    common_features = list(set(reference_data.columns) & set(X_monitor.columns))
-    print(f"✅ Common Features ({len(common_features)}): {common_features}")
-
+    if "probability" in df.columns:
+        y_score = df["probability"].values
+    else:
+        print("⚠️ No probability column in monitoring data; curves fall back to hard predictions.")
+        y_score = y_pred
+    X_monitor = df[[c for c in df.columns if c not in LABEL_COLUMNS]]
+    return y_true, y_pred, y_score, X_monitor
+
+
+def make_drift_summary(reference_data, X_monitor, path=DRIFT_SUMMARY_PATH):
+    """Native drift over all shared dummy columns (one pass); writes and returns the summary."""
+    features = dummy_features(reference_data[[c for c in reference_data.columns if c in set(X_monitor.columns)]])
+    print(f"✅ Computing drift over {len(features)} features...")
+    table = compute_drift(reference_data, X_monitor, features)
+    summary = drift_summary(table, len(reference_data), len(X_monitor))
+    write_summary(summary, path)
+    print(f"✅ {summary['n_drifted']}/{summary['n_features']} features drifted; "
+          f"drift summary saved to {path}")
+    return summary
+
+
+def make_evidently_drift_report(reference_data, X_monitor, summary, path=DASHBOARD_DRIFT_PATH):
+    """Evidently drift dashboard (optional and much slower than the native drift summary)."""
+    from evidently import ColumnMapping
+    from evidently.report import Report
+    from evidently.metric_preset import DataDriftPreset
+
+    # Evidently's drift tests divide by zero on columns constant in either dataset
     varying_features = [
-        f for f in common_features
-        if reference_data[f].nunique() > 1 and X_monitor[f].nunique() > 1
+        row["feature"] for row in summary["features"]
+        if 0.0 < row["reference_share"] < 1.0 and 0.0 < row["current_share"] < 1.0
     ]
     if not varying_features:
         print("⚠️ No features with enough variation for drift analysis; skipping drift report.")
-    else:
-        print(f"✅ Using {len(varying_features)} varying features for drift: {varying_features}")
-
-    # ─── Drift Report ──────────────────────────────────────────────────────────
-    if varying_features:
-        try:
-            drift_mapping = ColumnMapping(
-                numerical_features=varying_features,
-                categorical_features=[],
-                target=None,
-                prediction=None,
-            )
-            drift_report = Report(metrics=[DataDriftPreset()])
-            drift_report.run(
-                reference_data=reference_data[varying_features],
-                current_data=X_monitor[varying_features],
-                column_mapping=drift_mapping
-            )
-            drift_report.save_html(DASHBOARD_DRIFT_PATH)
-            print(f"✅ Drift report saved to {DASHBOARD_DRIFT_PATH}")
-        except ZeroDivisionError:
-            print("⚠️ Evidently computed zero drift metrics—skipping drift dashboard.")
-
-    # ─── Performance Report ────────────────────────────────────────────────────
+        return None
+    try:
+        drift_mapping = ColumnMapping(
+            numerical_features=varying_features,
+            categorical_features=[],
+            target=None,
+            prediction=None,
+        )
+        drift_report = Report(metrics=[DataDriftPreset()])
+        # Evidently skips bool columns as non-numeric; pass the dummies as 0/1 ints
+        drift_report.run(
+            reference_data=reference_data[varying_features].astype("int8"),
+            current_data=X_monitor[varying_features].astype("int8"),
+            column_mapping=drift_mapping
+        )
+        drift_report.save_html(path)
+        print(f"✅ Drift report saved to {path}")
+        return path
+    except ZeroDivisionError:
+        print("⚠️ Evidently computed zero drift metrics—skipping drift dashboard.")
+        return None
+
+
+def make_evidently_performance_report(y_true, y_pred, path=DASHBOARD_PERFORMANCE_PATH):
+    from evidently import ColumnMapping
+    from evidently.report import Report
+    from evidently.metric_preset import ClassificationPreset
+
     print("✅ Generating Performance Report...")
     perf_df = pd.DataFrame({"target": y_true, "prediction": y_pred})
     perf_mapping = ColumnMapping(
@@ -93,58 +124,110 @@ def main():
         current_data=perf_df,
         column_mapping=perf_mapping
     )
-    perf_report.save_html(DASHBOARD_PERFORMANCE_PATH)
-    print(f"✅ Performance report saved to {DASHBOARD_PERFORMANCE_PATH}")
-
-    # ─── ROC Curve ─────────────────────────────────────────────────────────────
-    print("✅ Generating ROC Curve...")
-    fpr, tpr, _ = roc_curve(y_true, y_pred)
-    roc_auc = auc(fpr, tpr)
-    plt.figure()
-    plt.plot(fpr, tpr, lw=2, label=f"ROC AUC = {roc_auc:.2f}")
-    plt.plot([0, 1], [0, 1], lw=2, linestyle="--")
-    plt.xlabel("False Positive Rate")
-    plt.ylabel("True Positive Rate")
-    plt.title("ROC Curve")
-    plt.legend(loc="lower right")
-    plt.grid()
-    plt.savefig(ROC_CURVE_PATH)
-    plt.close()
-    print(f"✅ ROC curve saved to {ROC_CURVE_PATH}")
-
-    # ─── Precision-Recall Curve ───────────────────────────────────────────────
-    print("✅ Generating Precision-Recall Curve...")
-    precision, recall, _ = precision_recall_curve(y_true, y_pred)
-    plt.figure()
-    plt.plot(recall, precision, lw=2)
-    plt.xlabel("Recall")
-    plt.ylabel("Precision")
-    plt.title("Precision-Recall Curve")
-    plt.grid()
-    plt.savefig(PR_CURVE_PATH)
-    plt.close()
-    print(f"✅ PR curve saved to {PR_CURVE_PATH}")
-
-    # ─── SHAP Summary Plots ────────────────────────────────────────────────────
+    perf_report.save_html(path)
+    print(f"✅ Performance report saved to {path}")
+    return path
+
+
+def make_curves(y_true, y_score, alert_thresholds=DEFAULT_ALERT_THRESHOLDS, approx_bins=None,
+                metrics_path=METRICS_SUMMARY_PATH, roc_path=ROC_CURVE_PATH, pr_path=PR_CURVE_PATH):
+    """Probability metrics (one sort) plus the ROC and PR curve plots; returns the metrics."""
+    points = score_points(y_true, y_score, approx_bins)
+    metrics = compute_metrics(y_true, y_score, alert_thresholds=alert_thresholds,
+                              approx_bins=approx_bins, points=points)
+    write_summary(metrics, metrics_path)
+    print(f"✅ ROC AUC {metrics['roc_auc']:.3f}, PR AUC {metrics['pr_auc']:.3f}; "
+          f"metrics saved to {metrics_path}")
+    _, tps, fps = points
+
+    with pyplot_lock:
+        # ─── ROC Curve ─────────────────────────────────────────────────────────
+        print("✅ Generating ROC Curve...")
+        fpr, tpr = roc_curve_points(tps, fps)
+        plt.figure()
+        plt.plot(fpr, tpr, lw=2, label=f"ROC AUC = {metrics['roc_auc']:.2f}")
+        plt.plot([0, 1], [0, 1], lw=2, linestyle="--")
+        plt.xlabel("False Positive Rate")
+        plt.ylabel("True Positive Rate")
+        plt.title("ROC Curve")
+        plt.legend(loc="lower right")
+        plt.grid()
+        plt.savefig(roc_path)
+        plt.close()
+        print(f"✅ ROC curve saved to {roc_path}")
+
+        # ─── Precision-Recall Curve ────────────────────────────────────────────
+        print("✅ Generating Precision-Recall Curve...")
+        recall, precision = pr_curve_points(tps, fps)
+        plt.figure()
+        plt.plot(recall, precision, lw=2, label=f"PR AUC = {metrics['pr_auc']:.2f}")
+        plt.xlabel("Recall")
+        plt.ylabel("Precision")
+        plt.title("Precision-Recall Curve")
+        plt.legend(loc="upper right")
+        plt.grid()
+        plt.savefig(pr_path)
+        plt.close()
+        print(f"✅ PR curve saved to {pr_path}")
+    return metrics
+
+
+def make_shap_plots(model, df, X_monitor, model_path=MODEL_PATH, sample_size=DEFAULT_SAMPLE_SIZE, workers=0,
+                    start_method=None, beeswarm_path=SHAP_BEESWARM_PATH,
+                    importance_path=SHAP_FEATURE_IMPORTANCE_PATH):
     print("✅ Generating SHAP Summary Plots...")
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X_monitor)
+    sample = stratified_sample(df, budget=sample_size)
+    X_shap = X_monitor.iloc[sample]
+    shap_values, cached = load_or_compute_shap(model, model_path, X_shap, SHAP_CACHE_DIR,
+                                               workers=workers, start_method=start_method)
+    print(f"✅ SHAP values for {len(X_shap)}/{len(X_monitor)} rows "
+          f"{'read from cache' if cached else 'computed'}")
 
     # Beeswarm
-    plt.figure()
-    shap.summary_plot(shap_values, X_monitor, show=False)
-    plt.tight_layout()
-    plt.savefig(SHAP_BEESWARM_PATH, bbox_inches="tight")
-    plt.close()
-    print(f"✅ SHAP beeswarm plot saved to {SHAP_BEESWARM_PATH}")
+    plot_beeswarm(shap_values, X_shap, beeswarm_path)
+    print(f"✅ SHAP beeswarm plot saved to {beeswarm_path}")
 
     # Feature importance bar
-    plt.figure()
-    shap.summary_plot(shap_values, X_monitor, plot_type="bar", show=False)
-    plt.tight_layout()
-    plt.savefig(SHAP_FEATURE_IMPORTANCE_PATH, bbox_inches="tight")
-    plt.close()
-    print(f"✅ SHAP feature importance plot saved to {SHAP_FEATURE_IMPORTANCE_PATH}")
+    plot_importance(shap_values, list(X_shap.columns), importance_path)
+    print(f"✅ SHAP feature importance plot saved to {importance_path}")
+    return [beeswarm_path, importance_path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the monitoring dashboard artifacts")
+    parser.add_argument("--evidently", action="store_true",
+                        default=os.getenv("MONITORING_EVIDENTLY_HTML", "0") == "1",
+                        help="Also render the Evidently HTML reports (slow; needs evidently installed)")
+    parser.add_argument("--alert-thresholds", type=float, nargs="+", default=list(DEFAULT_ALERT_THRESHOLDS),
+                        help="Fraud probability cut-offs to report precision/recall for")
+    parser.add_argument("--approx-bins", type=int,
+                        help="Approximate the curves with this many score bins instead of an exact sort")
+    parser.add_argument("--shap-sample", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help="Rows explained by SHAP, stratified by prediction and actual (0 = all rows)")
+    parser.add_argument("--shap-workers", type=int, default=0,
+                        help="SHAP processes; 1 computes in-process, 0 uses every core")
+    args = parser.parse_args()
+
+    # ─── Load model & data ────────────────────────────────────────────────────────
+    print(f"✅ Loading model from {MODEL_PATH}...")
+    model = joblib.load(MODEL_PATH)
+
+    print(f"✅ Loading monitoring data from {MONITORING_DATA_PATH}...")
+    df = read_dataset(MONITORING_DATA_PATH)
+    print(f"Monitoring Data Columns: {df.columns.tolist()}")
+    y_true, y_pred, y_score, X_monitor = split_monitoring_data(df)
+
+    print(f"✅ Loading reference data from {REFERENCE_DATA_PATH}...")
+    reference_data = read_dataset(REFERENCE_DATA_PATH)
+    print(f"Reference Data Columns: {reference_data.columns.tolist()}")
+
+    summary = make_drift_summary(reference_data, X_monitor)
+    if args.evidently:
+        make_evidently_drift_report(reference_data, X_monitor, summary)
+        make_evidently_performance_report(y_true, y_pred)
+    make_curves(y_true, y_score, args.alert_thresholds, args.approx_bins)
+    make_shap_plots(model, df, X_monitor, sample_size=args.shap_sample, workers=args.shap_workers)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,158 @@
+# scripts/monitoring_metrics.py
+#
+# Probability-based classification metrics for monitoring.
+#
+# Everything comes from one sort of the fraud probabilities: the sorted
+# scores give cumulative true/false positive counts at every distinct
+# threshold, and ROC-AUC, PR-AUC (average precision) and precision/recall
+# at any alert threshold are read off those arrays. For very large
+# windows the sort can be replaced by a fixed-bin histogram of scores
+# per class; histograms from separate chunks simply add up.
+
+import numpy as np
+
+DEFAULT_ALERT_THRESHOLDS = (0.3, 0.5, 0.7)
+DEFAULT_CALIBRATION_BINS = 10
+
+
+def curve_points(y_true, scores):
+    """(thresholds, tps, fps) at every distinct score, thresholds descending."""
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind="mergesort")
+    scores, y_sorted = scores[order], y_true[order]
+
+    # Last index of each run of equal scores
+    distinct = np.flatnonzero(np.diff(scores))
+    ends = np.r_[distinct, len(scores) - 1]
+    tps = np.cumsum(y_sorted, dtype=np.int64)[ends]
+    fps = ends + 1 - tps
+    return scores[ends], tps, fps
+
+
+def histogram_counts(y_true, scores, bins=1000):
+    """Per-bin (positives, negatives) over [0, 1]; mergeable across chunks by addition."""
+    y_true = np.asarray(y_true).astype(bool)
+    idx = np.minimum((np.asarray(scores, dtype=np.float64) * bins).astype(np.int64), bins - 1)
+    pos = np.bincount(idx[y_true], minlength=bins)
+    neg = np.bincount(idx[~y_true], minlength=bins)
+    return pos, neg
+
+
+def histogram_points(pos, neg):
+    """Approximate curve_points() from histogram_counts(); thresholds are the bin lower edges."""
+    bins = len(pos)
+    pos, neg = np.asarray(pos)[::-1], np.asarray(neg)[::-1]
+    tps, fps = np.cumsum(pos, dtype=np.int64), np.cumsum(neg, dtype=np.int64)
+    thresholds = (bins - 1 - np.arange(bins)) / bins
+    nonempty = (pos + neg) > 0
+    return thresholds[nonempty], tps[nonempty], fps[nonempty]
+
+
+def roc_auc(tps, fps):
+    if tps[-1] == 0 or fps[-1] == 0:
+        return float("nan")
+    tpr = np.r_[0.0, tps / tps[-1]]
+    fpr = np.r_[0.0, fps / fps[-1]]
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def pr_auc(tps, fps):
+    """Average precision: sum over thresholds of (recall step) x precision."""
+    if tps[-1] == 0:
+        return float("nan")
+    precision = tps / (tps + fps)
+    recall = tps / tps[-1]
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def roc_curve_points(tps, fps):
+    """(fpr, tpr) starting at (0, 0), ready for plotting."""
+    return np.r_[0.0, fps / max(fps[-1], 1)], np.r_[0.0, tps / max(tps[-1], 1)]
+
+
+def pr_curve_points(tps, fps):
+    """(recall, precision) starting at recall 0, ready for plotting."""
+    precision = tps / (tps + fps)
+    recall = tps / max(tps[-1], 1)
+    return np.r_[0.0, recall], np.r_[precision[0], precision]
+
+
+def threshold_metrics(thresholds, tps, fps, alert_thresholds=DEFAULT_ALERT_THRESHOLDS):
+    """Confusion-derived metrics when alerting on score >= t, for each t."""
+    positives, negatives = int(tps[-1]), int(fps[-1])
+    # thresholds are descending; count points at or above each alert threshold
+    k = np.searchsorted(-thresholds, -np.asarray(alert_thresholds, dtype=np.float64), side="right")
+    results = []
+    for t, n in zip(alert_thresholds, k):
+        tp = int(tps[n - 1]) if n else 0
+        fp = int(fps[n - 1]) if n else 0
+        alerts = tp + fp
+        precision = tp / alerts if alerts else 0.0
+        recall = tp / positives if positives else 0.0
+        results.append({
+            "threshold": float(t),
+            "alerts": alerts,
+            "alert_rate": alerts / (positives + negatives),
+            "tp": tp,
+            "fp": fp,
+            "fn": positives - tp,
+            "tn": negatives - fp,
+            "precision": precision,
+            "recall": recall,
+            "fpr": fp / negatives if negatives else 0.0,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        })
+    return results
+
+
+def calibration_bins(y_true, scores, n_bins=DEFAULT_CALIBRATION_BINS):
+    """Reliability table over equal-width probability bins plus ECE and Brier score."""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    idx = np.minimum((scores * n_bins).astype(np.int64), n_bins - 1)
+    count = np.bincount(idx, minlength=n_bins)
+    score_sum = np.bincount(idx, weights=scores, minlength=n_bins)
+    label_sum = np.bincount(idx, weights=y_true, minlength=n_bins)
+
+    bins = []
+    for b in np.flatnonzero(count):
+        bins.append({
+            "lower": b / n_bins,
+            "upper": (b + 1) / n_bins,
+            "count": int(count[b]),
+            "mean_predicted": float(score_sum[b] / count[b]),
+            "observed_rate": float(label_sum[b] / count[b]),
+        })
+    ece = float(np.sum(np.abs(score_sum - label_sum)) / max(len(scores), 1))
+    brier = float(np.mean((scores - y_true) ** 2)) if len(scores) else float("nan")
+    return {"bins": bins, "ece": ece, "brier": brier}
+
+
+def score_points(y_true, scores, approx_bins=None):
+    """Exact curve_points(), or the histogram approximation when `approx_bins` is set.
+
+    The approximation skips the O(n log n) sort; its error is bounded by
+    the bin width.
+    """
+    if approx_bins:
+        return histogram_points(*histogram_counts(y_true, scores, approx_bins))
+    return curve_points(y_true, scores)
+
+
+def compute_metrics(y_true, scores, alert_thresholds=DEFAULT_ALERT_THRESHOLDS,
+                    calibration=DEFAULT_CALIBRATION_BINS, approx_bins=None, points=None):
+    """ROC-AUC, PR-AUC, threshold table and calibration for fraud probabilities.
+
+    Pass `points` from score_points() to reuse a sort the caller already did.
+    """
+    thresholds, tps, fps = points if points is not None else score_points(y_true, scores, approx_bins)
+    return {
+        "rows": int(tps[-1] + fps[-1]),
+        "positives": int(tps[-1]),
+        "approx_bins": approx_bins,
+        "roc_auc": roc_auc(tps, fps),
+        "pr_auc": pr_auc(tps, fps),
+        "thresholds": threshold_metrics(thresholds, tps, fps, alert_thresholds),
+        "calibration": calibration_bins(y_true, scores, calibration),
+    }
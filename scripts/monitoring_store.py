@@ -0,0 +1,256 @@
+# scripts/monitoring_store.py
+#
+# Incremental monitoring store.
+#
+# Instead of reloading the full reference and monitoring history every
+# day, each batch of scored claims is reduced to a small sketch --
+# per-feature dummy counts, a histogram of fraud probabilities and
+# confusion counts -- and merged into the sketch of its time bucket
+# (one JSON file per day). Drift is computed from the merged sketches, so
+# the daily job costs O(new data) and any window of days can be compared
+# against the reference without touching raw rows.
+#
+#   python scripts/monitoring_store.py                       # today's bucket from monitoring_data
+#   python scripts/monitoring_store.py --bucket 2024-06-01 --input data/new_batch.parquet
+#   python scripts/monitoring_store.py --window 7             # drift over the last 7 buckets
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from scripts.dataset import read_dataset, resolve_dataset_path
+from scripts.drift import drift_summary, drift_table, write_summary
+
+STORE_DIR = os.path.join(BASE_DIR, "monitoring_store")
+REFERENCE_DATA_PATH = os.path.join(BASE_DIR, "data", "reference_data.csv")
+MONITORING_DATA_PATH = os.path.join(BASE_DIR, "data", "monitoring_data.csv")
+SUMMARY_PATH = os.path.join(BASE_DIR, "monitoring_artifacts", "drift_incremental.json")
+
+LABEL_COLUMNS = ("actual", "prediction", "probability")
+SCORE_BINS = 20
+
+
+class Sketch:
+    """Mergeable sufficient statistics for one batch / bucket of rows."""
+
+    def __init__(self, feature_names, rows=0, ones=None, score_hist=None, confusion=None, batches=()):
+        self.feature_names = list(feature_names)
+        self.rows = int(rows)
+        self.ones = np.zeros(len(self.feature_names), dtype=np.int64) if ones is None else np.asarray(ones, dtype=np.int64)
+        self.score_hist = np.zeros(SCORE_BINS, dtype=np.int64) if score_hist is None else np.asarray(score_hist, dtype=np.int64)
+        # [[tn, fp], [fn, tp]]
+        self.confusion = np.zeros((2, 2), dtype=np.int64) if confusion is None else np.asarray(confusion, dtype=np.int64)
+        self.batches = list(batches)
+
+    @classmethod
+    def from_frame(cls, df, feature_names=None, batch_id=None):
+        if feature_names is None:
+            feature_names = [c for c in df.columns if c not in LABEL_COLUMNS]
+        X = df[feature_names].to_numpy()
+        sketch = cls(feature_names, rows=len(df), ones=np.count_nonzero(X, axis=0))
+
+        if "probability" in df.columns:
+            proba = df["probability"].to_numpy(dtype=np.float64)
+            bins = np.minimum((proba * SCORE_BINS).astype(np.int64), SCORE_BINS - 1)
+            sketch.score_hist = np.bincount(bins, minlength=SCORE_BINS).astype(np.int64)
+        if "actual" in df.columns and "prediction" in df.columns:
+            cells = 2 * df["actual"].to_numpy(dtype=np.int64) + df["prediction"].to_numpy(dtype=np.int64)
+            sketch.confusion = np.bincount(cells, minlength=4).astype(np.int64).reshape(2, 2)
+        if batch_id is not None:
+            sketch.batches.append(batch_id)
+        return sketch
+
+    def counts(self):
+        """(n_features, 2) False/True counts, the input format of scripts/drift.py."""
+        return np.stack([self.rows - self.ones, self.ones], axis=1)
+
+    def merge(self, other):
+        if other.feature_names != self.feature_names:
+            raise ValueError("Cannot merge sketches over different feature sets")
+        return Sketch(
+            self.feature_names,
+            rows=self.rows + other.rows,
+            ones=self.ones + other.ones,
+            score_hist=self.score_hist + other.score_hist,
+            confusion=self.confusion + other.confusion,
+            batches=self.batches + [b for b in other.batches if b not in self.batches],
+        )
+
+    def to_dict(self):
+        return {
+            "feature_names": self.feature_names,
+            "rows": self.rows,
+            "ones": self.ones.tolist(),
+            "score_hist": self.score_hist.tolist(),
+            "confusion": self.confusion.tolist(),
+            "batches": self.batches,
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        return cls(**payload)
+
+
+class MonitoringStore:
+    """Directory of per-bucket sketches plus the reference sketch."""
+
+    def __init__(self, root):
+        self.root = root
+        self.buckets_dir = os.path.join(root, "buckets")
+        self.reference_path = os.path.join(root, "reference.json")
+
+    def buckets(self):
+        if not os.path.isdir(self.buckets_dir):
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.buckets_dir) if name.endswith(".json"))
+
+    def _bucket_path(self, bucket):
+        return os.path.join(self.buckets_dir, f"{bucket}.json")
+
+    def load_bucket(self, bucket):
+        path = self._bucket_path(bucket)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return Sketch.from_dict(json.load(f))
+
+    def reference(self):
+        if not os.path.exists(self.reference_path):
+            return None
+        with open(self.reference_path) as f:
+            return Sketch.from_dict(json.load(f))
+
+    def set_reference(self, sketch):
+        self._write_json_atomic(self.reference_path, sketch.to_dict())
+
+    def bucket_of(self, batch_id):
+        """The bucket `batch_id` was merged into, or None."""
+        for bucket in self.buckets():
+            if batch_id in self.load_bucket(bucket).batches:
+                return bucket
+        return None
+
+    def update(self, sketch, bucket):
+        """Merge a batch sketch into `bucket`.
+
+        Returns False (and merges nothing) if the batch is already in any
+        bucket, so re-feeding yesterday's batch today doesn't count it twice.
+        """
+        if sketch.batches and all(self.bucket_of(b) is not None for b in sketch.batches):
+            return False
+        current = self.load_bucket(bucket)
+        merged = sketch if current is None else current.merge(sketch)
+        self._write_json_atomic(self._bucket_path(bucket), merged.to_dict())
+        return True
+
+    def merged(self, buckets=None):
+        """One sketch over `buckets` (default: all buckets)."""
+        result = None
+        for bucket in self.buckets() if buckets is None else buckets:
+            sketch = self.load_bucket(bucket)
+            if sketch is not None:
+                result = sketch if result is None else result.merge(sketch)
+        return result
+
+    def drift(self, buckets=None):
+        reference, current = self.reference(), self.merged(buckets)
+        if reference is None or current is None:
+            raise ValueError("Drift needs a reference sketch and at least one bucket")
+        features = [f for f in reference.feature_names if f in current.feature_names]
+        ref_idx = [reference.feature_names.index(f) for f in features]
+        cur_idx = [current.feature_names.index(f) for f in features]
+        return drift_table(reference.counts()[ref_idx], current.counts()[cur_idx], features)
+
+    @staticmethod
+    def _write_json_atomic(path, payload):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+
+def batch_id_for(path):
+    """Stable id for an input file (or bitset directory), so re-running a day doesn't double count it."""
+    digest = hashlib.sha256()
+    files = [os.path.join(path, name) for name in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+    for file in files:
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return f"{os.path.basename(path.rstrip('/'))}:{digest.hexdigest()[:16]}"
+
+
+def frame_batch_id(df):
+    """Stable id for an in-memory batch (same role as batch_id_for)."""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return f"frame:{digest.hexdigest()[:16]}"
+
+
+def update_store(store, batch, bucket, batch_id=None, reference=None, reference_id=None, window=None,
+                 summary_path=SUMMARY_PATH):
+    """Merge one batch DataFrame into `bucket`, then write and return the drift summary.
+
+    `reference` (a DataFrame) replaces the reference sketch when given. With
+    a `reference_id` (e.g. the model's sha256), it is only rebuilt when the
+    stored reference was built under a different id.
+    """
+    current_reference = store.reference()
+    if reference is not None and (reference_id is None or current_reference is None
+                                  or reference_id not in current_reference.batches):
+        reference_sketch = Sketch.from_frame(reference, batch_id=reference_id)
+        store.set_reference(reference_sketch)
+        print(f"✅ Reference sketch built from {reference_sketch.rows} rows")
+
+    sketch = Sketch.from_frame(batch, batch_id=batch_id or frame_batch_id(batch))
+    if store.update(sketch, bucket):
+        print(f"✅ Merged {sketch.rows} rows into bucket {bucket}")
+    else:
+        print(f"⚠️ Batch {sketch.batches[0]} is already in bucket {store.bucket_of(sketch.batches[0])}; skipping")
+
+    buckets = store.buckets()[-window:] if window else store.buckets()
+    table = store.drift(buckets)
+    summary = drift_summary(table, store.reference().rows, store.merged(buckets).rows)
+    summary["buckets"] = buckets
+    write_summary(summary, summary_path)
+    print(f"✅ {summary['n_drifted']}/{summary['n_features']} features drifted; summary saved to {summary_path}")
+    return summary
+
+
+def today_bucket():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge a batch of scored claims into the monitoring store")
+    parser.add_argument("--input", default=MONITORING_DATA_PATH)
+    parser.add_argument("--reference", default=REFERENCE_DATA_PATH)
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--bucket", default=today_bucket(),
+                        help="Time bucket the batch belongs to (default: today, UTC)")
+    parser.add_argument("--window", type=int, help="Compare only the last N buckets (default: all)")
+    parser.add_argument("--rebuild-reference", action="store_true")
+    parser.add_argument("--summary", default=SUMMARY_PATH)
+    args = parser.parse_args()
+
+    store = MonitoringStore(args.store)
+    reference = None
+    if args.rebuild_reference or store.reference() is None:
+        reference = read_dataset(args.reference)
+
+    input_path = resolve_dataset_path(args.input)
+    print(f"✅ Reading batch from {input_path}")
+    update_store(store, read_dataset(input_path), args.bucket, batch_id=batch_id_for(input_path),
+                 reference=reference, window=args.window, summary_path=args.summary)
+
+
+if __name__ == "__main__":
+    main()
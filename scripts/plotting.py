@@ -0,0 +1,22 @@
+# scripts/plotting.py
+#
+# pyplot keeps one global "current figure", so two threads drawing at once
+# (e.g. concurrent Prefect tasks) would draw into each other's plots.
+# Every artifact plot is drawn while holding pyplot_lock.
+
+import threading
+import matplotlib
+
+# Headless backend: artifacts are only ever saved to files
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+# The first figure resolves the backend and probes sys.modules["IPython"]
+# (once per canvas class). A concurrent `import shap`, which imports IPython,
+# can leave that module half-initialized at the moment of the probe, so make
+# the first figure here, at import time.
+plt.close(plt.figure())
+
+pyplot_lock = threading.RLock()
+
+__all__ = ["plt", "pyplot_lock"]
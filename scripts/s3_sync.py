@@ -0,0 +1,220 @@
+# scripts/s3_sync.py
+#
+# Change-aware, concurrent uploads to S3.
+#
+# Each file's S3-style ETag (MD5, or MD5-of-part-MD5s for multipart
+# uploads with our part size) is computed locally and compared against a
+# manifest of what was last uploaded -- and, failing that, against the
+# remote object's ETag via HEAD -- so unchanged files are never sent
+# again. Changed files go up concurrently through a thread pool, large
+# ones as multipart transfers. ETags are remembered per (size, mtime), so
+# an unchanged file isn't even re-hashed on the next run.
+#
+#   python scripts/s3_sync.py                       # model, batch predictions, monitoring artifacts
+#   python scripts/s3_sync.py --bucket my-bucket --dry-run
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(BASE_DIR, ".s3_upload_manifest.json")
+BUCKET_NAME = "insurance-fraud-detection-data"
+
+MIB = 1024 * 1024
+MULTIPART_THRESHOLD = 64 * MIB
+MULTIPART_CHUNKSIZE = 16 * MIB
+DEFAULT_WORKERS = 8
+
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".png": "image/png",
+    ".json": "application/json",
+    ".csv": "text/csv",
+    ".parquet": "application/vnd.apache.parquet",
+}
+
+
+def guess_content_type(filename):
+    return CONTENT_TYPES.get(os.path.splitext(filename)[1].lower(), "binary/octet-stream")
+
+
+def s3_etag(path, multipart_threshold=MULTIPART_THRESHOLD, multipart_chunksize=MULTIPART_CHUNKSIZE):
+    """The ETag S3 assigns to `path` when uploaded with these transfer settings."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if size < multipart_threshold:
+            digest = hashlib.md5()
+            for block in iter(lambda: f.read(MIB), b""):
+                digest.update(block)
+            return f'"{digest.hexdigest()}"'
+        part_digests = []
+        for part in iter(lambda: f.read(multipart_chunksize), b""):
+            part_digests.append(hashlib.md5(part).digest())
+    return f'"{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}"'
+
+
+class Uploader:
+    """Upload files to one bucket concurrently, skipping content S3 already has."""
+
+    def __init__(self, s3_client, bucket, manifest_path=MANIFEST_PATH, workers=DEFAULT_WORKERS,
+                 multipart_threshold=MULTIPART_THRESHOLD, multipart_chunksize=MULTIPART_CHUNKSIZE,
+                 check_remote=True):
+        from boto3.s3.transfer import TransferConfig
+
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.check_remote = check_remote
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=4,
+        )
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if self.manifest_path and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {}
+
+    def save_manifest(self):
+        if not self.manifest_path:
+            return
+        with self._lock:
+            payload = json.dumps(self.manifest, indent=2, sort_keys=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _local_etag(self, path, uri):
+        stat = os.stat(path)
+        with self._lock:
+            entry = self.manifest.get(uri)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns \
+                and entry.get("chunksize") == self.multipart_chunksize:
+            return entry["etag"], stat
+        return s3_etag(path, self.multipart_threshold, self.multipart_chunksize), stat
+
+    def _remote_etag(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            return self.s3.head_object(Bucket=self.bucket, Key=key)["ETag"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def upload(self, path, key, dry_run=False):
+        """Upload one file unless S3 already holds the same content. Returns a result dict."""
+        uri = f"s3://{self.bucket}/{key}"
+        etag, stat = self._local_etag(path, uri)
+        with self._lock:
+            recorded = self.manifest.get(uri, {}).get("etag")
+
+        status = "uploaded"
+        if recorded == etag:
+            status = "unchanged"
+        elif self.check_remote and self._remote_etag(key) == etag:
+            status = "exists"
+        elif dry_run:
+            status = "would upload"
+        else:
+            self.s3.upload_file(path, self.bucket, key, ExtraArgs={"ContentType": guess_content_type(path)},
+                                Config=self.transfer_config)
+
+        if status != "would upload":
+            with self._lock:
+                self.manifest[uri] = {
+                    "etag": etag,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "chunksize": self.multipart_chunksize,
+                }
+        return {"path": path, "key": key, "status": status, "bytes": stat.st_size if status == "uploaded" else 0}
+
+    def _upload_or_report(self, path, key, dry_run=False):
+        # One file failing (missing, unreadable, rejected) must not stop the others
+        try:
+            return self.upload(path, key, dry_run=dry_run)
+        except Exception as e:
+            return {"path": path, "key": key, "status": "failed", "bytes": 0, "error": str(e)}
+
+    def upload_files(self, files, dry_run=False):
+        """Upload (local_path, key) pairs concurrently; the manifest is saved once at the end.
+
+        Each file succeeds or fails on its own; failures come back with
+        status "failed" and the error message.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(lambda pair: self._upload_or_report(*pair, dry_run=dry_run), files))
+        finally:
+            if not dry_run:
+                self.save_manifest()
+        for result in results:
+            if result["status"] == "uploaded":
+                print(f"✅ Uploaded {result['path']} -> s3://{self.bucket}/{result['key']}")
+            elif result["status"] == "failed":
+                print(f"❌ Failed to upload {result['path']}: {result['error']}")
+        return results
+
+    def upload_directory(self, local_dir, prefix, exclude_dirs=(), dry_run=False):
+        files = []
+        for root, dirs, names in os.walk(local_dir):
+            dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith(".")]
+            for name in names:
+                if name.startswith(".") or name.endswith(".tmp"):
+                    continue
+                local_path = os.path.join(root, name)
+                rel_path = os.path.relpath(local_path, local_dir).replace("\\", "/")
+                files.append((local_path, f"{prefix.rstrip('/')}/{rel_path}"))
+        return self.upload_files(sorted(files), dry_run=dry_run)
+
+
+def summarize(results):
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    sent = sum(r["bytes"] for r in results) / MIB
+    return ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) + f" ({sent:.1f} MiB sent)"
+
+
+def main():
+    import boto3
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=os.path.join(BASE_DIR, ".env"))
+
+    parser = argparse.ArgumentParser(description="Upload changed model, prediction and monitoring outputs to S3")
+    parser.add_argument("--bucket", default=BUCKET_NAME)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--no-remote-check", action="store_true",
+                        help="Trust the local manifest only; don't HEAD objects it doesn't know")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    uploader = Uploader(boto3.client("s3"), args.bucket, manifest_path=args.manifest, workers=args.workers,
+                        check_remote=not args.no_remote_check)
+    files = [
+        (os.path.join(BASE_DIR, "models", "model.pkl"), "models/model.pkl"),
+        (os.path.join(BASE_DIR, "data", "batch_predictions.csv"), "predictions/batch_predictions.csv"),
+    ]
+    results = uploader.upload_files([(path, key) for path, key in files if os.path.exists(path)], dry_run=args.dry_run)
+    results += uploader.upload_directory(os.path.join(BASE_DIR, "monitoring_artifacts"), "monitoring",
+                                         exclude_dirs=("shap_cache",), dry_run=args.dry_run)
+    print(f"✅ {summarize(results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# scripts/score_db.py
+#
+# Score claims straight from the database.
+#
+# Rows of model_data_w_dummy are read in key order through a named
+# (server-side) cursor, scored chunk by chunk and bulk-COPYed into the
+# predictions table. The last PolicyNumber scored is kept in the
+# scoring_state table and advanced in the same transaction as each
+# chunk's predictions, so a run resumes exactly where the previous one
+# stopped and the full table is never held in memory.
+#
+#   python scripts/score_db.py                  # score rows added since the last run
+#   python scripts/score_db.py --reset          # rescore from the beginning
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from deployment.model_bundle import ModelBundle, file_sha256
+from deployment.model_registry import ModelRegistry
+from scripts.bulk_load import copy_dataframe, quote_ident
+from scripts.db import connection, stream_query
+
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+ENCODER_PATH = os.path.join(BASE_DIR, "models", "encoder.json")
+REGISTRY_DIR = os.path.join(BASE_DIR, "models", "registry")
+
+KEY = "PolicyNumber"
+SOURCE_TABLE = "model_data_w_dummy"
+PREDICTIONS_TABLE = "predictions"
+STATE_TABLE = "scoring_state"
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def ensure_state_table(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {quote_ident(STATE_TABLE)} (
+                job text PRIMARY KEY,
+                last_key bigint NOT NULL,
+                model_version text,
+                rows_scored bigint NOT NULL DEFAULT 0,
+                updated_at timestamp NOT NULL DEFAULT now()
+            )
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def get_high_water_mark(conn, job):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT last_key FROM {quote_ident(STATE_TABLE)} WHERE job = %s", (job,))
+        row = cur.fetchone()
+    finally:
+        cur.close()
+    conn.rollback()
+    return None if row is None else row[0]
+
+
+def set_high_water_mark(conn, job, last_key, model_version, rows):
+    """Stage the new high-water mark; it is committed together with the chunk's predictions."""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            INSERT INTO {quote_ident(STATE_TABLE)} (job, last_key, model_version, rows_scored, updated_at)
+            VALUES (%s, %s, %s, %s, now())
+            ON CONFLICT (job) DO UPDATE SET
+                last_key = EXCLUDED.last_key,
+                model_version = EXCLUDED.model_version,
+                rows_scored = {quote_ident(STATE_TABLE)}.rows_scored + EXCLUDED.rows_scored,
+                updated_at = EXCLUDED.updated_at
+        """, (job, int(last_key), model_version, int(rows)))
+    finally:
+        cur.close()
+
+
+def reset_high_water_mark(conn, job):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DELETE FROM {quote_ident(STATE_TABLE)} WHERE job = %s", (job,))
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def source_query(feature_names, table, after_key):
+    columns = ", ".join(quote_ident(c) for c in [KEY, *feature_names])
+    sql = f"SELECT {columns} FROM {quote_ident(table)}"
+    params = None
+    if after_key is not None:
+        sql += f" WHERE {quote_ident(KEY)} > %s"
+        params = (int(after_key),)
+    return sql + f" ORDER BY {quote_ident(KEY)}", params
+
+
+def score_rows(bundle, chunk):
+    """Predictions frame for one chunk of (PolicyNumber, dummy columns...) rows."""
+    X = chunk[bundle.encoder.feature_names].to_numpy(dtype=np.uint8)
+    labels, fraud_proba = bundle.score(X)
+    return pd.DataFrame({
+        KEY: chunk[KEY].to_numpy(),
+        "Fraud_Predicted": labels.astype(np.int64),
+        "Fraud_Probability": fraud_proba,
+        "model_version": bundle.version,
+        "scored_at": pd.Timestamp.now(),
+    })
+
+
+def score_table(read_conn, write_conn, bundle, job=PREDICTIONS_TABLE, table=SOURCE_TABLE,
+                predictions_table=PREDICTIONS_TABLE, chunksize=DEFAULT_CHUNKSIZE):
+    """Score every row of `table` past the job's high-water mark. Returns the number of rows scored.
+
+    Reads hold a server-side cursor on `read_conn`; each chunk's predictions
+    and new high-water mark are committed on `write_conn` in one transaction.
+    """
+    ensure_state_table(write_conn)
+    after_key = get_high_water_mark(write_conn, job)
+    sql, params = source_query(bundle.encoder.feature_names, table, after_key)
+
+    rows = 0
+    try:
+        for chunk in stream_query(read_conn, sql, params, chunksize=chunksize):
+            predictions = score_rows(bundle, chunk)
+            set_high_water_mark(write_conn, job, predictions[KEY].iloc[-1], bundle.version, len(predictions))
+            # copy_dataframe commits the predictions and the staged high-water mark together
+            copy_dataframe(write_conn, predictions, predictions_table, mode="upsert", key=KEY, chunksize=chunksize)
+            rows += len(predictions)
+            print(f"… scored {rows} rows (up to {KEY} {predictions[KEY].iloc[-1]})")
+    finally:
+        read_conn.rollback()
+    return rows
+
+
+def load_bundle(version=None):
+    registry = ModelRegistry(REGISTRY_DIR)
+    version = version or registry.active_version()
+    if version is not None:
+        return registry.load_bundle(version)
+    return ModelBundle.load(MODEL_PATH, ENCODER_PATH, version=f"local-{file_sha256(MODEL_PATH)[:12]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score new rows of the claims table into the predictions table")
+    parser.add_argument("--version", help="Registry version to score with (default: active version)")
+    parser.add_argument("--table", default=SOURCE_TABLE)
+    parser.add_argument("--predictions-table", default=PREDICTIONS_TABLE)
+    parser.add_argument("--job", help="High-water mark name (default: the predictions table name)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--reset", action="store_true", help="Forget the high-water mark and rescore every row")
+    args = parser.parse_args()
+    job = args.job or args.predictions_table
+
+    bundle = load_bundle(args.version)
+    print(f"✅ Model {bundle.version} loaded")
+
+    start = time.perf_counter()
+    with connection() as read_conn, connection() as write_conn:
+        if args.reset:
+            ensure_state_table(write_conn)
+            reset_high_water_mark(write_conn, job)
+            print(f"✅ High-water mark for `{job}` reset")
+        rows = score_table(read_conn, write_conn, bundle, job=job, table=args.table,
+                           predictions_table=args.predictions_table, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    if rows:
+        print(f"✅ {rows} rows scored into `{args.predictions_table}` in {elapsed:.1f}s")
+    else:
+        print(f"✅ No new rows in `{args.table}` to score")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# scripts/shap_summary.py
+#
+# SHAP summaries for the monitoring artifacts.
+#
+# Rows are first reduced to a fixed budget by stratified sampling over
+# (prediction, actual), so every confusion cell -- including the rare
+# fraud ones -- is represented and the cost no longer grows with the
+# monitoring volume. The fraud-class SHAP matrix is computed across a
+# process pool over row shards and cached on disk under a key of the
+# model hash and the sampled rows; the beeswarm, bar and any later plots
+# all read that one matrix.
+
+import hashlib
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Project root on sys.path for the shared modules
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from deployment.model_bundle import class_shap_values, file_sha256
+
+DEFAULT_SAMPLE_SIZE = 2000
+DEFAULT_SHARD_SIZE = 250
+STRATA = ("prediction", "actual")
+
+
+def stratified_sample(df, budget=DEFAULT_SAMPLE_SIZE, strata=STRATA, min_per_stratum=50, seed=0):
+    """Sorted row positions of a sample of at most `budget` rows, stratified by `strata`.
+
+    Strata get rows in proportion to their size but at least
+    `min_per_stratum` (or all of their rows, if fewer), so small cells such
+    as missed frauds are never sampled away.
+    """
+    if not budget or len(df) <= budget:
+        return np.arange(len(df))
+    rng = np.random.default_rng(seed)
+    columns = [c for c in strata if c in df.columns]
+    if not columns:
+        return np.sort(rng.choice(len(df), budget, replace=False))
+
+    groups = list(df.groupby(columns, sort=True).indices.values())
+    sizes = np.array([len(g) for g in groups])
+    floor = np.minimum(sizes, min_per_stratum)
+    # Whatever the floors leave over is shared in proportion to the remaining rows
+    extra = np.floor((budget - floor.sum()) * (sizes - floor) / max((sizes - floor).sum(), 1)).astype(np.int64)
+    take = np.minimum(sizes, floor + np.maximum(extra, 0))
+    picked = [rng.choice(g, n, replace=False) for g, n in zip(groups, take) if n]
+    return np.sort(np.concatenate(picked))
+
+
+# ——— Parallel SHAP ———
+# As in the batch scorer, forked workers inherit the model copy-on-write;
+# with spawn (or where fork isn't available) each worker loads its own
+# private copy (TreeExplainer needs the sklearn trees, whose node arrays
+# are copied on unpickling). Each builds its own TreeExplainer once.
+_worker_model = None
+_worker_explainer = None
+
+
+def _init_worker(model_file):
+    global _worker_model
+    if _worker_model is None and model_file is not None:
+        import joblib
+        _worker_model = joblib.load(model_file)
+
+
+def _shap_shard(args):
+    global _worker_explainer
+    X, class_index = args
+    if _worker_explainer is None:
+        import shap
+        _worker_explainer = shap.TreeExplainer(_worker_model)
+    return class_shap_values(_worker_explainer.shap_values(X), class_index)
+
+
+def compute_shap(model, X, class_index, workers=1, shard_size=DEFAULT_SHARD_SIZE, model_path=None,
+                 start_method=None):
+    """(n_rows, n_features) SHAP values of `class_index` for X, sharded over `workers` processes.
+
+    Fork is used where available; pass start_method="spawn" (and
+    `model_path`) when calling from a multi-threaded process.
+    """
+    global _worker_model, _worker_explainer
+    X = np.asarray(X, dtype=np.float64)
+    workers = workers or os.cpu_count()
+    shards = [(X[i:i + shard_size], class_index) for i in range(0, len(X), shard_size)]
+
+    _worker_model, _worker_explainer = model, None
+    try:
+        if workers == 1 or len(shards) == 1:
+            return np.vstack([_shap_shard(shard) for shard in shards])
+        if start_method is None:
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)),
+                                 mp_context=multiprocessing.get_context(start_method),
+                                 initializer=_init_worker, initargs=(model_path,)) as pool:
+            return np.vstack(list(pool.map(_shap_shard, shards)))
+    finally:
+        _worker_model, _worker_explainer = None, None
+
+
+def cache_key(model_sha256, X, feature_names, class_index):
+    digest = hashlib.sha256(model_sha256.encode())
+    digest.update("\0".join(feature_names).encode())
+    digest.update(str(class_index).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:24]
+
+
+def load_or_compute_shap(model, model_path, X, cache_dir, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                         start_method=None):
+    """Fraud-class SHAP matrix for the DataFrame X, read from `cache_dir` when already computed.
+
+    Returns (values, from_cache).
+    """
+    class_index = list(model.classes_).index(1)
+    feature_names = list(X.columns)
+    key = cache_key(file_sha256(model_path), X.to_numpy(dtype=np.float64), feature_names, class_index)
+    path = os.path.join(cache_dir, f"shap_{key}.npy")
+    if os.path.exists(path):
+        return np.load(path), True
+
+    values = compute_shap(model, X.to_numpy(dtype=np.float64), class_index, workers, shard_size,
+                          model_path=model_path, start_method=start_method)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, values)
+    os.replace(tmp_path, path)
+    return values, False
+
+
+def plot_beeswarm(values, X, path):
+    import shap
+    from scripts.plotting import plt, pyplot_lock
+
+    with pyplot_lock:
+        plt.figure()
+        shap.summary_plot(values, X, show=False)
+        plt.tight_layout()
+        plt.savefig(path, bbox_inches="tight")
+        plt.close()
+
+
+def plot_importance(values, feature_names, path, max_display=20):
+    """Mean |SHAP| bar chart, computed straight from the cached matrix."""
+    from scripts.plotting import plt, pyplot_lock
+
+    importance = np.abs(values).mean(axis=0)
+    order = np.argsort(importance)[-max_display:]
+    with pyplot_lock:
+        plt.figure(figsize=(8, 0.4 * len(order) + 1.5))
+        plt.barh([feature_names[i] for i in order], importance[order])
+        plt.xlabel("mean(|SHAP value|) (fraud class)")
+        plt.tight_layout()
+        plt.savefig(path, bbox_inches="tight")
+        plt.close()
@@ -1,5 +1,7 @@
+import argparse
 import os
-import pandas as pd
+import sys
+import time
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -13,63 +15,155 @@ from sklearn.metrics import (
     confusion_matrix
 )
 
+# Project root on sys.path for the shared deployment modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from deployment.feature_encoder import FeatureEncoder
+from deployment.model_registry import ModelRegistry
+from scripts.dataset import read_dataset
+from scripts.hyperparam_search import DEFAULT_FOLDS, DEFAULT_N_ITER, SEARCH_SPACES, STRATEGIES, SCORERS, \
+    HyperparameterSearch, build_estimator
+
 # Paths
 data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'preprocessed_data.csv'))
 model_save_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models', 'model.pkl'))
+encoder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models', 'encoder.json'))
+registry_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models', 'registry'))
+search_checkpoint_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models', 'search', 'trials.jsonl'))
 
-# Ensure models directory exists
-os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
 
-# Load Preprocessed Data
-df = pd.read_csv(data_path)
-print(f"✅ Loaded preprocessed data: {df.shape[0]} rows, {df.shape[1]} columns.")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the fraud model, optionally after a hyperparameter search")
+    parser.add_argument('--search', choices=STRATEGIES,
+                        help="Search hyperparameters first (default: train the fixed Random Forest)")
+    parser.add_argument('--models', nargs='+', default=['random_forest'], choices=sorted(SEARCH_SPACES),
+                        help="Model families to search over")
+    parser.add_argument('--n-iter', type=int, default=DEFAULT_N_ITER, help="Candidates per model for --search random")
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--scoring', choices=sorted(SCORERS), default='roc_auc')
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Trial processes; 1 runs trials in-process with multi-core estimators, 0 uses every core")
+    parser.add_argument('--checkpoint', default=search_checkpoint_path,
+                        help="JSONL of finished trials; a rerun resumes from it")
+    parser.add_argument('--fresh', action='store_true', help="Discard the checkpoint and start the search over")
+    return parser.parse_args(argv)
 
-# Split into Features and Target
-X = df.drop('FraudFound_P', axis=1)
-y = df['FraudFound_P']
 
-# Train-Test Split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.3, random_state=42, stratify=y
-)
+def main(argv=None):
+    args = parse_args(argv)
 
-print(f"✅ Train size: {X_train.shape[0]} rows | Test size: {X_test.shape[0]} rows")
+    # Ensure models directory exists
+    os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
 
-# Model - Random Forest
-model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=10,
-    random_state=42,
-    class_weight='balanced'  # Handling imbalanced data
-)
+    # Load Preprocessed Data
+    df = read_dataset(data_path)
+    print(f"✅ Loaded preprocessed data: {df.shape[0]} rows, {df.shape[1]} columns.")
+
+    # Split into Features and Target
+    X = df.drop('FraudFound_P', axis=1)
+    y = df['FraudFound_P']
+
+    # Train on the encoder's column order so serving can never feed a skewed layout
+    if os.path.exists(encoder_path):
+        encoder = FeatureEncoder.load(encoder_path)
+        missing = set(encoder.feature_names) - set(X.columns)
+        if missing:
+            raise ValueError(f"Preprocessed data is missing encoder columns: {sorted(missing)}")
+        X = X[encoder.feature_names]
+        print(f"✅ Features aligned to encoder at {encoder_path}")
+
+    # Train-Test Split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.3, random_state=42, stratify=y
+    )
+
+    print(f"✅ Train size: {X_train.shape[0]} rows | Test size: {X_test.shape[0]} rows")
+
+    search_summary = None
+    if args.search:
+        # Cross-validated search on the training split only; the test split stays held out
+        if args.fresh and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        search = HyperparameterSearch(
+            strategy=args.search,
+            models=args.models,
+            scoring=args.scoring,
+            folds=args.folds,
+            n_iter=args.n_iter,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+        )
+        best = search.run(X_train, y_train)
+        search_summary = search.summary(best)
+        print(f"✅ Trial records checkpointed to {args.checkpoint}")
+        model = build_estimator(best['model'], best['params'])
+    else:
+        # Model - Random Forest
+        model = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42,
+            class_weight='balanced'  # Handling imbalanced data
+        )
+
+    # Train the model on every core, then save it with its own n_jobs: the
+    # API scores one row at a time, where a thread pool per call only costs latency
+    saved_n_jobs = model.get_params().get('n_jobs')
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=saved_n_jobs)
+    print(f"✅ Model trained successfully in {time.perf_counter() - start:.1f}s.")
+
+    # Save the model
+    joblib.dump(model, model_save_path)
+    print(f"✅ Model saved to {model_save_path}")
+
+    # Evaluate Model
+    y_pred = model.predict(X_test)
+    y_pred_proba = model.predict_proba(X_test)[:, list(model.classes_).index(1)]
 
-# Train the model
-model.fit(X_train, y_train)
-print(f"✅ Model trained successfully.")
+    accuracy = accuracy_score(y_test, y_pred)
+    precision = precision_score(y_test, y_pred, zero_division=0)
+    recall = recall_score(y_test, y_pred, zero_division=0)
+    f1 = f1_score(y_test, y_pred, zero_division=0)
+    roc_auc = roc_auc_score(y_test, y_pred_proba)
 
-# Save the model
-joblib.dump(model, model_save_path)
-print(f"✅ Model saved to {model_save_path}")
+    print("\n📊 Evaluation Metrics:")
+    print(f"Accuracy     : {accuracy:.4f}")
+    print(f"Precision    : {precision:.4f}")
+    print(f"Recall       : {recall:.4f}")
+    print(f"F1 Score     : {f1:.4f}")
+    print(f"ROC-AUC Score: {roc_auc:.4f}")
 
-# Evaluate Model
-y_pred = model.predict(X_test)
-y_pred_proba = model.predict_proba(X_test)[:, 1]
+    print("\n📋 Classification Report:")
+    print(classification_report(y_test, y_pred))
 
-accuracy = accuracy_score(y_test, y_pred)
-precision = precision_score(y_test, y_pred, zero_division=0)
-recall = recall_score(y_test, y_pred, zero_division=0)
-f1 = f1_score(y_test, y_pred, zero_division=0)
-roc_auc = roc_auc_score(y_test, y_pred_proba)
+    print("\n🧩 Confusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
 
-print("\n📊 Evaluation Metrics:")
-print(f"Accuracy     : {accuracy:.4f}")
-print(f"Precision    : {precision:.4f}")
-print(f"Recall       : {recall:.4f}")
-print(f"F1 Score     : {f1:.4f}")
-print(f"ROC-AUC Score: {roc_auc:.4f}")
+    # Publish to the model registry; running API servers pick it up without a restart
+    if os.path.exists(encoder_path):
+        params = model.get_params()
+        if search_summary is not None:
+            params = {**params, "search": search_summary}
+        version = ModelRegistry(registry_dir).publish(
+            model,
+            encoder_path,
+            metrics={
+                "accuracy": accuracy,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+                "roc_auc": roc_auc,
+            },
+            params=params,
+        )
+        print(f"\n✅ Model published to registry as version {version}")
+    else:
+        print(f"\n⚠️ No encoder at {encoder_path}; model not published to the registry.")
 
-print("\n📋 Classification Report:")
-print(classification_report(y_test, y_pred))
 
-print("\n🧩 Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
+if __name__ == "__main__":
+    main()
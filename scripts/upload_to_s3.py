@@ -1,7 +1,12 @@
 import boto3
 import os
+import sys
 from dotenv import load_dotenv
 
+# Project root on sys.path for the shared modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.s3_sync import Uploader, summarize
+
 # Load environment variables if needed
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
 load_dotenv(dotenv_path=env_path)
@@ -20,14 +25,15 @@ local_predictions_path = os.path.abspath(os.path.join(os.path.dirname(__file__),
 s3_model_key = 'models/model.pkl'
 s3_predictions_key = 'predictions/batch_predictions.csv'
 
-def upload_file(file_path, bucket_name, s3_key):
-    try:
-        s3.upload_file(file_path, bucket_name, s3_key)
-        print(f"Uploaded {file_path} to s3://{bucket_name}/{s3_key}")
-    except Exception as e:
-        print(f"Failed to upload {file_path}")
-        print(e)
-
 if __name__ == "__main__":
-    upload_file(local_model_path, BUCKET_NAME, s3_model_key)
-    upload_file(local_predictions_path, BUCKET_NAME, s3_predictions_key)
+    # Concurrent, multipart for the large predictions file, and skipped when unchanged
+    uploader = Uploader(s3, BUCKET_NAME)
+    files = []
+    for path, key in [(local_model_path, s3_model_key), (local_predictions_path, s3_predictions_key)]:
+        if os.path.exists(path):
+            files.append((path, key))
+        else:
+            print(f"⚠️ {path} not found; skipping it")
+    # Each file is uploaded (or fails) independently
+    results = uploader.upload_files(files)
+    print(summarize(results))
@@ -0,0 +1,134 @@
+# tests/test_batch_model_predict.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from scripts.batch_model_predict import (
+    PredictionWriter, TARGET, iter_chunks, main, score_file, score_file_parallel,
+)
+from scripts.dataset import HAVE_PARQUET, write_dataset
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+@pytest.fixture(scope="module")
+def claims(model):
+    # A preprocessed_data-shaped frame: the model's features plus the target
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=45)
+    return df[list(model.feature_names_in_)].assign(**{TARGET: df["actual"]})
+
+def test_iter_chunks_reads_csv_in_bounded_chunks(claims, tmp_path):
+    path = str(tmp_path / "claims.csv")
+    claims.to_csv(path, index=False)
+    chunks = list(iter_chunks(path, 20))
+    assert [len(c) for c in chunks] == [20, 20, 5]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), claims)
+
+def test_iter_chunks_reads_bitsets(claims, tmp_path):
+    path = write_dataset(claims, str(tmp_path / "claims.csv"), format="bits")
+    chunks = list(iter_chunks(path, 20))
+    assert [len(c) for c in chunks] == [20, 20, 5]
+    frame = pd.concat(chunks, ignore_index=True)
+    assert list(frame.columns) == list(claims.columns)
+    assert np.array_equal(frame.to_numpy(dtype=np.int64), claims.to_numpy(dtype=np.int64))
+
+@pytest.mark.parametrize("name", ["out.csv", "out.parquet"])
+def test_prediction_writer_appends_chunks(claims, tmp_path, name):
+    if name.endswith(".parquet") and not HAVE_PARQUET:
+        pytest.skip("pyarrow not installed")
+    path = str(tmp_path / name)
+    writer = PredictionWriter(path)
+    writer.write(claims.iloc[:30])
+    writer.write(claims.iloc[30:])
+    assert not os.path.exists(path)  # only replaced on close
+    writer.close()
+
+    written = pd.read_parquet(path) if name.endswith(".parquet") else pd.read_csv(path)
+    assert writer.rows == len(claims)
+    assert np.array_equal(written.to_numpy(dtype=np.int64), claims.to_numpy(dtype=np.int64))
+    assert not os.path.exists(writer.tmp_path)
+
+def test_prediction_writer_abort_keeps_the_previous_output(claims, tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("previous run\n")
+    writer = PredictionWriter(str(path))
+    writer.write(claims)
+    writer.abort()
+    assert path.read_text() == "previous run\n"
+    assert not os.path.exists(writer.tmp_path)
+
+def test_score_file_matches_one_predict_proba_pass(model, claims, tmp_path):
+    input_path, output_path = str(tmp_path / "claims.csv"), str(tmp_path / "predictions.csv")
+    claims.to_csv(input_path, index=False)
+    assert score_file(model, input_path, output_path, chunksize=7) == len(claims)
+
+    predictions = pd.read_csv(output_path)
+    proba = model.predict_proba(claims.drop(columns=[TARGET]))
+    assert TARGET not in predictions.columns
+    assert np.array_equal(predictions["Fraud_Predicted"], model.classes_.take(proba.argmax(axis=1)))
+    assert np.allclose(predictions["Fraud_Probability"], proba[:, 1])
+
+@pytest.mark.parametrize("name", ["predictions.csv", "predictions.parquet"])
+def test_header_only_input_writes_an_empty_output(model, claims, tmp_path, name):
+    if name.endswith(".parquet") and not HAVE_PARQUET:
+        pytest.skip("pyarrow not installed")
+    input_path, output_path = str(tmp_path / "claims.csv"), str(tmp_path / name)
+    claims.iloc[:0].to_csv(input_path, index=False)
+    assert score_file(model, input_path, output_path) == 0
+
+    written = pd.read_parquet(output_path) if name.endswith(".parquet") else pd.read_csv(output_path)
+    assert len(written) == 0
+    assert list(written.columns) == ["Fraud_Predicted", "Fraud_Probability"]
+
+class FailingModel:
+    """Scores like `model` but raises on the shard holding `bad_row`."""
+
+    def __init__(self, model, bad_row):
+        self.model = model
+        self.classes_ = model.classes_
+        self.bad_row = bad_row
+
+    def predict_proba(self, X):
+        if self.bad_row in X.index:
+            raise ValueError("worker failed")
+        return self.model.predict_proba(X)
+
+fork_only = pytest.mark.skipif(not hasattr(os, "fork"), reason="workers inherit the test model through fork")
+
+@fork_only
+def test_parallel_scoring_keeps_input_order(model, claims, tmp_path):
+    input_path = str(tmp_path / "claims.csv")
+    claims.to_csv(input_path, index=False)
+    serial, parallel = str(tmp_path / "serial.csv"), str(tmp_path / "parallel.csv")
+
+    score_file(model, input_path, serial, chunksize=4)
+    # 12 shards over 3 workers: more shards than the in-flight window
+    assert score_file_parallel(model, MODEL_PATH, input_path, parallel, chunksize=4, workers=3) == len(claims)
+    pd.testing.assert_frame_equal(pd.read_csv(parallel), pd.read_csv(serial))
+
+@fork_only
+def test_failing_worker_aborts_without_replacing_the_output(model, claims, tmp_path):
+    input_path, output_path = str(tmp_path / "claims.csv"), tmp_path / "predictions.csv"
+    claims.to_csv(input_path, index=False)
+    output_path.write_text("previous run\n")
+
+    with pytest.raises(ValueError, match="worker failed"):
+        score_file_parallel(FailingModel(model, bad_row=30), MODEL_PATH, input_path, str(output_path),
+                            chunksize=4, workers=2)
+    assert output_path.read_text() == "previous run\n"
+    assert not os.path.exists(f"{output_path}.tmp")
+
+def test_negative_workers_are_rejected():
+    with pytest.raises(SystemExit):
+        main(["--workers", "-1"])
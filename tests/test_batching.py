@@ -0,0 +1,47 @@
+# tests/test_batching.py
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+from deployment.batching import MicroBatcher
+
+def test_micro_batcher_coalesces_and_preserves_order():
+    calls = []
+
+    def score(records):
+        calls.append(len(records))
+        return [r * 10 for r in records]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        stats = batcher.stats()
+        await batcher.close()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert results == [i * 10 for i in range(20)]
+    assert max(calls) <= 8
+    assert len(calls) < 20
+    assert stats["records"] == 20
+    assert stats["batches"] == len(calls)
+
+def test_micro_batcher_propagates_errors():
+    def score(records):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(score, max_wait_ms=1)
+        try:
+            await batcher.submit({"x": 1})
+        finally:
+            await batcher.close()
+
+    try:
+        asyncio.run(run())
+    except ValueError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected ValueError")
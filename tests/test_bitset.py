@@ -0,0 +1,53 @@
+# tests/test_bitset.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from deployment.bitset import BitsetDataset, column_counts, pack, unpack
+from deployment.forest import FlatForest
+from scripts.dataset import read_dataset, resolve_dataset_path, write_dataset
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+
+@pytest.mark.parametrize("n_features", [1, 63, 64, 65, 130])
+def test_pack_round_trips(n_features):
+    X = np.random.default_rng(n_features).integers(0, 2, size=(37, n_features)).astype(np.uint8)
+    bits = pack(X)
+    assert bits.dtype == np.uint64 and bits.shape == (37, (n_features + 63) // 64)
+    assert (unpack(bits, n_features) == X).all()
+    assert (column_counts(bits, n_features, chunk_rows=10) == X.sum(axis=0)).all()
+    # Feature f is bit f % 64 of word f // 64
+    f = n_features - 1
+    assert (((bits[:, f // 64] >> np.uint64(f % 64)) & np.uint64(1)) == X[:, f]).all()
+
+def test_packed_forest_matches_unpacked():
+    model = joblib.load(MODEL_PATH)
+    forest = FlatForest.from_sklearn(model)
+    assert forest.binary_splits
+    X = np.random.default_rng(0).integers(0, 2, size=(600, forest.n_features_in_)).astype(np.uint8)
+    assert np.array_equal(forest.predict_proba_bits(pack(X)), forest.predict_proba(X))
+    assert np.allclose(forest.predict_proba_bits(pack(X)), model.predict_proba(X), atol=1e-12)
+
+def test_monitoring_dataset_round_trips_as_bitset(tmp_path):
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=200)
+    df["claim_id"] = [f"C{i}" for i in range(len(df))]
+    path = write_dataset(df, str(tmp_path / "monitoring_data.csv"), format="bits")
+    assert path.endswith(".bits") and resolve_dataset_path(str(tmp_path / "monitoring_data.csv")) == path
+
+    stored = BitsetDataset(path)
+    assert isinstance(stored.bits, np.memmap) and stored.bits.shape == (200, 2)
+    restored = read_dataset(str(tmp_path / "monitoring_data.csv"))
+    assert list(restored.columns) == list(df.columns)
+    assert (restored["actual"].to_numpy() == df["actual"].to_numpy()).all()
+    assert restored["actual"].dtype == df["actual"].dtype
+    assert np.allclose(restored["probability"], df["probability"])
+    assert (restored.drop(columns=["claim_id", "probability"]).astype(int)
+            == df.drop(columns=["claim_id", "probability"]).astype(int)).all().all()
+    assert list(read_dataset(path, columns=["claim_id", "actual"]).columns) == ["claim_id", "actual"]
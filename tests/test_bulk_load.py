@@ -0,0 +1,178 @@
+# tests/test_bulk_load.py
+import csv
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import pandas as pd
+
+from scripts.bulk_load import copy_dataframe
+from scripts.load_preprocessed_data_to_db import db_frame, get_encoder, preprocess
+
+RAW_CSV = os.path.abspath(os.path.join(__file__, "..", "..", "data", "fraud_oracle.csv"))
+
+class FakeCursor:
+    """Stand-in for a psycopg2 cursor: records SQL and COPY payloads."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+
+    def fetchone(self):
+        return (self.conn.existing,)
+
+    def copy_expert(self, sql, file):
+        self.conn.statements.append(sql)
+        self.conn.copied.append(file.read())
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, existing=None):
+        self.existing = existing
+        self.statements = []
+        self.copied = []
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+def _frame(n):
+    return pd.DataFrame({"PolicyNumber": range(1, n + 1), "Fault_Third Party": [True, False] * (n // 2)})
+
+def test_replace_streams_chunks_and_swaps_staging():
+    conn = FakeConnection(existing="model_data_w_dummy")
+    rows = copy_dataframe(conn, _frame(10), "model_data_w_dummy", key="PolicyNumber", chunksize=4)
+
+    assert rows == 10
+    assert conn.committed
+    assert len(conn.copied) == 3
+    assert conn.copied[0].splitlines()[0] == "1,True"
+    sql = "\n".join(conn.statements)
+    assert 'CREATE TABLE "model_data_w_dummy__staging" ("PolicyNumber" bigint, "Fault_Third Party" boolean)' in sql
+    assert 'ALTER TABLE "model_data_w_dummy__staging" RENAME TO "model_data_w_dummy"' in sql
+
+def test_upsert_deletes_matching_keys_then_inserts():
+    conn = FakeConnection(existing="model_data_w_dummy")
+    copy_dataframe(conn, [_frame(4), _frame(2)], "model_data_w_dummy", mode="upsert", key="PolicyNumber")
+
+    sql = "\n".join(conn.statements)
+    assert "CREATE TEMP TABLE" in sql
+    assert 'WHERE t."PolicyNumber" = s."PolicyNumber"' in sql
+    assert sql.index("DELETE FROM") < sql.index("INSERT INTO")
+    assert "RENAME" not in sql
+
+def test_failure_rolls_back():
+    conn = FakeConnection()
+
+    def broken_chunks():
+        yield _frame(2)
+        raise RuntimeError("source failed")
+
+    try:
+        copy_dataframe(conn, broken_chunks(), "model_data_w_dummy")
+    except RuntimeError:
+        pass
+    assert conn.rolled_back and not conn.committed
+
+class SqliteCursor:
+    """Runs the loader's PostgreSQL statements against SQLite, translating the few that differ."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cur = conn.db.cursor()
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT to_regclass"):
+            name = params[0].strip('"')
+            self.cur.execute("SELECT name FROM sqlite_master WHERE name = ? "
+                             "UNION SELECT name FROM sqlite_temp_master WHERE name = ?", (name, name))
+            return
+        like = re.match(r'CREATE TEMP TABLE (".+?") \(LIKE (".+?") INCLUDING DEFAULTS\) ON COMMIT DROP', sql)
+        if like:
+            self.conn.temp_tables.append(like.group(1))
+            sql = f"CREATE TEMP TABLE {like.group(1)} AS SELECT * FROM {like.group(2)} WHERE 0"
+        using = re.match(r'DELETE FROM (".+?") t USING (".+?") s WHERE t\.(".+?") = s\.', sql)
+        if using:
+            table, staging, key = using.groups()
+            sql = f"DELETE FROM {table} WHERE {key} IN (SELECT {key} FROM {staging})"
+        self.cur.execute(sql)
+
+    def fetchone(self):
+        row = self.cur.fetchone()
+        return row if row is not None else (None,)
+
+    def copy_expert(self, sql, file):
+        table, columns = re.match(r"COPY (\S+) \((.*)\) FROM STDIN", sql).groups()
+        rows = list(csv.reader(file))
+        placeholders = ", ".join("?" * len(rows[0]))
+        self.cur.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+
+    def close(self):
+        self.cur.close()
+
+class SqliteConnection:
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.temp_tables = []
+
+    def cursor(self):
+        return SqliteCursor(self)
+
+    def commit(self):
+        # ON COMMIT DROP
+        for table in self.temp_tables:
+            self.db.execute(f"DROP TABLE IF EXISTS temp.{table}")
+        self.temp_tables = []
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def count(self, sql):
+        return self.db.execute(sql).fetchone()[0]
+
+def _load(conn, raw, mode, encoder_path):
+    # As in the loader: replace fits and saves the encoder, incremental loads reuse it
+    encoder = get_encoder(raw, mode, encoder_path)
+    if mode == "replace":
+        encoder.save(encoder_path)
+    frame = db_frame(raw, preprocess(raw, encoder))
+    return copy_dataframe(conn, frame, "model_data_w_dummy", mode=mode, key="PolicyNumber", chunksize=5000)
+
+def test_loading_the_same_batch_twice(tmp_path):
+    raw = pd.read_csv(RAW_CSV)
+    initial, batch = raw.iloc[:-100], raw.iloc[-100:].reset_index(drop=True)
+    total = len(raw)
+    encoder_path = str(tmp_path / "encoder.json")
+    table_rows = 'SELECT COUNT(*) FROM "model_data_w_dummy"'
+    policies = 'SELECT COUNT(DISTINCT "PolicyNumber") FROM "model_data_w_dummy"'
+
+    conn = SqliteConnection()
+    assert _load(conn, initial, "replace", encoder_path) == total - 100
+    assert _load(conn, batch, "append", encoder_path) == 100
+    assert _load(conn, batch, "append", encoder_path) == 100
+    # append keeps both copies of the batch
+    assert conn.count(table_rows) == total + 100
+    assert conn.count(policies) == total
+
+    conn = SqliteConnection()
+    _load(conn, initial, "replace", encoder_path)
+    _load(conn, batch, "upsert", encoder_path)
+    _load(conn, batch, "upsert", encoder_path)
+    # upsert replaces the batch's rows, so a re-run is idempotent
+    assert conn.count(table_rows) == total
+    assert conn.count(policies) == total
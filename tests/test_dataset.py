@@ -0,0 +1,68 @@
+# tests/test_dataset.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import pandas as pd
+
+from scripts import dataset
+from scripts.dataset import read_dataset, resolve_dataset_path, write_dataset
+
+def _frame():
+    return pd.DataFrame({
+        "Fault_Third Party": [True, False, True],
+        "Sex_Male": [0, 1, 1],
+        "Deductible": [300, 400, 500],
+        "Make": ["Honda", "Toyota", "Honda"],
+    })
+
+def _touch(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+def test_parquet_round_trip_keeps_values_and_compacts_dtypes(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    path = write_dataset(df, str(tmp_path / "data.csv"))
+    assert path == str(tmp_path / "data.parquet")
+
+    read = read_dataset(str(tmp_path / "data.csv"))
+    assert read.to_dict("list") == df.to_dict("list")
+    assert str(read["Fault_Third Party"].dtype) == "bool"
+    assert str(read["Sex_Male"].dtype) == "uint8"
+    assert str(read["Make"].dtype) == "category"
+    assert list(read_dataset(path, columns=["Make", "Sex_Male"]).columns) == ["Make", "Sex_Male"]
+
+def test_csv_fallback_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "HAVE_PARQUET", False)
+    df = _frame()
+    path = write_dataset(df, str(tmp_path / "data.csv"))
+    assert path == str(tmp_path / "data.csv")
+    assert not os.path.exists(tmp_path / "data.parquet")
+
+    pd.testing.assert_frame_equal(read_dataset(path), df)
+    pd.testing.assert_frame_equal(read_dataset(path, columns=["Make"]), df[["Make"]])
+
+def test_resolve_prefers_the_newer_sibling(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    csv, parquet = str(tmp_path / "data.csv"), str(tmp_path / "data.parquet")
+    df.to_csv(csv, index=False)
+    df.to_parquet(parquet, index=False)
+
+    _touch(csv, 1_000)
+    _touch(parquet, 2_000)
+    assert resolve_dataset_path(csv) == parquet
+    # A CSV rewritten after the Parquet copy is the one to read
+    _touch(csv, 3_000)
+    assert resolve_dataset_path(csv) == csv
+    assert resolve_dataset_path(parquet) == csv
+    # Equally new: Parquet wins
+    _touch(parquet, 3_000)
+    assert resolve_dataset_path(csv) == parquet
+
+def test_resolve_reports_a_missing_dataset(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        resolve_dataset_path(str(tmp_path / "missing.csv"))
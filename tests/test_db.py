@@ -0,0 +1,65 @@
+# tests/test_db.py
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+from scripts import db, db_check
+
+class FakeCursor:
+    """Stand-in for a psycopg2 (optionally named) cursor."""
+
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.description = None
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((self.name, sql, params))
+        self.description = [("PolicyNumber",), ("score",)]
+        self._rows = list(self.conn.rows)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def fetchall(self):
+        batch, self._rows = self._rows, []
+        return batch
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+    def rollback(self):
+        pass
+
+def test_stream_query_uses_named_cursor_and_chunks():
+    conn = FakeConnection([(i, i / 10) for i in range(5)])
+    chunks = list(db.stream_query(conn, "SELECT * FROM t", chunksize=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ["PolicyNumber", "score"]
+    assert conn.statements[0][0] is not None  # server-side cursor
+
+def test_db_check_runs_all_checks_on_one_connection(monkeypatch, capsys):
+    conn = FakeConnection([(7,)])
+    opened = []
+
+    @contextmanager
+    def fake_connection():
+        opened.append(conn)
+        yield conn
+
+    monkeypatch.setattr(db_check, "connection", fake_connection)
+    assert db_check.main(["connection", "count"]) == 0
+    assert len(opened) == 1
+    assert "has 7 rows" in capsys.readouterr().out
@@ -0,0 +1,41 @@
+# tests/test_drift.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from scripts.drift import compute_drift, drift_summary, write_summary
+
+def test_compute_drift_handles_constant_and_shifted_columns(tmp_path):
+    rng = np.random.default_rng(1)
+    reference = pd.DataFrame({
+        "stable": rng.random(5000) < 0.3,
+        "always_off": np.zeros(5000, dtype=bool),
+        "shifted": rng.random(5000) < 0.1,
+        "went_constant": rng.random(5000) < 0.5,
+        "amount": rng.normal(size=5000),  # not a dummy column, ignored
+    })
+    current = pd.DataFrame({
+        "stable": rng.random(3000) < 0.3,
+        "always_off": np.zeros(3000, dtype=bool),
+        "shifted": rng.random(3000) < 0.6,
+        "went_constant": np.ones(3000, dtype=bool),
+        "amount": rng.normal(size=3000),
+    })
+    table = {row["feature"]: row for row in compute_drift(reference, current)}
+    assert set(table) == {"stable", "always_off", "shifted", "went_constant"}
+    assert not table["stable"]["drifted"]
+    assert table["always_off"]["psi"] == 0.0 and table["always_off"]["chi2_p_value"] == 1.0
+    assert table["shifted"]["drifted"] and table["went_constant"]["drifted"]
+
+    summary = drift_summary(list(table.values()), len(reference), len(current))
+    assert summary["constant_features"] == ["always_off"]
+    assert sorted(summary["drifted_features"]) == ["shifted", "went_constant"]
+    path = write_summary(summary, str(tmp_path / "drift_summary.json"))
+    with open(path) as f:
+        assert json.load(f)["n_drifted"] == 2
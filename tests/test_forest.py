@@ -0,0 +1,65 @@
+# tests/test_forest.py
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier
+
+from deployment.forest import FLAT_FOREST_DIR, FlatForest
+from deployment.model_bundle import ModelBundle, file_sha256
+from scripts.batch_model_predict import score_chunk
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+
+def monitoring_frame(model, nrows=500):
+    return pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=nrows)[list(model.feature_names_in_)]
+
+def test_flat_forest_matches_sklearn():
+    model = joblib.load(MODEL_PATH)
+    forest = FlatForest.from_sklearn(model)
+    df = monitoring_frame(model)
+    random_rows = np.random.default_rng(0).integers(0, 2, size=(300, forest.n_features_in_)).astype(np.uint8)
+
+    for X in (df, df.to_numpy(dtype=np.uint8), random_rows, random_rows[:1]):
+        assert np.allclose(forest.predict_proba(X), model.predict_proba(X), atol=1e-12)
+        assert (forest.predict(X) == model.predict(X)).all()
+    # Columns are matched by name, like sklearn
+    shuffled = df[df.columns[::-1]]
+    assert np.allclose(forest.predict_proba(shuffled), model.predict_proba(df), atol=1e-12)
+
+def test_flat_forest_matches_continuous_thresholds():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(2000, 5))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = ExtraTreesClassifier(n_estimators=20, random_state=0).fit(X, y)
+    forest = FlatForest.from_sklearn(model)
+    X_test = rng.normal(size=(1000, 5))
+    assert np.allclose(forest.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12)
+
+def test_saved_forest_is_memory_mapped_by_the_flat_backend(tmp_path):
+    for name in ("model.pkl", "encoder.json"):
+        shutil.copy(os.path.join(BASE_DIR, "models", name), tmp_path / name)
+    model_path, encoder_path = str(tmp_path / "model.pkl"), str(tmp_path / "encoder.json")
+    model = joblib.load(model_path)
+    FlatForest.from_sklearn(model, model_sha256=file_sha256(model_path)).save(str(tmp_path / FLAT_FOREST_DIR))
+
+    live = ModelBundle.load(model_path, encoder_path, use_profile_table=False)
+    flat = ModelBundle.load(model_path, encoder_path, use_profile_table=False, backend="flat")
+    assert live.backend == "sklearn" and flat.backend == "flat"
+    assert isinstance(flat.scorer.value, np.memmap)
+
+    X = monitoring_frame(model, 100).to_numpy(dtype=np.uint8)
+    live_labels, live_proba = live.score(X)
+    labels, proba = flat.score(X)
+    assert (labels == live_labels).all() and np.allclose(proba, live_proba, atol=1e-12)
+
+    sk_chunk = score_chunk(model, monitoring_frame(model, 100))
+    flat_chunk = score_chunk(flat.scorer, monitoring_frame(model, 100))
+    assert (flat_chunk["Fraud_Predicted"] == sk_chunk["Fraud_Predicted"]).all()
+    assert np.allclose(flat_chunk["Fraud_Probability"], sk_chunk["Fraud_Probability"], atol=1e-12)
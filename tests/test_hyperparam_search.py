@@ -0,0 +1,95 @@
+# tests/test_hyperparam_search.py
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts import hyperparam_search
+from scripts.hyperparam_search import HyperparameterSearch, candidates, load_checkpoint, stratified_order
+
+def make_data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(0, 2, size=(n, 6)).astype(bool), columns=[f"f{i}" for i in range(6)])
+    y = pd.Series(((X["f0"] & X["f1"]) | (rng.random(n) < 0.05)).astype(int))
+    return X, y
+
+def test_parallel_search_checkpoints_and_resumes(tmp_path, monkeypatch):
+    X, y = make_data()
+    checkpoint = str(tmp_path / "trials.jsonl")
+    search = HyperparameterSearch("random", models=["decision_tree"], n_iter=4, workers=2, checkpoint_path=checkpoint)
+    best = search.run(X, y)
+
+    with open(checkpoint) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 4 and all(r["wall_seconds"] > 0 for r in records)
+    assert best["score"] == max(r["score"] for r in records)
+
+    # Simulate an interrupted run: drop one trial and tear the last line
+    with open(checkpoint, "w") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records[:3])
+        f.write('{"key": "torn')
+    evaluated = []
+    real_evaluate = hyperparam_search.evaluate
+    monkeypatch.setattr(hyperparam_search, "evaluate",
+                        lambda *args, **kwargs: evaluated.append(args[2:4]) or real_evaluate(*args, **kwargs))
+    resumed = HyperparameterSearch("random", models=["decision_tree"], n_iter=4, workers=1,
+                                   checkpoint_path=checkpoint).run(X, y)
+    assert len(evaluated) == 1
+    assert resumed["key"] == best["key"] and len(load_checkpoint(checkpoint)) == 4
+
+def test_checkpoint_is_not_reused_for_new_data_or_seed(tmp_path):
+    checkpoint = str(tmp_path / "trials.jsonl")
+    X, y = make_data()
+    HyperparameterSearch("random", models=["decision_tree"], n_iter=2, workers=1, checkpoint_path=checkpoint).run(X, y)
+    assert len(load_checkpoint(checkpoint)) == 2
+
+    # Same number of rows, different content: every trial runs again
+    X_new, y_new = make_data(seed=1)
+    HyperparameterSearch("random", models=["decision_tree"], n_iter=2, workers=1,
+                         checkpoint_path=checkpoint).run(X_new, y_new)
+    assert len(load_checkpoint(checkpoint)) == 4
+
+    # Same data, different CV seed: new trials too
+    search = HyperparameterSearch("grid", models=["decision_tree"], workers=1, checkpoint_path=checkpoint, seed=7)
+    search._run_round(X, y, candidates("random", ["decision_tree"], n_iter=2))
+    records = load_checkpoint(checkpoint)
+    assert len(records) == 6 and sum(r["seed"] == 7 for r in records.values()) == 2
+
+def test_halving_keeps_the_best_fraction_on_more_rows(tmp_path):
+    X, y = make_data()
+    pairs = candidates("halving", ["decision_tree"])
+    search = HyperparameterSearch("halving", models=["decision_tree"], workers=1, factor=3,
+                                  checkpoint_path=str(tmp_path / "trials.jsonl"))
+    best = search.run(X, y)
+
+    rounds = {}
+    for record in search.records:
+        rounds.setdefault(record["round"], []).append(record["n_rows"])
+    assert len(rounds[0]) == len(pairs)
+    assert all(len(rounds[r + 1]) < len(rounds[r]) for r in range(len(rounds) - 1))
+    assert rounds[max(rounds)] == [len(X)] * len(rounds[max(rounds)])
+    assert best["n_rows"] == len(X)
+
+def test_stratified_order_prefixes_keep_class_balance():
+    y = np.array([0] * 900 + [1] * 100)
+    order = stratified_order(y)
+    assert sorted(order) == list(range(1000))
+    assert abs(y[order[:100]].mean() - 0.1) <= 0.011
+
+def _native_threads(_):
+    from threadpoolctl import threadpool_info
+    return [pool["num_threads"] for pool in threadpool_info()]
+
+def test_pool_workers_run_single_threaded_native_code():
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context(start_method),
+                             initializer=hyperparam_search._init_worker, initargs=(None,)) as pool:
+        threads = pool.submit(_native_threads, None).result()
+    assert threads and all(n == 1 for n in threads)
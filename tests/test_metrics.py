@@ -0,0 +1,87 @@
+# tests/test_metrics.py
+import os
+import sys
+
+# Add project root (one level up) to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("prometheus_client")
+from prometheus_client.parser import text_string_to_metric_families
+
+from deployment.server import app, get_bundle
+
+client = TestClient(app)
+
+def _samples():
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    return [s for family in text_string_to_metric_families(res.text) for s in family.samples]
+
+def _value(samples, name, **labels):
+    return sum(s.value for s in samples
+               if s.name == name and all(s.labels.get(k) == v for k, v in labels.items()))
+
+def _features():
+    names = get_bundle().encoder.feature_names
+    return {name: 0 for name in names}
+
+def test_requests_and_stage_latencies_are_recorded():
+    before = _samples()
+    assert client.post("/predict", json={"features": _features()}).status_code == 200
+    assert client.post("/predict", json={"features": {"bogus": 1}}).status_code == 422
+    after = _samples()
+
+    for status in ("200", "422"):
+        assert _value(after, "fraud_api_requests_total", endpoint="/predict", status=status) \
+            == _value(before, "fraud_api_requests_total", endpoint="/predict", status=status) + 1
+    # Only the successful request reaches inference and serialization
+    for stage, delta in (("decode", 2), ("encode", 1), ("inference", 1), ("serialize", 1)):
+        count = dict(name="fraud_api_stage_duration_seconds_count", endpoint="/predict", stage=stage)
+        assert _value(after, **count) == _value(before, **count) + delta
+    assert _value(after, "fraud_api_request_duration_seconds_count", endpoint="/predict") \
+        == _value(before, "fraud_api_request_duration_seconds_count", endpoint="/predict") + 2
+
+def test_batch_sizes_predictions_and_model_version():
+    version = get_bundle().version
+    before = _samples()
+    res = client.post("/predict_batch", json=[_features()] * 5)
+    assert res.status_code == 200
+    after = _samples()
+
+    labels = [p["prediction"] for p in res.json()["predictions"]]
+    assert _value(after, "fraud_api_batch_size_sum", endpoint="/predict_batch") \
+        == _value(before, "fraud_api_batch_size_sum", endpoint="/predict_batch") + 5
+    for label in (0, 1):
+        name = dict(name="fraud_api_predictions_total", model_version=version, prediction=str(label))
+        assert _value(after, **name) == _value(before, **name) + labels.count(label)
+    assert _value(after, "fraud_api_model_info", model_version=version) == 1
+
+def test_cache_hits_and_process_rss():
+    features = _features()
+    client.post("/explain", json={"features": features})
+    before = _samples()
+    client.post("/explain", json={"features": features})
+    after = _samples()
+
+    version = get_bundle().version
+    hits = dict(name="fraud_api_cache_hits_total", model_version=version)
+    misses = dict(name="fraud_api_cache_misses_total", model_version=version)
+    # Answered by the profile table or the explain cache, never by a fresh SHAP call
+    assert _value(after, **hits) + _value(after, **misses) > _value(before, **hits) + _value(before, **misses)
+    assert _value(after, "fraud_api_stage_duration_seconds_count", endpoint="/explain", stage="explain") \
+        == _value(before, "fraud_api_stage_duration_seconds_count", endpoint="/explain", stage="explain") + 1
+    if sys.platform.startswith("linux"):
+        assert _value(after, "process_resident_memory_bytes") > 0
+
+def test_count_predictions_splits_labels():
+    from deployment.server import metrics
+    before = _value(_samples(), "fraud_api_predictions_total", model_version="test", prediction="1")
+    metrics.count_predictions("test", np.array([1, 0, 1, 1]))
+    after = _samples()
+    assert _value(after, "fraud_api_predictions_total", model_version="test", prediction="1") == before + 3
+    assert _value(after, "fraud_api_predictions_total", model_version="test", prediction="0") >= 1
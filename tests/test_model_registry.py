@@ -0,0 +1,45 @@
+# tests/test_model_registry.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+
+from deployment.model_registry import ModelRegistry
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+ENCODER_PATH = os.path.join(BASE_DIR, "models", "encoder.json")
+
+def test_publish_pin_and_rollback(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    model = joblib.load(MODEL_PATH)
+
+    first = registry.publish(model, ENCODER_PATH, metrics={"roc_auc": 0.5})
+    second = registry.publish(model, ENCODER_PATH)
+
+    assert registry.versions() == [first, second]
+    assert registry.active_version() == second
+    assert registry.metadata(first)["metrics"] == {"roc_auc": 0.5}
+
+    registry.pin(registry.previous_version(second))
+    assert registry.active_version() == first
+    registry.unpin()
+    assert registry.active_version() == second
+
+    bundle = registry.load_bundle(second)
+    assert bundle.version == second
+
+def test_server_swaps_to_new_version(tmp_path, monkeypatch):
+    from deployment import server
+
+    registry = ModelRegistry(str(tmp_path))
+    # Restore the original bundle and registry after the test
+    monkeypatch.setattr(server, "_bundle", server.get_bundle())
+    monkeypatch.setattr(server, "registry", registry)
+    before = server.get_bundle().version
+
+    version = registry.publish(joblib.load(MODEL_PATH), ENCODER_PATH)
+    assert server.refresh_model().version == version
+    assert server.get_bundle().version != before
@@ -0,0 +1,115 @@
+# tests/test_monitoring_artifacts.py
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("shap")
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from scripts import generate_monitoring_data as gmd
+from scripts import make_monitoring_ui_artifacts as artifacts
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+@pytest.fixture(scope="module")
+def preprocessed():
+    # monitoring_data without the scores is a small preprocessed_data frame
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=600)
+    return df.drop(columns=["prediction", "probability"]).rename(columns={"actual": gmd.TARGET})
+
+@pytest.fixture(scope="module")
+def monitoring(model, preprocessed):
+    return gmd.build_monitoring_data(model, preprocessed)
+
+def _is_png(path):
+    with open(path, "rb") as f:
+        return f.read(8) == PNG_HEADER
+
+def test_build_monitoring_data_scores_the_test_split(model, preprocessed, monitoring):
+    monitoring_df, reference_df = monitoring
+    assert len(monitoring_df) + len(reference_df) == len(preprocessed)
+    assert len(monitoring_df) == 180
+    assert gmd.TARGET not in reference_df.columns
+    assert list(monitoring_df.columns[-3:]) == ["actual", "prediction", "probability"]
+
+    X = monitoring_df.drop(columns=["actual", "prediction", "probability"])
+    assert np.array_equal(monitoring_df["prediction"], model.predict(X))
+    assert np.allclose(monitoring_df["probability"], model.predict_proba(X)[:, 1])
+
+def test_make_drift_summary_writes_the_summary(monitoring, tmp_path):
+    monitoring_df, reference_df = monitoring
+    _, _, _, X_monitor = artifacts.split_monitoring_data(monitoring_df)
+    path = str(tmp_path / "drift_summary.json")
+
+    summary = artifacts.make_drift_summary(reference_df, X_monitor, path=path)
+    with open(path) as f:
+        assert json.load(f) == json.loads(json.dumps(summary))
+    assert summary["reference_rows"] == len(reference_df)
+    assert summary["current_rows"] == len(monitoring_df)
+    assert summary["n_features"] == len(X_monitor.columns)
+
+def test_make_curves_writes_metrics_and_plots(monitoring, tmp_path):
+    y_true, _, y_score, _ = artifacts.split_monitoring_data(monitoring[0])
+    paths = dict(metrics_path=str(tmp_path / "metrics.json"), roc_path=str(tmp_path / "roc.png"),
+                 pr_path=str(tmp_path / "pr.png"))
+
+    metrics = artifacts.make_curves(y_true, y_score, **paths)
+    with open(paths["metrics_path"]) as f:
+        assert json.load(f)["roc_auc"] == pytest.approx(metrics["roc_auc"])
+    assert _is_png(paths["roc_path"]) and _is_png(paths["pr_path"])
+
+def test_make_shap_plots_writes_both_plots(model, monitoring, tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "SHAP_CACHE_DIR", str(tmp_path / "shap_cache"))
+    monitoring_df = monitoring[0]
+    _, _, _, X_monitor = artifacts.split_monitoring_data(monitoring_df)
+    beeswarm, importance = str(tmp_path / "beeswarm.png"), str(tmp_path / "importance.png")
+
+    written = artifacts.make_shap_plots(model, monitoring_df, X_monitor, sample_size=30, workers=1,
+                                        beeswarm_path=beeswarm, importance_path=importance)
+    assert written == [beeswarm, importance]
+    assert _is_png(beeswarm) and _is_png(importance)
+    assert os.listdir(tmp_path / "shap_cache")
+
+def test_concurrent_plots_do_not_draw_into_each_other(monitoring, tmp_path):
+    y_true, _, y_score, _ = artifacts.split_monitoring_data(monitoring[0])
+    inputs = [y_score, 1.0 - y_score]
+
+    def draw(i, name):
+        out = tmp_path / name
+        out.mkdir(exist_ok=True)
+        artifacts.make_curves(y_true, inputs[i % 2], metrics_path=str(out / "metrics.json"),
+                              roc_path=str(out / "roc.png"), pr_path=str(out / "pr.png"))
+        return (out / "roc.png").read_bytes(), (out / "pr.png").read_bytes()
+
+    serial = [draw(i, f"serial-{i}") for i in range(2)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        concurrent = list(pool.map(draw, range(8), [f"thread-{i}" for i in range(8)]))
+    # Under pyplot_lock each thread's figure holds only its own curves
+    for i, plots in enumerate(concurrent):
+        assert plots == serial[i % 2]
+
+def test_first_figure_tolerates_a_half_imported_ipython():
+    # What a concurrent `import shap` looks like to pyplot: IPython in
+    # sys.modules without its attributes yet
+    code = ("import sys, types\n"
+            f"sys.path.insert(0, {BASE_DIR!r})\n"
+            "from scripts.plotting import plt\n"
+            "sys.modules['IPython'] = types.ModuleType('IPython')\n"
+            "plt.close(plt.figure())\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,41 @@
+# tests/test_monitoring_metrics.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import numpy as np
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+from scripts.monitoring_metrics import compute_metrics, histogram_counts, histogram_points, roc_auc
+
+def _scores(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.06
+    # Rounded so many scores tie, like forest probabilities do
+    scores = np.clip(np.round(0.3 * y + rng.beta(2, 8, n), 2), 0, 1)
+    return y, scores
+
+def test_exact_metrics_match_sklearn():
+    y, scores = _scores()
+    metrics = compute_metrics(y, scores, alert_thresholds=(0.2, 0.5))
+    assert np.isclose(metrics["roc_auc"], roc_auc_score(y, scores))
+    assert np.isclose(metrics["pr_auc"], average_precision_score(y, scores))
+
+    for row in metrics["thresholds"]:
+        alert = scores >= row["threshold"]
+        assert row["tp"] == np.sum(alert & y) and row["fp"] == np.sum(alert & ~y)
+        assert np.isclose(row["recall"], np.sum(alert & y) / y.sum())
+    assert sum(b["count"] for b in metrics["calibration"]["bins"]) == len(y)
+
+def test_histogram_approximation_merges_and_stays_close():
+    y, scores = _scores()
+    pos_a, neg_a = histogram_counts(y[:7000], scores[:7000], bins=200)
+    pos_b, neg_b = histogram_counts(y[7000:], scores[7000:], bins=200)
+    _, tps, fps = histogram_points(pos_a + pos_b, neg_a + neg_b)
+    assert abs(roc_auc(tps, fps) - roc_auc_score(y, scores)) < 1e-3
+
+    approx = compute_metrics(y, scores, approx_bins=1000)
+    exact = compute_metrics(y, scores)
+    assert abs(approx["pr_auc"] - exact["pr_auc"]) < 1e-2
+    assert approx["thresholds"] == exact["thresholds"]  # cut-offs fall on bin edges
@@ -0,0 +1,33 @@
+# tests/test_monitoring_pipeline.py
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("prefect")
+pytest.importorskip("boto3")
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..", "prefect_orchestration", "flows")))
+
+import pandas as pd
+
+import monitoring_pipeline as pipeline
+
+def test_cache_key_follows_data_and_model_hash_only():
+    context = SimpleNamespace(task=SimpleNamespace(name="build_monitoring_data"))
+    df = pd.DataFrame({"a": [True, False], "actual": [0, 1]})
+    key = pipeline.input_hash(context, {"model": object(), "model_sha256": "abc", "monitoring_df": df})
+
+    # A different (unhashable) model object with the same artifact hash hits the cache
+    assert pipeline.input_hash(context, {"model": object(), "model_sha256": "abc", "monitoring_df": df.copy()}) == key
+    changed = df.assign(a=[True, True])
+    assert pipeline.input_hash(context, {"model": object(), "model_sha256": "abc", "monitoring_df": changed}) != key
+    assert pipeline.input_hash(context, {"model": object(), "model_sha256": "def", "monitoring_df": df}) != key
+
+def test_file_writing_tasks_are_not_cached():
+    # A cache hit skips the body, which would leave the artifact files unwritten
+    writers = [pipeline.write_monitoring_data, pipeline.drift_summary, pipeline.evidently_drift_report,
+               pipeline.evidently_performance_report, pipeline.roc_pr_curves, pipeline.shap_plots]
+    assert all(t.cache_key_fn is None for t in writers)
+    assert pipeline.build_monitoring_data.cache_key_fn is pipeline.input_hash
@@ -0,0 +1,78 @@
+# tests/test_monitoring_store.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from scripts.drift import chi_square, dummy_counts, js_distance, psi
+from scripts.monitoring_store import MonitoringStore, Sketch, update_store
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+
+def _monitoring_frame():
+    return pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"))
+
+def test_incremental_buckets_equal_one_full_pass(tmp_path):
+    df = _monitoring_frame()
+    store = MonitoringStore(str(tmp_path))
+    store.set_reference(Sketch.from_frame(df.iloc[:2000]))
+
+    for i, (bucket, part) in enumerate([("2024-01-01", df.iloc[:1500]), ("2024-01-02", df.iloc[1500:])]):
+        assert store.update(Sketch.from_frame(part, batch_id=f"batch-{i}"), bucket)
+    # Re-running a batch that was already merged is a no-op
+    assert not store.update(Sketch.from_frame(df.iloc[1500:], batch_id="batch-1"), "2024-01-02")
+
+    full = Sketch.from_frame(df)
+    merged = store.merged()
+    assert merged.rows == full.rows
+    assert (merged.ones == full.ones).all()
+    assert (merged.confusion == full.confusion).all()
+
+    reference = Sketch.from_frame(df.iloc[:2000])
+    expected = psi(reference.counts(), full.counts())
+    assert np.allclose([row["psi"] for row in store.drift()], expected)
+
+def test_daily_runs_over_the_same_batch_count_it_once(tmp_path):
+    df = _monitoring_frame()
+    store = MonitoringStore(str(tmp_path / "store"))
+    summary_path = str(tmp_path / "drift.json")
+    reference = df.iloc[:2000].drop(columns=["actual", "prediction", "probability"])
+
+    update_store(store, df, "2024-01-01", reference=reference, reference_id="model:a", summary_path=summary_path)
+    # The next day's run re-scores the same claims: nothing new is merged
+    summary = update_store(store, df, "2024-01-02", reference=reference, reference_id="model:a",
+                           summary_path=summary_path)
+    assert store.buckets() == ["2024-01-01"]
+    assert store.merged().rows == len(df)
+    assert summary["buckets"] == ["2024-01-01"]
+
+    # Same model: the stored reference is kept; a new model rebuilds it
+    update_store(store, df, "2024-01-02", reference=reference.iloc[:10], reference_id="model:a",
+                 summary_path=summary_path)
+    assert store.reference().rows == 2000
+    update_store(store, df, "2024-01-02", reference=reference.iloc[:10], reference_id="model:b",
+                 summary_path=summary_path)
+    assert store.reference().rows == 10 and store.reference().batches == ["model:b"]
+
+def test_drift_statistics_match_reference_implementations():
+    rng = np.random.default_rng(0)
+    ref = rng.random((1000, 5)) < [0.1, 0.5, 0.0, 1.0, 0.3]
+    cur = rng.random((800, 5)) < [0.2, 0.5, 0.0, 1.0, 0.0]
+    ref_counts, cur_counts = dummy_counts(ref), dummy_counts(cur)
+
+    statistic, p_value = chi_square(ref_counts, cur_counts)
+    for i in (0, 1, 4):
+        expected = stats.chi2_contingency(np.stack([ref_counts[i], cur_counts[i]]), correction=False)
+        assert np.isclose(statistic[i], expected[0]) and np.isclose(p_value[i], expected[1])
+    # Constant in both samples: no drift, no division by zero
+    assert statistic[2] == statistic[3] == 0.0 and p_value[2] == p_value[3] == 1.0
+
+    from scipy.spatial.distance import jensenshannon
+    js = js_distance(ref_counts, cur_counts)
+    for i in range(5):
+        assert np.isclose(js[i], jensenshannon(ref_counts[i], cur_counts[i], base=2))
+    assert psi(ref_counts, ref_counts).max() == 0.0
@@ -0,0 +1,58 @@
+# tests/test_profile_table.py
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import numpy as np
+import pandas as pd
+
+from deployment.model_bundle import ModelBundle, file_sha256
+from deployment.profile_table import PROFILE_TABLE_DIR, ProfileTable, profile_keys
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+
+def test_profile_table_matches_live_model(tmp_path):
+    for name in ("model.pkl", "encoder.json"):
+        shutil.copy(os.path.join(BASE_DIR, "models", name), tmp_path / name)
+    model_path, encoder_path = str(tmp_path / "model.pkl"), str(tmp_path / "encoder.json")
+
+    live = ModelBundle.load(model_path, encoder_path)
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=50)
+    X = df[live.encoder.feature_names].to_numpy(dtype=np.uint8)
+
+    ProfileTable.build(live, X[:40], str(tmp_path / PROFILE_TABLE_DIR), model_sha256=file_sha256(model_path))
+    cached = ModelBundle.load(model_path, encoder_path)
+    assert cached.profile_table is not None
+
+    live_labels, live_proba = live.score(X)
+    labels, proba = cached.score(X)
+    assert (labels == live_labels).all()
+    assert np.array_equal(proba, live_proba)
+    known = set(profile_keys(X[:40]))
+    assert cached.profile_table.hits == sum(key in known for key in profile_keys(X))
+
+    for a, b in zip(live.explain(X[:5]), cached.explain(X[:5])):
+        assert a["prediction"] == b["prediction"]
+        assert [t["feature"] for t in a["top_shap_values"]] == [t["feature"] for t in b["top_shap_values"]]
+
+def test_profile_table_reads_legacy_packbits_keys(tmp_path):
+    import json
+    for name in ("model.pkl", "encoder.json"):
+        shutil.copy(os.path.join(BASE_DIR, "models", name), tmp_path / name)
+    bundle = ModelBundle.load(str(tmp_path / "model.pkl"), str(tmp_path / "encoder.json"), use_profile_table=False)
+    X = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=30)[bundle.encoder.feature_names]
+    X = X.to_numpy(dtype=np.uint8)
+    table_dir = tmp_path / PROFILE_TABLE_DIR
+    table = ProfileTable.build(bundle, X, str(table_dir))
+    rows = table.lookup(X)
+
+    # Tables written before bitset keys stored big-endian np.packbits rows
+    np.save(table_dir / "keys.npy", np.packbits(np.unpackbits(table.keys.view(np.uint8), axis=1,
+                                                              count=X.shape[1], bitorder="little"), axis=1))
+    meta = json.loads((table_dir / "meta.json").read_text())
+    del meta["key_format"]
+    (table_dir / "meta.json").write_text(json.dumps(meta))
+    assert (ProfileTable(str(table_dir)).lookup(X) == rows).all()
+    assert (rows >= 0).all()
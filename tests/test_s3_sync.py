@@ -0,0 +1,79 @@
+# tests/test_s3_sync.py
+import os
+import sys
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+from scripts.s3_sync import MIB, Uploader, s3_etag
+
+BUCKET = "test-bucket"
+
+@pytest.fixture
+def s3(monkeypatch):
+    for var in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(var, "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+def test_only_changed_files_are_uploaded(s3, tmp_path):
+    artifacts = tmp_path / "artifacts"
+    _write(artifacts / "roc_curve.png", b"png-1")
+    _write(artifacts / "drift_summary.json", b"{}")
+    _write(artifacts / "shap_cache" / "shap_x.npy", b"cache")
+    manifest = str(tmp_path / "manifest.json")
+
+    first = Uploader(s3, BUCKET, manifest_path=manifest).upload_directory(str(artifacts), "monitoring",
+                                                                          exclude_dirs=("shap_cache",))
+    assert sorted(r["status"] for r in first) == ["uploaded", "uploaded"]
+    assert s3.head_object(Bucket=BUCKET, Key="monitoring/roc_curve.png")["ContentType"] == "image/png"
+
+    _write(artifacts / "roc_curve.png", b"png-2")
+    second = Uploader(s3, BUCKET, manifest_path=manifest).upload_directory(str(artifacts), "monitoring",
+                                                                           exclude_dirs=("shap_cache",))
+    assert {r["key"]: r["status"] for r in second} == {
+        "monitoring/drift_summary.json": "unchanged",
+        "monitoring/roc_curve.png": "uploaded",
+    }
+    assert s3.get_object(Bucket=BUCKET, Key="monitoring/roc_curve.png")["Body"].read() == b"png-2"
+
+    # Without a manifest, the remote ETag still prevents a re-upload
+    third = Uploader(s3, BUCKET, manifest_path=str(tmp_path / "fresh.json")).upload_directory(
+        str(artifacts), "monitoring", exclude_dirs=("shap_cache",))
+    assert {r["status"] for r in third} == {"exists"}
+
+def test_large_files_use_multipart_with_matching_etag(s3, tmp_path):
+    path = tmp_path / "batch_predictions.csv"
+    _write(path, os.urandom(11 * MIB))
+    uploader = Uploader(s3, BUCKET, manifest_path=None, multipart_threshold=5 * MIB, multipart_chunksize=5 * MIB)
+
+    [result] = uploader.upload_files([(str(path), "predictions/batch_predictions.csv")])
+    assert result["status"] == "uploaded"
+    remote = s3.head_object(Bucket=BUCKET, Key="predictions/batch_predictions.csv")["ETag"]
+    assert remote.endswith('-3"') and remote == s3_etag(str(path), 5 * MIB, 5 * MIB)
+
+    uploader.manifest.clear()
+    [again] = uploader.upload_files([(str(path), "predictions/batch_predictions.csv")])
+    assert again["status"] == "exists"
+
+def test_one_failing_file_does_not_stop_the_others(s3, tmp_path):
+    model = tmp_path / "model.pkl"
+    _write(model, b"model")
+    missing = str(tmp_path / "batch_predictions.csv")
+
+    results = Uploader(s3, BUCKET, manifest_path=str(tmp_path / "manifest.json")).upload_files(
+        [(missing, "predictions/batch_predictions.csv"), (str(model), "models/model.pkl")])
+    statuses = {r["key"]: r["status"] for r in results}
+    assert statuses == {"predictions/batch_predictions.csv": "failed", "models/model.pkl": "uploaded"}
+    assert s3.get_object(Bucket=BUCKET, Key="models/model.pkl")["Body"].read() == b"model"
@@ -0,0 +1,92 @@
+# tests/test_schema.py
+import os
+import sys
+
+# Add project root (one level up) to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from deployment.schema import FeatureSchema, SchemaError
+from deployment.server import app, get_bundle
+
+client = TestClient(app)
+
+def _features():
+    names = get_bundle().encoder.feature_names
+    return {name: i % 2 for i, name in enumerate(names)}
+
+def test_decode_follows_training_column_order():
+    schema = FeatureSchema(["a", "b", "c"])
+    X = schema.decode([{"c": 1, "a": 0, "b": True}, {"b": 0, "c": False, "a": 1}])
+    assert X.dtype == np.uint8
+    assert X.tolist() == [[0, 1, 1], [1, 0, 0]]
+    assert schema.decode([]).shape == (0, 3)
+
+@pytest.mark.parametrize("record, message", [
+    ({"a": 1, "b": 0}, "missing feature columns: ['c']"),
+    ({"a": 1, "b": 0, "c": 1, "d": 0}, "unknown feature columns: ['d']"),
+    ({"a": 1, "b": 0, "d": 1}, "missing feature columns: ['c']; unknown feature columns: ['d']"),
+    ({"a": 2, "b": 0, "c": 1}, "'a' must be 0 or 1"),
+    ({"a": 1.0, "b": 0, "c": 1}, "'a' must be 0 or 1"),
+    ({"a": "1", "b": 0, "c": 1}, "'a' must be 0 or 1"),
+    ({"a": None, "b": 0, "c": 1}, "'a' must be 0 or 1"),
+    ([1, 0, 1], "must be an object"),
+])
+def test_decode_rejects_malformed_records(record, message):
+    with pytest.raises(SchemaError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        FeatureSchema(["a", "b", "c"]).decode([record])
+
+def test_predict_rejects_schema_violations():
+    features = _features()
+    name = next(iter(features))
+    bad_bodies = [
+        {"features": {k: v for k, v in features.items() if k != name}},
+        {"features": dict(features, extra_column=1)},
+        {"features": dict(features, **{name: 2})},
+        {"features": dict(features, **{name: 1.0})},
+        {"features": dict(features, **{name: "1"})},
+        {"features": features, "unexpected": 1},
+        {},
+        [features],
+    ]
+    for body in bad_bodies:
+        assert client.post("/predict", json=body).status_code == 422
+        assert client.post("/explain", json=body).status_code == 422
+    assert client.post("/predict", content=b"{not json").status_code == 400
+
+def test_predict_matches_model_on_decoded_row():
+    bundle = get_bundle()
+    features = _features()
+    res = client.post("/predict", json={"features": features})
+    assert res.status_code == 200
+    X = np.array([[features[name] for name in bundle.encoder.feature_names]], dtype=np.uint8)
+    labels, fraud_proba = bundle.score(X)
+    assert res.json()["prediction"] == int(labels[0])
+    assert res.json()["probability"] == pytest.approx(fraud_proba[0])
+
+def test_openapi_request_schema_lists_feature_columns():
+    spec = client.get("/openapi.json").json()
+    features = spec["components"]["schemas"]["PredictionRequest"]["properties"]["features"]
+    assert features["required"] == list(get_bundle().encoder.feature_names)
+    assert features["additionalProperties"] is False
+    body = spec["paths"]["/predict"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert body["$ref"] == "#/components/schemas/PredictionRequest"
+
+def test_openapi_schema_follows_model_swaps(monkeypatch):
+    from types import SimpleNamespace
+    import deployment.server as server
+
+    get_bundle()
+    swapped = SimpleNamespace(version="swapped-v2", schema=FeatureSchema(["a", "b"]))
+    monkeypatch.setattr(server, "_bundle", swapped)
+    features = client.get("/openapi.json").json()["components"]["schemas"]["PredictionRequest"]["properties"]
+    assert features["features"]["required"] == ["a", "b"]
+
+    # Before any model is loaded the docs don't trigger a load
+    monkeypatch.setattr(server, "_bundle", None)
+    features = client.get("/openapi.json").json()["components"]["schemas"]["PredictionRequest"]["properties"]
+    assert "required" not in features["features"]
+    assert server._bundle is None
@@ -0,0 +1,81 @@
+# tests/test_score_db.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import pandas as pd
+
+from deployment.model_bundle import ModelBundle
+from scripts import score_db
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+
+class FakeCursor:
+    """Stand-in for a psycopg2 cursor serving `conn.rows` and recording SQL."""
+
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.description = None
+        self._rows = []
+        self._last = ""
+
+    def execute(self, sql, params=None):
+        self._last = sql
+        self.conn.statements.append((self.name, sql, params))
+        if self.name is not None:
+            self.description = [(c,) for c in self.conn.columns]
+            self._rows = list(self.conn.rows)
+
+    def fetchone(self):
+        if "to_regclass" in self._last:
+            return (None,)
+        return None if self.conn.high_water_mark is None else (self.conn.high_water_mark,)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def copy_expert(self, sql, file):
+        self.conn.copied.append(file.read())
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, frame=None, high_water_mark=None):
+        self.columns = [] if frame is None else list(frame.columns)
+        self.rows = [] if frame is None else list(frame.itertuples(index=False, name=None))
+        self.high_water_mark = high_water_mark
+        self.statements = []
+        self.copied = []
+        self.commits = 0
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+def test_score_table_streams_chunks_and_resumes_from_high_water_mark():
+    bundle = ModelBundle.load(os.path.join(BASE_DIR, "models", "model.pkl"),
+                              os.path.join(BASE_DIR, "models", "encoder.json"), version="test")
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=25)
+    frame = df[bundle.encoder.feature_names].astype(bool)
+    frame.insert(0, "PolicyNumber", range(101, 126))
+
+    read_conn, write_conn = FakeConnection(frame), FakeConnection(high_water_mark=100)
+    rows = score_db.score_table(read_conn, write_conn, bundle, chunksize=10)
+
+    assert rows == 25
+    name, sql, params = read_conn.statements[0]
+    assert name is not None and params == (100,) and 'ORDER BY "PolicyNumber"' in sql
+    assert len(write_conn.copied) == 3  # one COPY per chunk
+    marks = [p for _, sql, p in write_conn.statements if "ON CONFLICT (job)" in sql]
+    assert [m[1] for m in marks] == [110, 120, 125]
+    # ensure_state_table plus one commit per chunk (predictions + mark together)
+    assert write_conn.commits == 1 + 3
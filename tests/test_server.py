@@ -5,6 +5,7 @@ import sys
 # Add project root (one level up) to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
 
+import pytest
 from fastapi.testclient import TestClient
 from deployment.server import app
 
@@ -14,3 +15,116 @@ def test_read_root():
     res = client.get("/")
     assert res.status_code == 200
     assert res.json() == {"message": "Welcome to the Insurance Fraud Detection API"}
+
+def _sample_records(n):
+    import pandas as pd
+    path = os.path.abspath(os.path.join(__file__, "..", "..", "data", "monitoring_data.csv"))
+    df = pd.read_csv(path, nrows=n).drop(columns=["actual", "prediction", "probability"], errors="ignore")
+    return df.astype(int).to_dict(orient="records")
+
+def test_predict_batch_matches_single_predict():
+    records = _sample_records(5)
+    res = client.post("/predict_batch", json=records)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["count"] == 5
+    for record, scored in zip(records, body["predictions"]):
+        single = client.post("/predict", json={"features": record}).json()
+        assert scored["prediction"] == single["prediction"]
+        assert 0.0 <= scored["probability"] <= 1.0
+
+def test_predict_batch_ndjson():
+    import json
+    records = _sample_records(3)
+    payload = "\n".join(json.dumps(r) for r in records)
+    res = client.post("/predict_batch", content=payload,
+                      headers={"Content-Type": "application/x-ndjson"})
+    assert res.status_code == 200
+    assert res.json()["count"] == 3
+
+def _raw_claims(n):
+    import pandas as pd
+    path = os.path.abspath(os.path.join(__file__, "..", "..", "data", "fraud_oracle.csv"))
+    return pd.read_csv(path, nrows=n).to_dict(orient="records")
+
+def test_predict_accepts_raw_claims():
+    from deployment.server import get_bundle
+    encoder = get_bundle().encoder
+    claims = _raw_claims(4)
+    encoded = encoder.transform(claims)
+    for claim, row in zip(claims, encoded):
+        features = dict(zip(encoder.feature_names, row.tolist()))
+        raw = client.post("/predict", json={"claim": claim}).json()
+        dummied = client.post("/predict", json={"features": features}).json()
+        assert raw == dummied
+
+    res = client.post("/predict_batch?raw=true", json=claims)
+    assert res.status_code == 200
+    assert res.json()["count"] == 4
+
+def test_predict_rejects_unknown_category():
+    claim = dict(_raw_claims(1)[0], Make="DeLorean")
+    res = client.post("/predict", json={"claim": claim})
+    assert res.status_code == 422
+
+def test_predict_reports_missing_claim_fields():
+    claim = _raw_claims(1)[0]
+    del claim["NumberOfSuppliments"]
+    claim["Make"] = None
+    res = client.post("/predict", json={"claim": claim})
+    assert res.status_code == 422
+    detail = res.json()["detail"]
+    assert "Missing" in detail and "NumberOfSuppliments" in detail and "Make" in detail
+    assert "None" not in detail
+
+    from deployment.server import get_bundle
+    import pandas as pd
+    frame = pd.DataFrame(_raw_claims(3)).drop(columns=["Fault"])
+    with pytest.raises(ValueError, match=r"Missing value\(s\) for required field\(s\): \['Fault'\]"):
+        get_bundle().encoder.transform(frame)
+
+def test_explain_returns_top10():
+    res = client.post("/explain", json={"claim": _raw_claims(1)[0]})
+    assert res.status_code == 200
+    assert len(res.json()["top_shap_values"]) == 10
+
+def test_ready_reports_components():
+    with TestClient(app) as c:
+        body = c.get("/ready").json()
+    assert body["ready"] is True
+    assert body["components"]["model"]["loaded"] is True
+    assert body["rss_bytes"] > 0
+
+def test_ready_is_503_until_the_model_is_loaded(monkeypatch):
+    import deployment.server as server
+    monkeypatch.setattr(server, "_bundle", None)
+    res = client.get("/ready")
+    assert res.status_code == 503
+    assert res.json()["ready"] is False
+    assert res.json()["components"]["model"]["loaded"] is False
+
+def test_explain_batch_matches_explain_and_uses_cache():
+    records = _sample_records(4)
+    records.append(records[0])
+    res = client.post("/explain_batch", json=records)
+    assert res.status_code == 200
+    explanations = res.json()["explanations"]
+    assert len(explanations) == 5
+    assert explanations[0] == explanations[4]
+
+    single = client.post("/explain", json={"features": records[1]}).json()
+    assert single["top_shap_values"] == explanations[1]["top_shap_values"]
+    assert client.get("/explain/cache/stats").json()["hits"] >= 1
+
+def test_model_admin_requires_token(monkeypatch):
+    import deployment.server as server
+    monkeypatch.setattr(server, "ADMIN_TOKEN", None)
+    assert client.post("/admin/model/rollback").status_code == 403
+    assert client.delete("/admin/model/pin", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/admin/model/pin", json={"version": "v1"}).status_code == 403
+    assert client.post("/admin/model/pin", json={"version": "v1"},
+                       headers={"X-Admin-Token": "wrong"}).status_code == 403
+    res = client.post("/admin/model/pin", json={"version": "no-such-version"}, headers={"X-Admin-Token": "s3cret"})
+    assert res.status_code == 404
@@ -0,0 +1,41 @@
+# tests/test_shap_summary.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "..", "..")))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from scripts import shap_summary
+from scripts.shap_summary import compute_shap, load_or_compute_shap, stratified_sample
+
+BASE_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+
+def test_stratified_sample_keeps_rare_cells_within_budget():
+    df = pd.DataFrame({"prediction": [0] * 9000 + [1] * 900 + [0] * 90 + [1] * 10,
+                       "actual": [0] * 9000 + [0] * 900 + [1] * 90 + [1] * 10})
+    idx = stratified_sample(df, budget=500, min_per_stratum=40)
+    assert len(idx) <= 500 and len(np.unique(idx)) == len(idx)
+    cells = df.iloc[idx].value_counts()
+    assert cells[(1, 1)] == 10 and cells[(0, 1)] >= 40
+    assert cells[(0, 0)] > cells[(1, 0)]
+
+def test_parallel_shap_matches_serial_and_is_cached(tmp_path, monkeypatch):
+    model = joblib.load(MODEL_PATH)
+    X = pd.read_csv(os.path.join(BASE_DIR, "data", "monitoring_data.csv"), nrows=40)[list(model.feature_names_in_)]
+
+    serial = compute_shap(model, X.to_numpy(dtype=np.float64), 1, workers=1)
+    parallel = compute_shap(model, X.to_numpy(dtype=np.float64), 1, workers=2, shard_size=15)
+    assert np.allclose(serial, parallel)
+
+    values, cached = load_or_compute_shap(model, MODEL_PATH, X, str(tmp_path), workers=1)
+    assert not cached and np.allclose(values, serial)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("SHAP recomputed despite a cached matrix")
+    monkeypatch.setattr(shap_summary, "compute_shap", fail)
+    values, cached = load_or_compute_shap(model, MODEL_PATH, X, str(tmp_path), workers=1)
+    assert cached and np.allclose(values, serial)